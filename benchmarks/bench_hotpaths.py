@@ -0,0 +1,117 @@
+"""Micro-benchmarks of the per-breadcrumb and usage cache CPU paths.
+
+Run with pytest-benchmark (``--extra bench``). The file is named so that the
+regular test run does not collect it. Save a baseline on ``main``, then check a
+branch against it::
+
+    make bench-micro
+    git checkout my-branch
+    make bench-micro-check
+
+The check fails if any benchmark's median regressed by more than 15%
+(``BENCH_THRESHOLD``) against the latest saved run."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from packaging.version import parse as parse_version
+
+from migas.server.api.models import BreadcrumbRequest, _validate_version
+from migas.server.usage import parse_historical, write_historical
+
+PAYLOAD = {
+    'project': 'nipreps/fmriprep',
+    'project_version': '24.1.1',
+    'language': 'python',
+    'language_version': '3.12.4',
+    'ctx': {
+        'user_id': '00000000-0000-0000-0000-00000000000a',
+        'session_id': '11111111-1111-1111-1111-111111111111',
+        'user_type': 'general',
+        'platform': 'linux',
+        'container': 'docker',
+        'is_ci': False,
+    },
+    'proc': {
+        'status': 'F',
+        'status_desc': None,
+        'error_type': 'MemoryError',
+        'error_desc': 'Unable to allocate array',
+    },
+}
+VERSIONS = ['24.1.1', '3.12.4', '25.0.0rc1', '23.2.3.dev14+g1a2b3c4', '1.0', 'not a version']
+LAST_DATE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _histogram(days: int = 730) -> list[dict]:
+    """Two years of cached usage rows of a busy project, as ``get_viz_data`` returns them."""
+    rng = random.Random(0)
+    versions = [f'24.{minor}.{patch}' for minor in range(3) for patch in range(4)]
+    rows = []
+    for day in range(days):
+        date = (LAST_DATE - timedelta(days=day)).date().isoformat()
+        for version in rng.sample(versions, 4):
+            for status in 'RCF':
+                rows.append(
+                    {
+                        'version': version,
+                        'date': date,
+                        'status': status,
+                        'count': rng.randint(1, 50),
+                    }
+                )
+    return rows
+
+
+def _run(coro):
+    """Run a coroutine that never suspends, without the cost of an event loop."""
+    try:
+        coro.send(None)
+    except StopIteration as e:
+        return e.value
+    raise RuntimeError('coroutine suspended')
+
+
+class _Redis:
+    async def set(self, key, value, **kwargs):
+        self.value = value
+
+
+def test_breadcrumb_validation(benchmark):
+    body = benchmark(BreadcrumbRequest.model_validate, PAYLOAD)
+    assert body.proc.status.value == 'F'
+
+
+def test_validate_version(benchmark):
+    result = benchmark(lambda: [_validate_version(v) for v in VERSIONS])
+    assert result[-1] == 'unknown'
+
+
+def test_parse_version(benchmark):
+    benchmark(lambda: [parse_version(v) for v in VERSIONS[:-1]])
+
+
+def test_to_crumb(benchmark):
+    body = BreadcrumbRequest.model_validate(PAYLOAD)
+    crumb = benchmark(body.to_crumb)
+    assert crumb.container == 'docker'
+
+
+def test_parse_cache(benchmark):
+    data = _histogram()
+    redis = _Redis()
+    _run(write_historical(redis, 'key', data, LAST_DATE - timedelta(days=730), LAST_DATE))
+    parsed, _, last_date = benchmark(parse_historical, redis.value)
+    assert len(parsed) == len(data) and last_date == LAST_DATE
+
+
+def test_write_cache(benchmark):
+    data = _histogram()
+    redis = _Redis()
+    oldest_date = LAST_DATE - timedelta(days=730)
+    benchmark(lambda: _run(write_historical(redis, 'key', data, oldest_date, LAST_DATE)))
+    assert redis.value
@@ -0,0 +1,78 @@
+"""Compare two ``load.py`` result files.
+
+Prints the change of every metric, and exits with status 1 when a latency
+percentile or throughput regressed by more than ``--threshold`` percent::
+
+    python benchmarks/compare.py main.json branch.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+
+# (metric path, higher is better)
+METRICS = (
+    (('throughput',), True),
+    (('db_rows_per_s',), True),
+    (('latency_ms', 'p50'), False),
+    (('latency_ms', 'p95'), False),
+    (('latency_ms', 'p99'), False),
+)
+# a regression in these fails the comparison
+GATED = {('throughput',), ('latency_ms', 'p95'), ('latency_ms', 'p99')}
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10, help='percent')
+    return parser
+
+
+def _get(result: dict, path: tuple[str, ...]) -> float | None:
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[str]:
+    """Print a comparison table; return the regressions beyond ``threshold`` percent."""
+    regressions = []
+    for path in (p for p in baseline['results'] if p in candidate['results']):
+        print(f'{path}:')
+        for metric, higher_is_better in METRICS:
+            old = _get(baseline['results'][path], metric)
+            new = _get(candidate['results'][path], metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            name = '.'.join(metric)
+            flag = ''
+            if worse > threshold and metric in GATED:
+                flag = '  REGRESSION'
+                regressions.append(f'{path} {name}')
+            print(f'  {name:>16}: {old:10.1f} -> {new:10.1f} ({change:+6.1f}%){flag}')
+    return regressions
+
+
+def main(argv=None) -> int:
+    pargs = _parser().parse_args(argv)
+    with open(pargs.baseline) as f:
+        baseline = json.load(f)
+    with open(pargs.candidate) as f:
+        candidate = json.load(f)
+    print(
+        f'baseline: {baseline["meta"].get("commit")}  candidate: {candidate["meta"].get("commit")}'
+    )
+    if regressions := compare(baseline, candidate, pargs.threshold):
+        print(f'Regressed by more than {pargs.threshold}%: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
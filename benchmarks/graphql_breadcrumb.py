@@ -0,0 +1,99 @@
+"""Compare breadcrumb throughput across the ingestion paths of a running server.
+
+Modes:
+- ``graphql``: canonical ``add_breadcrumb`` document sent in full (strawberry execution)
+- ``persisted``: the same document sent as a persisted query hash (fast path)
+- ``rest``: ``POST /api/breadcrumb``
+
+The project must already be registered, and the server should run with
+``MIGAS_BYPASS_RATE_LIMIT=1`` so requests are not throttled::
+
+    python benchmarks/graphql_breadcrumb.py --url http://localhost:8081 --project owner/repo
+"""
+
+import argparse
+import asyncio
+import hashlib
+import time
+from uuid import uuid4
+
+import aiohttp
+
+from migas.server.extensions.fastpath import BREADCRUMB_MUTATION
+
+MODES = ('graphql', 'persisted', 'rest')
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8081')
+    parser.add_argument('--project', default='nipreps/migas-py')
+    parser.add_argument('-n', '--requests', type=int, default=2000)
+    parser.add_argument('-c', '--concurrency', type=int, default=32)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    return parser
+
+
+def build_request(mode: str, url: str, crumb: dict) -> tuple[str, dict]:
+    """Endpoint and JSON body sending ``crumb`` through the ``mode`` ingestion path."""
+    if mode == 'rest':
+        return f'{url}/api/breadcrumb', crumb
+    if mode == 'persisted':
+        sha = hashlib.sha256(BREADCRUMB_MUTATION.encode()).hexdigest()
+        return f'{url}/graphql', {
+            'variables': crumb,
+            'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': sha}},
+        }
+    return f'{url}/graphql', {'query': BREADCRUMB_MUTATION, 'variables': crumb}
+
+
+def _request(mode: str, url: str, project: str) -> tuple[str, dict]:
+    crumb = {
+        'project': project,
+        'project_version': '1.0.0',
+        'language': 'python',
+        'language_version': '3.12',
+        'ctx': {'user_id': str(uuid4()), 'session_id': str(uuid4()), 'platform': 'linux'},
+        'proc': {'status': 'C'},
+    }
+    return build_request(mode, url, crumb)
+
+
+async def run(mode: str, url: str, project: str, total: int, concurrency: int) -> float:
+    """Send ``total`` breadcrumbs with ``concurrency`` workers; return requests per second."""
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(_request(mode, url, project))
+    failures = 0
+
+    async def worker(session: aiohttp.ClientSession) -> None:
+        nonlocal failures
+        while not queue.empty():
+            endpoint, body = queue.get_nowait()
+            async with session.post(endpoint, json=body) as res:
+                payload = await res.json()
+                if res.status >= 400 or 'errors' in payload:
+                    failures += 1
+
+    async with aiohttp.ClientSession() as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    if failures:
+        print(f'  {mode}: {failures} failed request(s)')
+    return total / elapsed
+
+
+async def main(argv=None) -> None:
+    pargs = _parser().parse_args(argv)
+    url = pargs.url.rstrip('/')
+    for mode in pargs.modes:
+        # warm up connections, caches and the persisted query store
+        await run(mode, url, pargs.project, min(100, pargs.requests), pargs.concurrency)
+        rate = await run(mode, url, pargs.project, pargs.requests, pargs.concurrency)
+        print(f'{mode:>10}: {rate:8.1f} req/s')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,302 @@
+"""Synthetic breadcrumb streams.
+
+A `SessionStream` interleaves many concurrent sessions, as a busy server sees
+them: each session sends a running (``R``) crumb, possibly a few more, and ends
+with a completed (``C``) or failed (``F``) crumb, or is abandoned. Users run
+several sessions, and project and Python versions follow skewed distributions.
+Streams are deterministic for a given seed.
+
+Payloads have the shape of ``POST /api/breadcrumb`` bodies, which are also the
+variables of the ``add_breadcrumb`` GraphQL mutation.
+
+`CrumbHistory` generates rows of the ``crumbs`` table directly, over a past
+window, for seeding a database at scale (see ``seed.py``).
+"""
+
+import heapq
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+PLATFORMS = (('linux', 0.8), ('darwin', 0.15), ('win32', 0.05))
+CONTAINERS = (('unknown', 0.6), ('docker', 0.25), ('apptainer', 0.15))
+PYTHON_VERSIONS = (('3.12.4', 0.35), ('3.11.9', 0.3), ('3.10.14', 0.2), ('3.13.0', 0.15))
+ERRORS = (
+    ('FileNotFoundError', 'No such file or directory'),
+    ('MemoryError', 'Unable to allocate array'),
+    ('RuntimeError', 'Node failed to run'),
+    ('KeyboardInterrupt', None),
+)
+# Session outcomes: completed, failed, or abandoned (no final crumb)
+OUTCOMES = (('C', 0.8), ('F', 0.15), (None, 0.05))
+
+
+def _weighted(rng: random.Random, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def project_versions(rng: random.Random, releases: int = 8) -> list[tuple[str, float]]:
+    """Release history, newest first and most used; includes pre-releases and dev builds."""
+    year, minor, patch = rng.randint(22, 25), rng.randint(0, 3), rng.randint(0, 4)
+    versions = []
+    for _ in range(releases):
+        versions.append(f'{year}.{minor}.{patch}')
+        if patch:
+            patch -= 1
+        elif minor:
+            minor, patch = minor - 1, rng.randint(0, 4)
+        else:
+            year, minor, patch = year - 1, 2, rng.randint(0, 4)
+    weighted = [(v, 0.5**i) for i, v in enumerate(versions)]
+    newest = versions[0].split('.')
+    weighted.append((f'{newest[0]}.{int(newest[1]) + 1}.0rc1', 0.05))
+    weighted.append((f'{versions[0]}+{rng.randint(1, 40)}.g{rng.getrandbits(28):07x}', 0.05))
+    return weighted
+
+
+@dataclass
+class _Session:
+    project: str
+    project_version: str
+    language_version: str
+    user_id: str
+    session_id: str
+    platform: str
+    container: str
+    is_ci: bool
+    # crumbs left before the final one
+    remaining: int
+    outcome: str | None
+
+
+class SessionStream:
+    """Endless stream of breadcrumb payloads from interleaved sessions."""
+
+    def __init__(
+        self,
+        projects: list[str],
+        *,
+        users: int = 1000,
+        concurrent_sessions: int = 200,
+        seed: int = 0,
+    ):
+        self.rng = random.Random(seed)
+        self.projects = projects
+        # a few projects get most of the traffic
+        self.project_weights = [1 / (rank + 1) for rank in range(len(projects))]
+        self.versions = {p: project_versions(self.rng) for p in projects}
+        self.users = [_uuid(self.rng) for _ in range(users)]
+        self.concurrent_sessions = concurrent_sessions
+        self.active: list[_Session] = []
+
+    def _new_session(self) -> _Session:
+        rng = self.rng
+        project = rng.choices(self.projects, self.project_weights)[0]
+        is_ci = rng.random() < 0.1
+        return _Session(
+            project=project,
+            project_version=_weighted(rng, self.versions[project]),
+            language_version=_weighted(rng, PYTHON_VERSIONS),
+            user_id=rng.choice(self.users),
+            session_id=_uuid(rng),
+            platform=_weighted(rng, PLATFORMS),
+            container=_weighted(rng, CONTAINERS),
+            is_ci=is_ci,
+            remaining=rng.choices((0, 1, 2, 3), (0.5, 0.3, 0.15, 0.05))[0],
+            outcome=_weighted(rng, OUTCOMES),
+        )
+
+    def _payload(self, session: _Session, status: str) -> dict:
+        error_type = error_desc = None
+        if status == 'F':
+            error_type, error_desc = self.rng.choice(ERRORS)
+        return {
+            'project': session.project,
+            'project_version': session.project_version,
+            'language': 'python',
+            'language_version': session.language_version,
+            'ctx': {
+                'user_id': session.user_id,
+                'session_id': session.session_id,
+                'user_type': 'ci' if session.is_ci else 'general',
+                'platform': session.platform,
+                'container': session.container,
+                'is_ci': session.is_ci,
+            },
+            'proc': {
+                'status': status,
+                'status_desc': None,
+                'error_type': error_type,
+                'error_desc': error_desc,
+            },
+        }
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        if len(self.active) < self.concurrent_sessions:
+            session = self._new_session()
+            self.active.append(session)
+            # every session opens with a running crumb
+            return self._payload(session, 'R')
+
+        idx = self.rng.randrange(len(self.active))
+        session = self.active[idx]
+        if session.remaining:
+            session.remaining -= 1
+            return self._payload(session, 'R')
+
+        # swap-remove: order of active sessions is irrelevant
+        self.active[idx] = self.active[-1]
+        self.active.pop()
+        if session.outcome is None:
+            return next(self)
+        return self._payload(session, session.outcome)
+
+
+def project_names(count: int, owner: str = 'bench') -> list[str]:
+    return [f'{owner}/project-{i:03d}' for i in range(count)]
+
+
+# Columns of ``migas.crumbs`` filled by `CrumbHistory`, in order
+CRUMB_COLUMNS = (
+    'project',
+    'version',
+    'language',
+    'language_version',
+    'timestamp',
+    'session_id',
+    'user_id',
+    'status',
+    'status_desc',
+    'error_type',
+    'error_desc',
+    'is_ci',
+)
+USER_COLUMNS = ('user_id', 'user_type', 'platform', 'container')
+# Mean crumbs per session, used to size the history
+_CRUMBS_PER_SESSION = 2.6
+# Sessions that run past the 48h session cutoff of the usage queries
+LONG_SESSION_RATE = 0.03
+
+
+class CrumbHistory:
+    """Historical crumbs of ``projects`` over ``days``, in timestamp order.
+
+    Project sizes follow a Zipf-like law (a few huge projects, a long tail), the
+    traffic grows over the window, users are unevenly active, and newer releases
+    dominate recent sessions. A few sessions span the 48h cutoff.
+    """
+
+    def __init__(
+        self,
+        projects: list[str],
+        *,
+        crumbs: int,
+        days: int = 730,
+        users: int = 100_000,
+        end: datetime | None = None,
+        seed: int = 0,
+    ):
+        self.rng = random.Random(seed)
+        self.projects = projects
+        self.days = days
+        self.end = (end or datetime.now(timezone.utc)).replace(microsecond=0)
+        self.start = self.end - timedelta(days=days)
+        weights = [1 / (rank + 1) ** 1.2 for rank in range(len(projects))]
+        sessions = crumbs / _CRUMBS_PER_SESSION
+        # sessions per project per day, before the growth factor
+        self.daily_sessions = [sessions * w / sum(weights) / days for w in weights]
+        self.releases = {p: project_versions(self.rng, releases=12) for p in projects}
+        self.users = [
+            (
+                _uuid(self.rng),
+                'ci' if self.rng.random() < 0.1 else 'general',
+                _weighted(self.rng, PLATFORMS),
+                _weighted(self.rng, CONTAINERS),
+            )
+            for _ in range(users)
+        ]
+
+    def _growth(self, day: int) -> float:
+        # traffic doubles-ish over the window; averages to 1
+        return 0.5 + day / self.days
+
+    def _version(self, project: str, age: float) -> str:
+        """Older sessions use older releases."""
+        releases = self.releases[project]
+        if self.rng.random() < 0.05:
+            # pre-release or dev build of the newest version
+            return releases[-self.rng.randint(1, 2)][0]
+        idx = int(age * (len(releases) - 2) + self.rng.choice((-1, 0, 0, 1)))
+        return releases[min(max(idx, 0), len(releases) - 3)][0]
+
+    def _session(self, project: str, started: datetime) -> list[tuple]:
+        rng = self.rng
+        user_id, user_type, _, _ = self.users[int(len(self.users) * rng.random() ** 2)]
+        session_id = _uuid(rng)
+        version = self._version(project, (self.end - started) / (self.end - self.start))
+        language_version = _weighted(rng, PYTHON_VERSIONS)
+        is_ci = user_type == 'ci'
+
+        times = [started]
+        for _ in range(rng.choices((0, 1, 2, 3), (0.5, 0.3, 0.15, 0.05))[0]):
+            times.append(times[-1] + timedelta(seconds=rng.expovariate(1 / 1800)))
+        statuses = ['R'] * len(times)
+        outcome = _weighted(rng, OUTCOMES)
+        if outcome is not None:
+            if rng.random() < LONG_SESSION_RATE:
+                duration = timedelta(hours=rng.uniform(49, 96))
+            else:
+                duration = timedelta(seconds=min(rng.lognormvariate(7.5, 1), 40 * 3600))
+            times.append(max(times[-1], started + duration))
+            statuses.append(outcome)
+
+        rows = []
+        for ts, status in zip(times, statuses):
+            error_type = error_desc = None
+            if status == 'F':
+                error_type, error_desc = rng.choice(ERRORS)
+            rows.append(
+                (
+                    project,
+                    version,
+                    'python',
+                    language_version,
+                    ts,
+                    session_id,
+                    user_id,
+                    status,
+                    None,
+                    error_type,
+                    error_desc,
+                    is_ci,
+                )
+            )
+        return rows
+
+    def __iter__(self):
+        rng = self.rng
+        pending = []  # heap of (timestamp, tiebreak, row) not yet due
+        counter = 0
+        for day in range(self.days):
+            day_start = self.start + timedelta(days=day)
+            day_end = day_start + timedelta(days=1)
+            growth = self._growth(day)
+            for project, rate in zip(self.projects, self.daily_sessions):
+                expected = rate * growth
+                for _ in range(int(expected) + (rng.random() < expected % 1)):
+                    started = day_start + timedelta(seconds=rng.random() * 86400)
+                    for row in self._session(project, started):
+                        counter += 1
+                        heapq.heappush(pending, (row[4], counter, row))
+            while pending and pending[0][0] < day_end:
+                yield heapq.heappop(pending)[2]
+        # crumbs that would arrive after ``end`` are dropped
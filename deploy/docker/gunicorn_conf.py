@@ -50,3 +50,11 @@ log_data = {
     'port': port,
 }
 print(json.dumps(log_data))
+
+
+def child_exit(server, worker):
+    """Discard the live-gauge samples of exited workers (Prometheus multiprocess mode)."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,102 @@
+"""Content negotiation for usage responses.
+
+Usage rows are plain dicts; large projects return tens of thousands of them, so
+every format, plain JSON included, bypasses the per-row ``UsageData`` validation.
+"""
+
+from datetime import date
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+from ..codec import JSONResponse
+
+JSON = 'application/json'
+COLUMNAR = 'application/vnd.migas.columnar+json'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+USAGE_FIELDS = ('date', 'version', 'status', 'count')
+
+
+def _arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate(accept: str | None) -> str:
+    """Pick the usage response format from an ``Accept`` header.
+
+    Falls back to plain JSON for missing or wildcard headers. Raises 406 if the
+    client only accepts Arrow and ``pyarrow`` is not installed.
+    """
+    if not accept:
+        return JSON
+
+    ranges = []
+    for i, part in enumerate(accept.split(',')):
+        media_type, *params = (p.strip() for p in part.split(';'))
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranges.append((-q, i, media_type.lower()))
+
+    for _, _, media_type in sorted(ranges):
+        if media_type in (JSON, 'application/*', '*/*'):
+            return JSON
+        if media_type == COLUMNAR:
+            return COLUMNAR
+        if media_type == ARROW and _arrow_available():
+            return ARROW
+
+    if any(media_type == ARROW for _, _, media_type in ranges):
+        raise HTTPException(status_code=406, detail='Arrow responses are not available.')
+    return JSON
+
+
+def to_columns(rows: list[dict]) -> dict[str, list]:
+    """Transpose usage rows into parallel arrays keyed by field."""
+    return {field: [row[field] for row in rows] for field in USAGE_FIELDS}
+
+
+def to_arrow(rows: list[dict]) -> bytes:
+    """Serialize usage rows as an Apache Arrow IPC stream."""
+    import pyarrow as pa
+
+    columns = to_columns(rows)
+    table = pa.table(
+        {
+            'date': pa.array([date.fromisoformat(d) for d in columns['date']], pa.date32()),
+            'version': pa.array(columns['version'], pa.string()),
+            'status': pa.array(columns['status'], pa.string()).dictionary_encode(),
+            'count': pa.array(columns['count'], pa.int64()),
+        }
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def representation_etag(etag: str, media_type: str) -> str:
+    """Strong ETags must differ between representations of the same resource."""
+    if media_type == JSON:
+        return etag
+    suffix = 'arrow' if media_type == ARROW else 'columnar'
+    return f'{etag[:-1]}-{suffix}"'
+
+
+def render(rows: list[dict], media_type: str, headers: dict[str, str]) -> Response | None:
+    """Encode ``rows`` for a non-default format, or return None for plain JSON."""
+    if media_type == COLUMNAR:
+        return JSONResponse(to_columns(rows), media_type=COLUMNAR, headers=headers)
+    if media_type == ARROW:
+        return Response(to_arrow(rows), media_type=ARROW, headers=headers)
+    return None
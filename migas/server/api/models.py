@@ -2,9 +2,10 @@
 
 import re
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, field_validator
-from ..types import Status, User, Container
+from ..types import Container, CrumbRecord, Status, User
 
 # dash last so it is a literal, not a range
 _VERSION_RE = re.compile(r'^[A-Za-z0-9._+-]+$')
@@ -40,6 +41,16 @@ class BreadcrumbRequest(BaseModel):
 
     _check_versions = field_validator('project_version', 'language_version')(_validate_version)
 
+    def to_crumb(self) -> CrumbRecord:
+        return CrumbRecord.from_input(
+            self.project,
+            self.project_version,
+            self.language,
+            self.language_version,
+            self.ctx,
+            self.proc,
+        )
+
 
 class BreadcrumbResponse(BaseModel):
     success: bool
@@ -87,6 +98,36 @@ class ListTokensResponse(BaseModel):
     tokens: list[TokenModel]
 
 
+class SlowQueryModel(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+    max_ms: float
+    params: list[str] | None = None
+    last_seen: datetime | None = None
+    plan: str | None = None
+
+
+class SlowQueriesResponse(BaseModel):
+    """Slow statements seen by the worker that served the request."""
+
+    success: bool
+    threshold_ms: float
+    queries: list[SlowQueryModel]
+
+
+class LoopStatsResponse(BaseModel):
+    """Event loop health of the worker that served the request."""
+
+    success: bool
+    pid: int
+    lag_ms: float = 0.0
+    lag_ms_mean: float = 0.0
+    lag_ms_max: float = 0.0
+    blocked: int = 0
+    in_flight: dict[str, int]
+
+
 class AuthProjectsResponse(BaseModel):
     """Projects accessible to the authenticated token.
 
@@ -101,3 +142,27 @@ class UsageData(BaseModel):
     version: str
     status: str
     count: int
+
+
+class Granularity(str, Enum):
+    """Date bucket size for ``/api/usage`` rows."""
+
+    day = 'day'
+    week = 'week'
+    month = 'month'
+
+
+class VersionLevel(str, Enum):
+    """Number of release segments kept when grouping ``/api/usage`` rows by version."""
+
+    major = 'major'
+    minor = 'minor'
+    patch = 'patch'
+
+
+class SlowQueryOrder(str, Enum):
+    """Sort key for ``/api/admin/slow-queries``."""
+
+    max_ms = 'max_ms'
+    total_ms = 'total_ms'
+    count = 'count'
@@ -1,14 +1,19 @@
-import json
+import asyncio
+import hashlib
 import logging
-from datetime import date, datetime, timezone, timedelta
+import os
+from datetime import date, datetime, time, timedelta, timezone
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from packaging.version import InvalidVersion, Version
 
+from .. import codec, metrics, slowlog, tracing, usage
+from ..monitor import loop_stats, track_in_flight
 from ..auth import get_authorized_projects
-from ..cache import RESPONSE_TTL, historical_key, usage_key
+from ..cache import HISTORICAL_MAX_AGE, RESPONSE_TTL, encoded_key, historical_key, usage_key
 from ..database import (
-    MAX_SESSION_HOURS,
     add_new_project,
     create_token,
+    filter_existing_projects,
     get_tokens,
     get_viz_data,
     ingest_project,
@@ -16,26 +21,36 @@ from ..database import (
     query_projects,
     revoke_token,
 )
-from ..types import Context, Process, Project
 from ..utils import now
 from .deps import rate_limit, require_access
+from .formats import ARROW, COLUMNAR, JSON, negotiate, render, representation_etag
 from .models import (
     AuthProjectsResponse,
     BreadcrumbRequest,
     BreadcrumbResponse,
+    Granularity,
     IssueTokenRequest,
     RegisterRequest,
     RegisterResponse,
     RevokeTokenRequest,
     RevokeTokenResponse,
+    SlowQueriesResponse,
+    SlowQueryModel,
+    SlowQueryOrder,
     TokenResponse,
     ListTokensResponse,
+    LoopStatsResponse,
     UsageData,
+    VersionLevel,
 )
 
 router = APIRouter(prefix='/api', tags=['api'])
 logger = logging.getLogger('migas')
 
+# Upper bound on projects, and on concurrent cache fills, for a multi-project usage request
+MAX_BATCH_PROJECTS = 50
+MAX_CONCURRENT_USAGE_QUERIES = 4
+
 
 @router.get('/auth/projects', response_model=AuthProjectsResponse)
 async def auth_projects(request: Request):
@@ -51,105 +66,331 @@ async def auth_projects(request: Request):
     return AuthProjectsResponse(projects=projects)
 
 
-def _utc(dt: datetime) -> datetime:
-    """Coerce a naive datetime to UTC (guards against legacy cache values)."""
-    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
-
+async def _assemble_usage(
+    redis,
+    project: str,
+    raw_historical: str | bytes | None,
+    *,
+    start_time: datetime,
+    weeks: int,
+    since: date | None,
+    granularity: Granularity,
+    version_level: VersionLevel | None,
+    response_key: str,
+    after: date | None = None,
+) -> tuple[list[dict], str, str, bytes, dict[str, bytes]]:
+    """Build a usage response from the historical cache and the provisional window.
+
+    Extends and rewrites the historical cache as needed, then caches the assembled
+    response under ``response_key``, in each content-coding. Returns ``(rows,
+    etag, last_date, body, compressed)``, where ``last_date`` is the ISO date
+    before which rows are final, ``body`` is the JSON-encoded rows and
+    ``compressed`` maps content-codings to the compressed body.
+    """
+    cache_key = historical_key(project)
 
-async def _read_cache(
-    redis, cache_key: str
-) -> tuple[list[dict], datetime | None, datetime | None]:
-    """Deserialize a cached usage histogram.
+    with tracing.span('usage.parse_cache'):
+        data, oldest_date, last_date = usage.parse_historical(raw_historical)
+    metrics.cache_result('usage_historical', last_date is not None)
+    logger.debug(
+        'Cache %s for %s: oldest=%s last=%s rows=%d',
+        'hit' if last_date is not None else 'miss',
+        project,
+        oldest_date.date() if oldest_date else None,
+        last_date.date() if last_date else None,
+        len(data),
+    )
 
-    Returns ``(data, oldest_date, last_date)``.  Handles legacy entries
-    that lack an ``oldest_date`` field.
-    """
-    raw = await redis.get(cache_key)
-    if not raw:
-        return [], None, None
-
-    entry = json.loads(raw)
-    data: list[dict] = entry['data']
-    last_date = _utc(datetime.fromisoformat(entry['last_date']))
-
-    if 'oldest_date' in entry:
-        oldest_date = _utc(datetime.fromisoformat(entry['oldest_date']))
-    elif data:
-        # Legacy cache migration: derive from earliest row
-        oldest_date = _utc(datetime.fromisoformat(min(r['date'] for r in data)))
+    if after is not None:
+        # everything since the client's stored history, however many weeks ago
+        requested_start = datetime.combine(after, time.min, tzinfo=timezone.utc)
     else:
-        oldest_date = None
-
-    return data, oldest_date, last_date
-
-
-async def _write_cache(
-    redis, cache_key: str, data: list[dict], oldest_date: datetime, last_date: datetime
-) -> None:
-    """Serialize a usage histogram into Redis."""
-    await redis.set(
-        cache_key,
-        json.dumps(
-            {
-                'oldest_date': oldest_date.isoformat(),
-                'last_date': last_date.isoformat(),
-                'data': data,
-            }
-        ),
+        requested_start = start_time - timedelta(weeks=weeks)
+    data, oldest_date, last_date, dirty = await usage.extend_historical(
+        project,
+        data,
+        oldest_date,
+        last_date,
+        requested_start,
+        usage.provisional_boundary(start_time),
     )
+    if dirty:
+        await usage.write_historical(redis, cache_key, data, oldest_date, last_date)
+
+    cutoff = requested_start.date().isoformat()
+    if since is not None:
+        since_str = since.isoformat()
+        provisional = []
+        result = [r for r in data if cutoff <= r['date'] < since_str]
+    else:
+        # Provisional — always fresh (too recent to cache)
+        with tracing.span('usage.provisional'):
+            provisional = await get_viz_data(
+                project, start_ts=last_date + timedelta(milliseconds=1)
+            )
+        result = [r for r in data if r['date'] >= cutoff] + provisional
+    result = _rollup(result, granularity, version_level)
+
+    final_before = last_date.date().isoformat()
+    etag = _usage_etag(final_before, cutoff, provisional)
+    with tracing.span('usage.serialize'):
+        body = codec.dumps(result)
+        compressed = {encoding: codec.compress(body, encoding) for encoding in codec.ENCODINGS}
+    async with redis.pipeline(transaction=False) as pipe:
+        for encoding, payload in compressed.items():
+            pipe.set(
+                encoded_key(response_key, encoding),
+                _pack_response(etag, final_before, payload),
+                ex=RESPONSE_TTL,
+            )
+        await pipe.execute()
+    return result, etag, final_before, body, compressed
+
+
+_VERSION_SEGMENTS = {VersionLevel.major: 1, VersionLevel.minor: 2, VersionLevel.patch: 3}
+
+
+def _release(version: str, segments: int) -> str:
+    """The first ``segments`` release segments of ``version``, zero-padded."""
+    try:
+        release = Version(version).release
+    except InvalidVersion:
+        return version
+    return '.'.join(str(n) for n in (*release, 0, 0)[:segments])
+
+
+def _rollup(
+    rows: list[dict], granularity: Granularity, version_level: VersionLevel | None
+) -> list[dict]:
+    """Re-bucket day-level usage rows by a coarser date and/or version release.
+
+    Weeks are keyed by their (UTC) Monday and months by their first day, matching
+    the dashboard's client-side reshaping. Versions are keyed by the leading
+    segments of their PEP 440 release (``1.2rc1`` and ``1.2.0`` are both ``1.2``
+    at the minor level); versions that do not parse are kept as is. Counts are
+    summed per ``(date, version, status)``.
+    """
+    if granularity is Granularity.day and version_level is None:
+        return rows
+
+    segments = _VERSION_SEGMENTS.get(version_level)
+    dates: dict[str, str] = {}
+    versions: dict[str, str] = {}
+    buckets: dict[tuple[str, str, str], int] = {}
+    for row in rows:
+        day = row['date']
+        if (bucket := dates.get(day)) is None:
+            if granularity is Granularity.week:
+                d = date.fromisoformat(day)
+                bucket = (d - timedelta(days=d.weekday())).isoformat()
+            elif granularity is Granularity.month:
+                bucket = f'{day[:7]}-01'
+            else:
+                bucket = day
+            dates[day] = bucket
+
+        version = row['version']
+        if segments is not None:
+            if (release := versions.get(version)) is None:
+                release = versions[version] = _release(version, segments)
+            version = release
+
+        key = (bucket, version, row['status'])
+        buckets[key] = buckets.get(key, 0) + row['count']
+
+    return [
+        {'date': d, 'version': v, 'status': status, 'count': count}
+        for (d, v, status), count in buckets.items()
+    ]
 
 
-async def _extend_historical(
-    project: str,
-    data: list[dict],
-    oldest_date: datetime | None,
-    last_date: datetime | None,
-    requested_start: datetime,
-    provisional_boundary: datetime,
-) -> tuple[list[dict], datetime, datetime, bool]:
-    """Fill cache gaps via backward extension and forward delta.
-
-    Returns ``(data, oldest_date, last_date, dirty)``.
+def _usage_etag(final_before: str, cutoff: str, provisional: list[dict]) -> str:
+    """Build a strong ETag for a usage response.
+
+    Rows dated before ``final_before`` (the ISO date of the end of the cached
+    history) are immutable, so the historical portion is fully described by
+    ``(final_before, cutoff)``; only the provisional rows need hashing. Both are
+    whole days, so the ETag survives response-cache expiry within a day.
+    """
+    digest = hashlib.blake2b(f'{final_before}|{cutoff}'.encode(), digest_size=16)
+    digest.update(codec.dumps(provisional, sort_keys=True))
+    return f'"{digest.hexdigest()}"'
+
+
+def _pack_response(etag: str, last_date: str, data: bytes) -> bytes:
+    """Cached usage response: the ETag, the last date and the compressed JSON-encoded rows."""
+    return f'{etag}\n{last_date}\n'.encode() + data
+
+
+def _unpack_response(entry: bytes) -> tuple[str, str, bytes]:
+    etag, last_date, data = entry.split(b'\n', 2)
+    return etag.decode(), last_date.decode(), data
+
+
+async def _get_raw(redis, *keys: str) -> list[bytes | None]:
+    """MGET, without decoding: cached responses are compressed."""
+    return await redis.execute_command('MGET', *keys, NEVER_DECODE=True)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an ``If-None-Match`` header against ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def _usage_cache_control(since: date | None) -> str:
+    """Historical-only deltas are stable for a day; anything else must revalidate."""
+    if since is not None:
+        return f'private, max-age={HISTORICAL_MAX_AGE}'
+    return 'private, no-cache'
+
+
+def _usage_response(
+    compressed: dict[str, bytes],
+    etag: str,
+    media_type: str,
+    request: Request,
+    headers: dict[str, str],
+    body: bytes | None = None,
+    rows: list[dict] | None = None,
+) -> Response:
+    """Answer with 304, the stored JSON in an accepted content-coding, or another format.
+
+    ``compressed`` maps content-codings to the compressed JSON, each sent with an
+    ETag of its own. The JSON ``body`` and ``rows`` are decompressed and decoded
+    from it only if needed and not given.
+    """
+    headers['ETag'] = representation_etag(etag, media_type)
+    encoding = None
+    if media_type == JSON:
+        accepted = codec.accepted_encodings(request.headers.get('Accept-Encoding'))
+        encoding = next((e for e in accepted if e in compressed), None)
+    if encoding is not None:
+        headers['ETag'] = codec.encoded_etag(headers['ETag'], encoding)
+    if _etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+        return Response(compressed[encoding], media_type=JSON, headers=headers)
+    if body is None:
+        ((encoding, data),) = compressed.items()
+        body = codec.decompress(data, encoding)
+    if media_type == JSON:
+        return Response(body, media_type=JSON, headers=headers)
+    return render(codec.loads(body) if rows is None else rows, media_type, headers)
+
+
+@router.get(
+    '/usage',
+    response_model=dict[str, list[UsageData]],
+    responses={
+        400: {'description': f'More than {MAX_BATCH_PROJECTS} projects requested'},
+        403: {'description': 'Token lacks access to a requested project'},
+        404: {'description': 'A requested project is not registered'},
+    },
+)
+async def get_usage_batch(
+    request: Request,
+    projects: str,
+    weeks: int = 1,
+    since: date | None = None,
+    granularity: Granularity = Granularity.day,
+    version_level: VersionLevel | None = None,
+):
+    """Return usage rows for several comma-separated ``projects``, keyed by project.
+
+    Accepts the same parameters as ``/usage/{project}``, except ``after``, for at
+    most ``MAX_BATCH_PROJECTS`` projects. Responses carry no ``ETag`` and are not
+    negotiated: the body is always row-wise JSON.
+
+    Response (gzip) and historical cache entries for every project are read with a
+    single MGET; projects that miss the response cache are assembled concurrently,
+    bounded by ``MAX_CONCURRENT_USAGE_QUERIES``. Cached responses are
+    decompressed, but not decoded.
     """
-    dirty = False
-
-    # Backward extension — query only the uncached gap
-    if oldest_date is None or oldest_date > requested_start:
-        gap_end = oldest_date if oldest_date is not None else provisional_boundary
-        logger.debug(
-            'Backward extension for %s: querying %s → %s',
-            project,
-            requested_start.date(),
-            gap_end.date(),
+    authorized = await get_authorized_projects(request)
+    names = list(dict.fromkeys(p.strip() for p in projects.split(',') if p.strip()))
+    if not names:
+        raise HTTPException(status_code=422, detail='No projects requested.')
+    if len(names) > MAX_BATCH_PROJECTS:
+        raise HTTPException(
+            status_code=400, detail=f'At most {MAX_BATCH_PROJECTS} projects can be requested.'
         )
-        backward = await get_viz_data(project, start_ts=requested_start, end_ts=gap_end)
-        if backward:
-            data = backward + data
-        oldest_date = requested_start
-        # Advance last_date past the backward range so the forward-delta
-        # step does not re-query data we just fetched.
-        last_date = max(last_date, gap_end) if last_date is not None else gap_end
-        dirty = True
-
-    # Forward delta — fill from last cached date to provisional boundary
-    if last_date < provisional_boundary:
-        delta = await get_viz_data(
-            project, start_ts=last_date + timedelta(milliseconds=1), end_ts=provisional_boundary
+    if '*' not in authorized and (denied := [p for p in names if p not in authorized]):
+        raise HTTPException(
+            status_code=403, detail=f'Token does not have access to {", ".join(denied)}.'
+        )
+    if missing := set(names) - await filter_existing_projects(names):
+        raise HTTPException(
+            status_code=404, detail=f'Projects not found: {", ".join(sorted(missing))}.'
         )
-        if delta:
-            data.extend(delta)
-        last_date = provisional_boundary
-        dirty = True
 
-    return data, oldest_date, last_date, dirty
+    start_time = now()
+    redis = request.app.cache
+    level = version_level and version_level.value
+    response_keys = [usage_key(p, weeks, since, granularity.value, level) for p in names]
+    raw = await _get_raw(redis, *response_keys, *(historical_key(p) for p in names))
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_USAGE_QUERIES)
+
+    async def _project_usage(
+        project: str,
+        response_key: str,
+        cached_response: bytes | None,
+        raw_historical: bytes | None,
+    ) -> bytes:
+        metrics.cache_result('usage_response', cached_response is not None)
+        if cached_response:
+            return codec.decompress(_unpack_response(cached_response)[2], 'gzip')
+        async with semaphore:
+            _, _, _, body, _ = await _assemble_usage(
+                redis,
+                project,
+                raw_historical,
+                start_time=start_time,
+                weeks=weeks,
+                since=since,
+                granularity=granularity,
+                version_level=version_level,
+                response_key=response_key,
+            )
+        return body
+
+    bodies = await asyncio.gather(
+        *(
+            _project_usage(*args)
+            for args in zip(names, response_keys, raw[: len(names)], raw[len(names) :])
+        )
+    )
+    # splice the encoded rows of each project, rather than decoding them;
+    # GZipMiddleware compresses the whole
+    content = b'{%s}' % b','.join(
+        codec.dumps(name) + b':' + body for name, body in zip(names, bodies)
+    )
+    return Response(
+        content, media_type=JSON, headers={'Cache-Control': _usage_cache_control(since)}
+    )
 
 
-@router.get('/usage/{project:path}', response_model=list[UsageData])
+@router.get(
+    '/usage/{project:path}',
+    response_model=list[UsageData],
+    responses={
+        200: {'content': {COLUMNAR: {}, ARROW: {}}},
+        304: {'description': 'Not modified (matching If-None-Match)'},
+        406: {'description': 'Requested format is unavailable'},
+    },
+)
 async def get_usage(
     project: str,
     request: Request,
     weeks: int = 1,
     since: date | None = None,
+    granularity: Granularity = Granularity.day,
+    version_level: VersionLevel | None = None,
+    after: date | None = None,
     _auth=Depends(require_access()),
 ):
     """Return usage rows in ``[now - weeks, now]``.
@@ -158,50 +399,57 @@ async def get_usage(
     returned — the delta the caller is missing. The provisional fetch is
     skipped in that case; the caller already holds fresh data through today
     from its prior request.
+
+    When ``after`` is supplied, rows dated on or after ``after`` are returned
+    instead, however many ``weeks`` ago, e.g. those newer than the history a
+    client has persisted. Rows dated before the ``X-Usage-Last-Date`` response
+    header are final.
+
+    ``granularity`` and ``version_level`` roll the day/exact-version rows up
+    server-side. With ``since``, a bucket straddling the boundary is split
+    across responses, so callers merging deltas should sum matching rows.
+
+    Responses carry an ``ETag``; a matching ``If-None-Match`` yields ``304``.
+    The ``Accept`` header selects row-wise JSON (default), columnar JSON
+    (parallel arrays) or an Apache Arrow IPC stream.
     """
     if not await project_exists(project):
         raise HTTPException(status_code=404, detail=f'Project {project} not found.')
 
+    media_type = negotiate(request.headers.get('Accept'))
     start_time = now()
     redis = request.app.cache
+    headers = {'Cache-Control': _usage_cache_control(since), 'Vary': 'Accept, Accept-Encoding'}
 
-    response_key = usage_key(project, weeks, since)
-    cached_response = await redis.get(response_key)
+    response_key = usage_key(
+        project, weeks, since, granularity.value, version_level and version_level.value, after
+    )
+    # the preferred content-coding if stored, else gzip (always stored)
+    accepted = codec.accepted_encodings(request.headers.get('Accept-Encoding'))
+    cached_response = None
+    for encoding in dict.fromkeys([*accepted[:1], 'gzip'] if media_type == JSON else ['gzip']):
+        (cached_response,) = await _get_raw(redis, encoded_key(response_key, encoding))
+        if cached_response:
+            break
+    metrics.cache_result('usage_response', cached_response is not None)
     if cached_response:
-        return json.loads(cached_response)
-
-    cache_key = historical_key(project)
+        etag, headers['X-Usage-Last-Date'], data = _unpack_response(cached_response)
+        return _usage_response({encoding: data}, etag, media_type, request, headers)
 
-    data, oldest_date, last_date = await _read_cache(redis, cache_key)
-    logger.debug(
-        'Cache %s for %s: oldest=%s last=%s rows=%d',
-        'hit' if last_date is not None else 'miss',
+    (raw_historical,) = await _get_raw(redis, historical_key(project))
+    result, etag, headers['X-Usage-Last-Date'], body, compressed = await _assemble_usage(
+        redis,
         project,
-        oldest_date.date() if oldest_date else None,
-        last_date.date() if last_date else None,
-        len(data),
+        raw_historical,
+        start_time=start_time,
+        weeks=weeks,
+        since=since,
+        granularity=granularity,
+        version_level=version_level,
+        response_key=response_key,
+        after=after,
     )
-
-    requested_start = start_time - timedelta(weeks=weeks)
-    provisional_boundary = start_time - timedelta(hours=MAX_SESSION_HOURS)
-
-    data, oldest_date, last_date, dirty = await _extend_historical(
-        project, data, oldest_date, last_date, requested_start, provisional_boundary
-    )
-    if dirty:
-        await _write_cache(redis, cache_key, data, oldest_date, last_date)
-
-    cutoff = requested_start.date().isoformat()
-    if since is not None:
-        since_str = since.isoformat()
-        result = [r for r in data if cutoff <= r['date'] < since_str]
-    else:
-        # Provisional — always fresh (too recent to cache)
-        provisional = await get_viz_data(project, start_ts=last_date + timedelta(milliseconds=1))
-        result = [r for r in data if r['date'] >= cutoff] + provisional
-
-    await redis.set(response_key, json.dumps(result), ex=RESPONSE_TTL)
-    return result
+    return _usage_response(compressed, etag, media_type, request, headers, body=body, rows=result)
 
 
 @router.post(
@@ -229,41 +477,23 @@ async def add_breadcrumb(
     if not await project_exists(body.project):
         raise HTTPException(status_code=400, detail='Project is not registered.')
 
-    context = Context(
-        user_id=body.ctx.user_id,
-        session_id=body.ctx.session_id,
-        platform=body.ctx.platform,
-        container=body.ctx.container,
-        is_ci=body.ctx.is_ci,
-    )
-    process = Process(
-        status=body.proc.status,
-        status_desc=body.proc.status_desc,
-        error_type=body.proc.error_type,
-        error_desc=body.proc.error_desc,
-    )
-    project = Project(
-        project=body.project,
-        project_version=body.project_version,
-        language=body.language,
-        language_version=body.language_version,
-        timestamp=now(),
-        context=context,
-        process=process,
-    )
+    crumb = body.to_crumb()
 
     ip = request.client.host if request.client else None
 
     if wait:
         try:
-            await ingest_project(project, ip)
+            await ingest_project(crumb, ip)
             response.status_code = 200
         except Exception as e:
-            logger.error(f'Error ingesting project {project.project}: {e}')
+            logger.error(f'Error ingesting project {crumb.project}: {e}')
             response.status_code = 500
             return BreadcrumbResponse(success=False, message='Error during ingestion.')
     else:
-        background_tasks.add_task(ingest_project, project, ip)
+        # counted as in flight, unlike the wait=true ingest: the backlog is background work
+        background_tasks.add_task(
+            track_in_flight('ingest')(tracing.background(ingest_project)), crumb, ip
+        )
 
     return BreadcrumbResponse(success=True)
 
@@ -324,3 +554,27 @@ async def issue_token(body: IssueTokenRequest):
 async def revoke_token_endpoint(body: RevokeTokenRequest):
     revoked = await revoke_token(body.token)
     return RevokeTokenResponse(success=revoked)
+
+
+@router.get(
+    '/admin/slow-queries',
+    response_model=SlowQueriesResponse,
+    dependencies=[Depends(require_access(root=True))],
+)
+async def list_slow_queries(limit: int = 10, order: SlowQueryOrder = SlowQueryOrder.max_ms):
+    """Slowest statements recorded by this worker, with parameter values redacted."""
+    queries = [
+        SlowQueryModel(**vars(q))
+        for q in slowlog.top_slow_queries(limit=max(limit, 1), order=order.value)
+    ]
+    return SlowQueriesResponse(success=True, threshold_ms=slowlog.SLOW_QUERY_MS, queries=queries)
+
+
+@router.get(
+    '/admin/loop-stats',
+    response_model=LoopStatsResponse,
+    dependencies=[Depends(require_access(root=True))],
+)
+async def get_loop_stats():
+    """Loop lag over the last minute, blocking stalls and in-flight background tasks."""
+    return LoopStatsResponse(success=True, pid=os.getpid(), **loop_stats())
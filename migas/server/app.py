@@ -1,5 +1,8 @@
+import asyncio
+import contextlib
 import logging.config
 import os
+import time
 import typing as ty
 from contextlib import asynccontextmanager
 
@@ -7,12 +10,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.requests import Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
-from strawberry.fastapi import GraphQLRouter
 
-from . import __version__, __root__
+from . import __version__, __root__, metrics, tracing
 from .api.routes import router as api_router
 from .connections import (
     get_db_engine,
@@ -21,23 +22,36 @@ from .connections import (
     get_mmdb_reader,
     close_geoloc_dbs,
 )
+from .extensions import PersistedQueryRouter
+from .loaders import get_graphql_context
+from .logs import start_queue_logging
+from .monitor import start_loop_monitor
 from .models import init_db
 from .schema import SCHEMA
+from .staticfiles import PrecompressedStaticFiles
+from .utils import env_to_bool
 
 
 LOGGING_CONFIG = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {'default': {'format': 'INFO:     %(name)s - %(message)s'}},
+    'formatters': {
+        'default': {'format': 'INFO:     %(name)s - %(message)s'},
+        'json': {'()': 'migas.server.logs.JsonFormatter'},
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'default',
+            'formatter': 'json'
+            if os.getenv('MIGAS_LOG_FORMAT', '').lower() == 'json'
+            else 'default',
             'stream': 'ext://sys.stdout',
         }
     },
     'loggers': {'migas': {'handlers': ['console'], 'level': 'INFO'}},
 }
+# bounds the rendered pages kept per worker, as they are keyed by Host header
+MAX_CACHED_PAGES = 32
 
 
 @asynccontextmanager
@@ -49,6 +63,11 @@ async def lifespan(
 ):
     """Handle startup and shutdown logic"""
     logging.config.dictConfig(LOGGING_CONFIG)
+    # Write logs from a background thread
+    log_listener = start_queue_logging('migas')
+    tracer_provider = tracing.setup_tracing()
+    # Loop lag, in-flight background ingests and blocking calls
+    loop_monitor = start_loop_monitor()
     # Connect to Redis
     app.cache = await get_redis_connection()
     # Connect to PostgreSQL and initialize tables
@@ -57,15 +76,31 @@ async def lifespan(
     # Establish aiohttp session
     app.requests = await get_requests_session()
     app.geodbs = await get_mmdb_reader()
+    # Keep the /api/usage historical caches warm (opt-in)
+    warmup = None
+    if env_to_bool('MIGAS_CACHE_WARMUP'):
+        from .warmup import DEFAULT_WARMUP_WEEKS, warm_usage_cache_daily
+
+        weeks = int(os.getenv('MIGAS_CACHE_WARMUP_WEEKS', DEFAULT_WARMUP_WEEKS))
+        warmup = asyncio.create_task(warm_usage_cache_daily(weeks))
     if on_startup:
         await on_startup(app)
     yield
     if on_shutdown:
         await on_shutdown(app)
+    if warmup is not None:
+        warmup.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warmup
     await app.cache.aclose()
     await app.db.dispose()
     await app.requests.close()
     await close_geoloc_dbs()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
+    if tracer_provider is not None:
+        tracer_provider.shutdown()
+    log_listener.stop()
 
 
 def create_app(lifespan_func=lifespan, **lifespan_kwargs) -> FastAPI:
@@ -74,7 +109,7 @@ def create_app(lifespan_func=lifespan, **lifespan_kwargs) -> FastAPI:
         version=__version__,
         lifespan=lambda app: lifespan_func(app, **lifespan_kwargs),
     )
-    graphql_app = GraphQLRouter(SCHEMA)
+    graphql_app = PersistedQueryRouter(SCHEMA, context_getter=get_graphql_context)
     app.include_router(graphql_app, prefix='/graphql')
     app.include_router(api_router)
 
@@ -92,6 +127,33 @@ def create_app(lifespan_func=lifespan, **lifespan_kwargs) -> FastAPI:
             response.headers[name] = value
         return response
 
+    if metrics.ENABLED:
+
+        @app.middleware('http')
+        async def record_request_metrics(request: Request, call_next):
+            start = time.perf_counter()
+            response = await call_next(request)
+            metrics.REQUEST_LATENCY.labels(
+                request.method, metrics.route_label(request.scope), response.status_code
+            ).observe(time.perf_counter() - start)
+            return response
+
+        @app.get('/metrics', include_in_schema=False)
+        async def get_metrics():
+            payload, content_type = metrics.render_metrics()
+            return Response(payload, media_type=content_type)
+
+    if tracing.ENABLED and not tracing.FASTAPI_TRACES_REQUESTS:
+
+        @app.middleware('http')
+        async def trace_request(request: Request, call_next):
+            with tracing.request_span(request.method, request.headers) as span:
+                response = await call_next(request)
+                tracing.name_request_span(
+                    span, request.method, metrics.route_label(request.scope), response.status_code
+                )
+            return response
+
     # only add scout monitoring if environment variables are present
     if all(os.getenv(x) for x in ('SCOUT_NAME', 'SCOUT_MONITOR', 'SCOUT_KEY')):
         from scout_apm.async_.starlette import ScoutMiddleware
@@ -100,24 +162,39 @@ def create_app(lifespan_func=lifespan, **lifespan_kwargs) -> FastAPI:
 
     # TODO: Create separate app for frontend?
     static = str(__root__ / '..' / 'static')
-    app.mount('/static', StaticFiles(directory=static), name='static')
+    # assets are fingerprinted once, so serve them as they are while developing
+    static_files = PrecompressedStaticFiles(
+        directory=static, fingerprint=not os.getenv('MIGAS_DEV')
+    )
+    app.mount('/static', static_files, name='static')
     templates = Jinja2Templates(directory=static)
+    templates.env.globals['asset'] = static_files.asset
+    # (template, base URL) -> rendered page; the base URL follows the Host header
+    pages: dict[tuple[str, str], str] = {}
+
+    def render_page(request: Request, name: str) -> HTMLResponse:
+        """Render a page once per base URL, or on every request in dev mode."""
+        dev_mode = bool(os.getenv('MIGAS_DEV'))
+        key = (name, str(request.base_url))
+        if dev_mode or (page := pages.get(key)) is None:
+            page = templates.get_template(name).render(request=request, dev_mode=dev_mode)
+            if not dev_mode:
+                if len(pages) >= MAX_CACHED_PAGES:
+                    pages.pop(next(iter(pages)))
+                pages[key] = page
+        return HTMLResponse(page)
 
     @app.get('/', response_class=HTMLResponse)
     async def home(request: Request):
-        return templates.TemplateResponse(request, 'home.html')
+        return render_page(request, 'home.html')
 
     @app.get('/viz', response_class=HTMLResponse)
     async def viz(request: Request):
-        return templates.TemplateResponse(
-            request, 'viz.html', {'dev_mode': bool(os.getenv('MIGAS_DEV'))}
-        )
+        return render_page(request, 'viz.html')
 
     @app.get('/viz/dashboard', response_class=HTMLResponse)
     async def viz_dashboard(request: Request):
-        return templates.TemplateResponse(
-            request, 'dashboard.html', {'dev_mode': bool(os.getenv('MIGAS_DEV'))}
-        )
+        return render_page(request, 'dashboard.html')
 
     return app
 
@@ -8,12 +8,51 @@ viz_prefix = 'migas:viz'
 # Short TTL to avoid DB queries on dashboard reloads
 RESPONSE_TTL = 60
 
+# Browser cache lifetime for historical-only (``since=``) usage responses.
+# Rows older than the provisional window never change, so these can be reused
+# for a day; fresh responses must always be revalidated via ``If-None-Match``.
+HISTORICAL_MAX_AGE = 86400
+
+# Automatic persisted queries (GraphQL documents keyed by SHA-256)
+apq_prefix = 'migas:apq'
+PERSISTED_QUERY_TTL = 30 * 86400
+
 
 def historical_key(project: str) -> str:
     """Key for the per-project historical usage histogram (no TTL)."""
     return f'{viz_prefix}:hist:{project}'
 
 
-def usage_key(project: str, weeks: int, since: date | None) -> str:
-    """Key for the assembled ``/api/usage`` response, varying by query params."""
-    return f'{viz_prefix}:usage:{project}:{weeks}:{since.isoformat() if since else ""}'
+def usage_key(
+    project: str,
+    weeks: int,
+    since: date | None,
+    granularity: str = 'day',
+    version_level: str | None = None,
+    after: date | None = None,
+) -> str:
+    """Key for the assembled ``/api/usage`` response, varying by query params.
+
+    The ``v5`` entries hold the ETag, the end of the cached history and the
+    gzipped JSON-encoded rows, on separate lines. Other content-codings are
+    stored under `encoded_key`.
+    """
+    return (
+        f'{viz_prefix}:usage:v5:{project}:{weeks}:{since.isoformat() if since else ""}'
+        f':{granularity}:{version_level or ""}:{after.isoformat() if after else ""}'
+    )
+
+
+def encoded_key(response_key: str, encoding: str) -> str:
+    """Key for a content-coding of a cached ``/api/usage`` response (gzip is the plain key)."""
+    return response_key if encoding == 'gzip' else f'{response_key}:{encoding}'
+
+
+def warmup_key(day: date) -> str:
+    """Lock ensuring a single worker warms the usage caches for a provisional boundary."""
+    return f'{viz_prefix}:warmup:{day.isoformat()}'
+
+
+def persisted_query_key(sha256: str) -> str:
+    """Key for a persisted GraphQL query, refreshed whenever a client re-registers it."""
+    return f'{apq_prefix}:{sha256}'
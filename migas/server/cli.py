@@ -33,5 +33,39 @@ def main(argv=None):
     uvicorn.run('migas.server.app:app', **vars(pargs))
 
 
+def get_warm_cache_parser():
+    from argparse import ArgumentParser
+
+    from .warmup import DEFAULT_WARMUP_WEEKS
+
+    parser = ArgumentParser(description='Pre-fill the /api/usage historical caches')
+    parser.add_argument(
+        '--weeks',
+        default=DEFAULT_WARMUP_WEEKS,
+        type=int,
+        help='how far back to fill each project (default: %(default)s)',
+    )
+    return parser
+
+
+def warm_cache(argv=None):
+    import asyncio
+
+    pargs = get_warm_cache_parser().parse_args(argv)
+
+    async def _warm():
+        from .connections import get_db_engine, get_redis_connection
+        from .warmup import warm_usage_cache
+
+        try:
+            return await warm_usage_cache(pargs.weeks)
+        finally:
+            await (await get_redis_connection()).aclose()
+            await (await get_db_engine()).dispose()
+
+    warmed = asyncio.run(_warm())
+    print(f'Warmed usage cache for {warmed} project(s)')
+
+
 if __name__ == '__main__':
     sys.exit(main(sys.argv[1:]))
@@ -12,6 +12,7 @@ import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 from .connection_context import get_connection_context
+from . import metrics, slowlog, tracing
 from .utils import env_to_bool
 
 logger = logging.getLogger('migas')
@@ -68,7 +69,9 @@ async def get_redis_connection() -> redis.Redis:
         rkwargs = {'decode_responses': True}
         if os.getenv('HEROKU_DEPLOYED') and uri.startswith('rediss://'):
             rkwargs['ssl_cert_reqs'] = None
-        mem_cache = redis.from_url(uri, **rkwargs)
+        mem_cache = tracing.instrument_redis(
+            metrics.instrument_redis(redis.from_url(uri, **rkwargs))
+        )
         # ensure the connection is valid
         try:
             await mem_cache.ping()
@@ -133,6 +136,7 @@ async def get_db_engine() -> AsyncEngine:
             db_url = db_url.set(query={'host': f'/cloudsql/{gcp_conn}/.s.PGSQL.5432'})
 
         db_engine = create_async_engine(db_url, echo=bool(os.getenv('MIGAS_DEV')))
+        db_engine = slowlog.instrument_engine(metrics.instrument_engine(db_engine))
         _set_val('db_engine', db_engine)
         _set_val('db_engine_loop', current_loop)
     return _get_val('db_engine')
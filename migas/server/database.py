@@ -4,9 +4,11 @@ from datetime import datetime, timedelta
 from sqlalchemy import distinct, func, select, true
 from sqlalchemy.dialects.postgresql import insert
 
+from . import metrics
 from .connections import gen_session, AsyncSession
 from .models import User, Crumb, projects, GeoLoc, Authentication
-from .types import Project, serialize
+from .tracing import traced
+from .types import CrumbRecord
 from .utils import now
 
 logger = logging.getLogger('migas')
@@ -17,6 +19,7 @@ logger = logging.getLogger('migas')
 MAX_SESSION_HOURS = 48
 
 
+@traced
 async def add_new_project(project: str) -> bool:
     """Add project to master projects table."""
     await insert_master(project)
@@ -24,12 +27,14 @@ async def add_new_project(project: str) -> bool:
 
 
 # Table insertion
+@traced
 async def insert_master(project: str, session: AsyncSession | None = None) -> None:
     """Add project to master table."""
     async with gen_session(session) as session:
         await session.execute(insert(projects).on_conflict_do_nothing(), {'project': project})
 
 
+@traced
 async def insert_crumb(
     project: str,
     *,
@@ -67,6 +72,7 @@ async def insert_crumb(
         )
 
 
+@traced
 async def insert_user(
     *,
     user_id: str,
@@ -90,6 +96,7 @@ async def insert_user(
         )
 
 
+@traced
 async def insert_query_geoloc(ip: str, session: AsyncSession | None = None) -> int | None:
     """
     Query geolocation database, and insert result into geoloc table if new.
@@ -131,50 +138,48 @@ async def insert_query_geoloc(ip: str, session: AsyncSession | None = None) -> i
         return res.scalar_one_or_none()
 
 
-async def ingest_project(project: Project, ip: str | None = None) -> None:
+@traced
+async def ingest_project(crumb: CrumbRecord, ip: str | None = None) -> None:
     """Dump information into database tables."""
-    data = await serialize(project.__dict__)
-    # check version lengths
-    for vers in ('project_version', 'language_version'):
-        if len(data[vers]) > 24:
-            logger.warning(f'Shortening {project.project} version: {data[vers]}')
-            data[vers] = data[vers][:24]
-
-    if not await project_exists(project.project):
-        logger.warning(f'Project {project.project} is not registered.')
+    if not await project_exists(crumb.project):
+        logger.warning(f'Project {crumb.project} is not registered.')
         return
 
-    geoloc_idx = await insert_query_geoloc(ip)
+    with metrics.INGEST_STAGE_LATENCY.labels('geoloc').time():
+        geoloc_idx = await insert_query_geoloc(ip)
     async with gen_session() as session:
         # 1. Upsert user (for foreign key availability)
-        if data['context']['user_id'] is not None:
-            await insert_user(
-                user_id=data['context']['user_id'],
-                user_type=data['context']['user_type'],
-                platform=data['context']['platform'],
-                container=data['context']['container'],
-                geoloc_idx=geoloc_idx,
-                session=session,
-            )
+        if crumb.user_id is not None:
+            with metrics.INGEST_STAGE_LATENCY.labels('user').time():
+                await insert_user(
+                    user_id=crumb.user_id,
+                    user_type=crumb.user_type,
+                    platform=crumb.platform,
+                    container=crumb.container,
+                    geoloc_idx=geoloc_idx,
+                    session=session,
+                )
 
         # 2. Insert crumb
-        await insert_crumb(
-            project.project,
-            version=data['project_version'],
-            language=data['language'],
-            language_version=data['language_version'],
-            timestamp=data['timestamp'],
-            user_id=data['context']['user_id'],
-            session_id=data['context']['session_id'],
-            status=data['process']['status'],
-            status_desc=data['process']['status_desc'],
-            error_type=data['process']['error_type'],
-            error_desc=data['process']['error_desc'],
-            is_ci=data['context']['is_ci'],
-            session=session,
-        )
+        with metrics.INGEST_STAGE_LATENCY.labels('crumb').time():
+            await insert_crumb(
+                crumb.project,
+                version=crumb.version,
+                language=crumb.language,
+                language_version=crumb.language_version,
+                timestamp=crumb.timestamp,
+                user_id=crumb.user_id,
+                session_id=crumb.session_id,
+                status=crumb.status,
+                status_desc=crumb.status_desc,
+                error_type=crumb.error_type,
+                error_desc=crumb.error_desc,
+                is_ci=crumb.is_ci,
+                session=session,
+            )
 
 
+@traced
 async def query_usage_by_datetimes(
     project_name: str,
     start: datetime,
@@ -195,6 +200,30 @@ async def query_usage_by_datetimes(
         return res.scalar_one_or_none() or 0
 
 
+@traced
+async def query_usage_by_projects(
+    project_names: list[str],
+    start: datetime,
+    end: datetime,
+    session: AsyncSession | None = None,
+    unique: bool = False,
+) -> dict[str, int]:
+    """Batched ``query_usage_by_datetimes``: one ``GROUP BY project`` over a shared window.
+
+    Projects without crumbs in the window are omitted from the result.
+    """
+    async with gen_session(session) as db_session:
+        counter = func.count(distinct(Crumb.user_id)) if unique else func.count()
+        query = (
+            select(Crumb.project, counter)
+            .where(Crumb.project.in_(project_names), Crumb.timestamp.between(start, end))
+            .group_by(Crumb.project)
+        )
+        res = await db_session.execute(query)
+        return {project: count for project, count in res.all()}
+
+
+@traced
 async def query_usage(project_name: str, session: AsyncSession | None = None) -> int:
     async with gen_session(session) as session:
         res = await session.execute(
@@ -203,6 +232,7 @@ async def query_usage(project_name: str, session: AsyncSession | None = None) ->
         return res.scalars().one()
 
 
+@traced
 async def query_usage_unique(project_name: str, session: AsyncSession | None = None) -> int:
     async with gen_session(session) as session:
         res = await session.execute(
@@ -211,6 +241,7 @@ async def query_usage_unique(project_name: str, session: AsyncSession | None = N
         return res.scalars().one()
 
 
+@traced
 async def query_projects(session: AsyncSession | None = None) -> list[str]:
     async with gen_session(session) as session:
         # Exclude sentinel 'master' project from general queries
@@ -220,12 +251,28 @@ async def query_projects(session: AsyncSession | None = None) -> list[str]:
         return res.scalars().all()
 
 
+@traced
 async def project_exists(project: str, session: AsyncSession | None = None) -> bool:
     async with gen_session(session) as session:
         res = await session.execute(projects.select().where(projects.c.project == project))
-        return bool(res.one_or_none())
+        exists = bool(res.one_or_none())
+    metrics.LOOKUPS.labels('project_exists', 'found' if exists else 'missing').inc()
+    return exists
+
+
+@traced
+async def filter_existing_projects(
+    names: list[str], session: AsyncSession | None = None
+) -> set[str]:
+    """Return the subset of ``names`` that are registered projects."""
+    async with gen_session(session) as db_session:
+        res = await db_session.execute(
+            select(projects.c.project).where(projects.c.project.in_(names))
+        )
+        return set(res.scalars().all())
 
 
+@traced
 async def get_viz_data(
     project_name: str,
     start_ts: datetime | None = None,
@@ -278,7 +325,7 @@ async def get_viz_data(
         .lateral('latest')
     )
 
-    # Stage 3: bucket by start date (day granularity); client rolls up further if needed.
+    # Stage 3: bucket by start date (day granularity); /api/usage rolls up further on request.
     date_bucket = func.date_trunc('day', subq_bounds.c.start_ts)
     date_str = func.to_char(date_bucket, 'YYYY-MM-DD').label('date')
 
@@ -305,6 +352,7 @@ async def get_viz_data(
         ]
 
 
+@traced
 async def valid_location_dbs(session: AsyncSession | None = None) -> tuple[bool, bool]:
     from .connections import get_mmdb_reader
 
@@ -319,6 +367,7 @@ def hash_token(token: str) -> str:
     return hashlib.blake2b(token.encode(), digest_size=32).hexdigest()
 
 
+@traced
 async def _get_auth_by_token(
     token: str, session: AsyncSession | None = None
 ) -> Authentication | None:
@@ -335,6 +384,7 @@ async def _get_auth_by_token(
         return res.scalar_one_or_none()
 
 
+@traced
 async def authenticate_token(
     token: str, require_root: bool = False, session: AsyncSession | None = None
 ) -> tuple[bool, list[str]]:
@@ -344,6 +394,7 @@ async def authenticate_token(
     async with gen_session(session) as session:
         auth = await _get_auth_by_token(token, session)
         if not auth:
+            metrics.LOOKUPS.labels('token', 'invalid').inc()
             return valid, projects_list
 
         auth.last_used = now()
@@ -355,9 +406,11 @@ async def authenticate_token(
             projects_list = [auth.project]
             valid = True
 
+    metrics.LOOKUPS.labels('token', 'valid' if valid else 'forbidden').inc()
     return valid, projects_list
 
 
+@traced
 async def get_tokens(
     project: str | None = None, session: AsyncSession | None = None
 ) -> list[Authentication]:
@@ -371,6 +424,7 @@ async def get_tokens(
         return res.scalars().all()
 
 
+@traced
 async def create_token(
     project: str, description: str | None = None, session: AsyncSession | None = None
 ) -> str:
@@ -390,6 +444,7 @@ async def create_token(
     return raw_token
 
 
+@traced
 async def revoke_token(token: str, session: AsyncSession | None = None) -> bool:
     """Deactivate a token."""
     async with gen_session(session) as session:
@@ -1,4 +1,5 @@
 from .auth import RequireRoot
 from .logging import LoggingExtension
+from .persisted import PersistedQueryRouter
 
-__all__ = ['LoggingExtension', 'RequireRoot']
+__all__ = ['LoggingExtension', 'PersistedQueryRouter', 'RequireRoot']
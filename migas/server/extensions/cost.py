@@ -0,0 +1,131 @@
+"""Static cost and depth analysis of GraphQL documents.
+
+Costs are assigned to root fields, since nested fields only read attributes of an
+already resolved result. A variable passed to ``unique`` is assumed to be true, so
+the cost of a document does not depend on its variables (and validation results
+can be cached).
+"""
+
+import os
+
+from graphql import (
+    SKIP,
+    BooleanValueNode,
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationRule,
+    VariableNode,
+)
+
+MAX_QUERY_COST = int(os.getenv('MIGAS_MAX_QUERY_COST', '50'))
+MAX_QUERY_DEPTH = int(os.getenv('MIGAS_MAX_QUERY_DEPTH', '5'))
+
+DEFAULT_FIELD_COST = 1
+FIELD_COSTS = {
+    'get_projects': 2,
+    'get_usage': 5,
+    'check_project': 5,
+    'add_project': 5,
+    '__schema': 10,
+    '__type': 2,
+    '__typename': 0,
+}
+# count(distinct user_id) over the requested window
+UNIQUE_USAGE_COST = 20
+
+
+def _field_cost(field: FieldNode) -> int:
+    name = field.name.value
+    if name == 'get_usage':
+        for arg in field.arguments or ():
+            if arg.name.value == 'unique' and (
+                isinstance(arg.value, VariableNode)
+                or (isinstance(arg.value, BooleanValueNode) and arg.value.value)
+            ):
+                return UNIQUE_USAGE_COST
+    return FIELD_COSTS.get(name, DEFAULT_FIELD_COST)
+
+
+def _fields(
+    selection_set: SelectionSetNode | None,
+    fragments: dict[str, FragmentDefinitionNode],
+    seen: frozenset[str] = frozenset(),
+):
+    """Yield the fields of a selection set, expanding fragments in place."""
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from _fields(selection.selection_set, fragments, seen)
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            if name in fragments and name not in seen:
+                yield from _fields(fragments[name].selection_set, fragments, seen | {name})
+
+
+def _depth(selection_set, fragments) -> int:
+    # introspection queries (e.g. from GraphiQL) are deep by design
+    return max(
+        (
+            1 + _depth(field.selection_set, fragments)
+            for field in _fields(selection_set, fragments)
+            if not field.name.value.startswith('__')
+        ),
+        default=0,
+    )
+
+
+def _fragments(document: DocumentNode) -> dict[str, FragmentDefinitionNode]:
+    return {
+        defn.name.value: defn
+        for defn in document.definitions
+        if isinstance(defn, FragmentDefinitionNode)
+    }
+
+
+def _cost(operation: OperationDefinitionNode, fragments) -> int:
+    return sum(_field_cost(field) for field in _fields(operation.selection_set, fragments))
+
+
+def operation_cost(document: DocumentNode | None, operation_name: str | None = None) -> int:
+    """Cost of the operation that will be executed from ``document``."""
+    if document is None:
+        return DEFAULT_FIELD_COST
+    fragments = _fragments(document)
+    for defn in document.definitions:
+        if isinstance(defn, OperationDefinitionNode) and (
+            operation_name is None or (defn.name and defn.name.value == operation_name)
+        ):
+            return _cost(defn, fragments)
+    return DEFAULT_FIELD_COST
+
+
+class QueryCostRule(ValidationRule):
+    """Reject operations over ``MIGAS_MAX_QUERY_COST`` or ``MIGAS_MAX_QUERY_DEPTH``."""
+
+    def enter_document(self, node: DocumentNode, *_args):
+        fragments = _fragments(node)
+        for defn in node.definitions:
+            if not isinstance(defn, OperationDefinitionNode):
+                continue
+            if (depth := _depth(defn.selection_set, fragments)) > MAX_QUERY_DEPTH:
+                self.report_error(
+                    GraphQLError(
+                        f'Query depth ({depth}) exceeds maximum depth ({MAX_QUERY_DEPTH})', defn
+                    )
+                )
+            if (cost := _cost(defn, fragments)) > MAX_QUERY_COST:
+                self.report_error(
+                    GraphQLError(
+                        f'Query cost ({cost}) exceeds maximum cost ({MAX_QUERY_COST})', defn
+                    )
+                )
+        return SKIP
@@ -0,0 +1,113 @@
+"""Fast path for persisted ``add_breadcrumb`` mutations.
+
+Breadcrumbs are nearly all of the ``/graphql`` traffic. When a client sends one of
+the canonical breadcrumb documents below as a persisted query, the variables are
+handed straight to the ``POST /api/breadcrumb`` model, skipping strawberry's
+parsing, validation, scalar coercion and extensions. Anything unexpected falls
+back to regular GraphQL execution, so errors keep their usual shape.
+"""
+
+import hashlib
+
+from graphql import GraphQLError
+from pydantic import ValidationError
+from strawberry.types import ExecutionResult
+
+from ..api.models import BreadcrumbRequest, ContextPayload, ProcessPayload
+from ..database import ingest_project, project_exists
+from ..monitor import track_in_flight
+from ..tracing import background
+from ..utils import get_client_ip
+from .logging import log_operation, should_log
+from .ratelimit import RateLimitError, check_rate_limit, check_request_size
+
+_BREADCRUMB_TEMPLATE = (
+    'mutation add_breadcrumb($project: String!, $project_version: String!, '
+    '$language: String!, $language_version: String!, $ctx: ContextInput!, '
+    '$proc: ProcessInput!) { add_breadcrumb(project: $project, '
+    'project_version: $project_version, language: $language, '
+    'language_version: $language_version, ctx: $ctx, proc: $proc) { %s } }'
+)
+# Document text -> selected BreadcrumbResult fields
+BREADCRUMB_DOCUMENTS = {
+    _BREADCRUMB_TEMPLATE % ' '.join(fields): fields
+    for fields in (('success', 'message'), ('success',))
+}
+BREADCRUMB_MUTATION = next(iter(BREADCRUMB_DOCUMENTS))
+
+# Every argument is non-null in the schema; leave any omission or addition to GraphQL
+_REQUIRED_VARIABLES = frozenset(
+    ('project', 'project_version', 'language', 'language_version', 'ctx', 'proc')
+)
+# Input objects, whose unknown fields are errors in GraphQL
+_INPUT_VARIABLES = {'ctx': ContextPayload, 'proc': ProcessPayload}
+
+# SHA-256 -> (document, selected fields)
+FAST_PATH_OPERATIONS = {
+    hashlib.sha256(document.encode()).hexdigest(): (document, fields)
+    for document, fields in BREADCRUMB_DOCUMENTS.items()
+}
+
+
+def _result(fields: tuple[str, ...], success: bool, message: str = '') -> ExecutionResult:
+    crumb = {'success': success, 'message': message}
+    return ExecutionResult(
+        data={'add_breadcrumb': {field: crumb[field] for field in fields}}, errors=None
+    )
+
+
+async def execute_breadcrumb(
+    fields: tuple[str, ...], variables: dict | None, context: dict
+) -> ExecutionResult | None:
+    """Run a canonical breadcrumb mutation, mirroring the ``add_breadcrumb`` resolver.
+
+    Returns None if the variables need full GraphQL handling instead, so that
+    both paths store the same crumb for the same request.
+    """
+    if not isinstance(variables, dict) or variables.keys() != _REQUIRED_VARIABLES:
+        return None
+    for name, model in _INPUT_VARIABLES.items():
+        value = variables[name]
+        if not isinstance(value, dict) or not value.keys() <= model.model_fields.keys():
+            return None
+    try:
+        body = BreadcrumbRequest.model_validate(variables)
+    except ValidationError:
+        return None
+    # GraphQL stores versions as sent, where the model replaces unusual ones
+    if (body.project_version, body.language_version) != (
+        variables['project_version'],
+        variables['language_version'],
+    ):
+        return None
+
+    request = context['request']
+    try:
+        await check_rate_limit(request)
+        await check_request_size(request)
+    except RateLimitError as e:
+        context['response'].status_code = e.status_code
+        return ExecutionResult(data=None, errors=[GraphQLError(e.message)])
+
+    if should_log():
+        log_operation(
+            'mutation',
+            'add_breadcrumb',
+            {
+                'project': body.project,
+                'project_version': body.project_version,
+                'status': body.proc.status.value,
+            },
+        )
+
+    if '/' not in body.project:
+        return _result(fields, False)
+    if not await project_exists(body.project):
+        return _result(fields, False, 'Project is not yet registered.')
+
+    context['background_tasks'].add_task(
+        track_in_flight('ingest')(background(ingest_project)),
+        body.to_crumb(),
+        get_client_ip(request),
+    )
+    return _result(fields, True)
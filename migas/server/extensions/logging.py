@@ -1,12 +1,47 @@
 import logging
+import os
+import random
 
-from graphql import OperationDefinitionNode
 from strawberry.extensions import SchemaExtension
 
-from ..graphql import _extract_field, _extract_from_ast
+from ..graphql import _extract_field, _extract_literals, _operation_label
+from ..utils import LRUCache
 
 logger = logging.getLogger('migas.server')
 
+# Fraction of successful operations to log; failed ones are always logged
+LOG_SAMPLE_RATE = float(os.getenv('MIGAS_LOG_SAMPLE_RATE', '1.0'))
+
+# (field, nested_key) pairs reported for every operation
+LOG_FIELDS = (('project', None), ('project_version', None), ('status', 'proc'))
+
+# Query text -> (operation label, inline literal values)
+_document_summaries = LRUCache(int(os.getenv('MIGAS_DOCUMENT_CACHE_SIZE', '256')))
+
+
+def _summarize(query, document) -> tuple[str | None, dict[str, str | None]]:
+    """Walk a parsed document once; the result is reused for identical query text."""
+    if isinstance(query, str) and (summary := _document_summaries.get(query)) is not None:
+        return summary
+    summary = _operation_label(document), _extract_literals(document, LOG_FIELDS)
+    if isinstance(query, str):
+        _document_summaries[query] = summary
+    return summary
+
+
+def should_log(failed: bool = False) -> bool:
+    """Sampling decision, made before any work is spent on the log record."""
+    return failed or LOG_SAMPLE_RATE >= 1 or random.random() < LOG_SAMPLE_RATE
+
+
+def log_operation(op_type: str, op_name: str, values: dict) -> None:
+    """Log an operation; the fields are also attached for structured (JSON) output."""
+    parts = [f'{op_type.upper()} {op_name}']
+    parts.extend(f'{field}={val}' for field, val in values.items())
+    logger.info(
+        ' | '.join(parts), extra={'graphql': {'type': op_type, 'operation': op_name, **values}}
+    )
+
 
 class LoggingExtension(SchemaExtension):
     """Log GraphQL operation details: type, name, project, version, status."""
@@ -15,32 +50,16 @@ class LoggingExtension(SchemaExtension):
         yield
 
         ctx = self.execution_context
-        op_type = ctx.operation_type.value if ctx.operation_type else 'unknown'
-        op_name = ctx.operation_name
-        document = ctx.graphql_document
-
-        if not op_name and document:
-            for defn in document.definitions:
-                if isinstance(defn, OperationDefinitionNode) and defn.selection_set:
-                    selections = defn.selection_set.selections
-                    if selections:
-                        op_name = f'[{selections[0].name.value}]'
-                        break
-
-        op_name = op_name or '<anonymous>'
-        variables = ctx.variables or {}
-
-        def _extract(field, nested_key=None):
-            "Helper for variable / AST extraction"
-            return _extract_field(variables, field, nested_key=nested_key) or _extract_from_ast(
-                document, field, nested_key=nested_key
-            )
+        if not should_log(failed=bool(ctx.result and ctx.result.errors)):
+            return
 
-        parts = [f'{op_type.upper()} {op_name}']
-        log_vals = [('project', None), ('project_version', None), ('status', 'proc')]
-
-        for field, nested_key in log_vals:
-            val = _extract(field, nested_key)
-            parts.append(f'{field}={val}')
+        op_type = ctx.operation_type.value if ctx.operation_type else 'unknown'
+        label, literals = _summarize(ctx.query, ctx.graphql_document)
+        op_name = ctx.operation_name or label or '<anonymous>'
 
-        logger.info(' | '.join(parts))
+        variables = ctx.variables or {}
+        values = {
+            field: _extract_field(variables, field, nested_key=nested_key) or literals[field]
+            for field, nested_key in LOG_FIELDS
+        }
+        log_operation(op_type, op_name, values)
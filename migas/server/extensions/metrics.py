@@ -0,0 +1,21 @@
+import time
+
+from strawberry.extensions import SchemaExtension
+
+from .. import metrics
+from ..graphql import _root_field
+
+
+class OperationMetrics(SchemaExtension):
+    """Record GraphQL operation latency, labelled by root field."""
+
+    def on_operation(self):
+        start = time.perf_counter()
+        yield
+        ctx = self.execution_context
+        # Only validated documents give a bounded set of label values
+        if ctx.pre_execution_errors or ctx.graphql_document is None:
+            operation = 'invalid'
+        else:
+            operation = _root_field(ctx.graphql_document) or 'unknown'
+        metrics.GRAPHQL_LATENCY.labels(operation).observe(time.perf_counter() - start)
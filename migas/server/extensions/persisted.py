@@ -0,0 +1,165 @@
+"""Automatic Persisted Queries (APQ) for the GraphQL endpoint.
+
+Follows the Apollo protocol: a client first sends only
+``extensions.persistedQuery.sha256Hash``; on a ``PERSISTED_QUERY_NOT_FOUND`` error
+it retries with the full query, which is verified and stored under its hash.
+
+Registering is rate limited like any other request, and only documents of at most
+``MAX_QUERY_LENGTH`` characters that pass validation are stored; others are
+executed (or rejected) as usual, without being persisted.
+"""
+
+import hashlib
+import logging
+import time
+
+from graphql import GraphQLError, GraphQLSchema, parse, specified_rules, validate
+from strawberry.fastapi import GraphQLRouter
+from strawberry.types import ExecutionResult
+
+from .. import metrics
+from ..cache import PERSISTED_QUERY_TTL, persisted_query_key
+from ..connections import get_redis_connection
+from ..utils import LRUCache
+from .cost import QueryCostRule
+from .fastpath import FAST_PATH_OPERATIONS, execute_breadcrumb
+from .ratelimit import RATE_LIMIT_CHARGED, RateLimitError, check_rate_limit, check_request_size
+
+logger = logging.getLogger('migas')
+
+# Per-process copy of the most recently used queries, in front of Redis
+LOCAL_CACHE_SIZE = 256
+_local_queries: LRUCache = LRUCache(LOCAL_CACHE_SIZE)
+# Longest document that is persisted
+MAX_QUERY_LENGTH = 2500
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message: str, code: str, status_code: int = 400):
+        self.message = message
+        self.code = code
+        self.status_code = status_code
+        super().__init__(self.message)
+
+    def as_graphql_error(self) -> GraphQLError:
+        return GraphQLError(self.message, extensions={'code': self.code})
+
+
+class PersistedQueryNotFoundError(PersistedQueryError):
+    def __init__(self):
+        # Not a client error: the client is expected to retry with the full query
+        super().__init__('PersistedQueryNotFound', 'PERSISTED_QUERY_NOT_FOUND', status_code=200)
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+async def _lookup(sha: str) -> str | None:
+    if (query := _local_queries.get(sha)) is not None:
+        return query
+
+    if (cache := await get_redis_connection()) is None:
+        return None
+    query = await cache.get(persisted_query_key(sha))
+    if query is not None:
+        _local_queries[sha] = query
+    return query
+
+
+def _is_valid(query: str, schema: GraphQLSchema) -> bool:
+    """Whether ``query`` parses and passes the validation rules of the endpoint."""
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return False
+    return not validate(schema, document, [*specified_rules, QueryCostRule])
+
+
+async def _store(sha: str, query: str) -> None:
+    _local_queries[sha] = query
+    if (cache := await get_redis_connection()) is None:
+        return
+    await cache.set(persisted_query_key(sha), query, ex=PERSISTED_QUERY_TTL)
+
+
+async def resolve_persisted_query(
+    query: str | None, persisted: dict, schema: GraphQLSchema
+) -> str:
+    """Return the query text for a request carrying ``extensions.persistedQuery``.
+
+    A request with both the query and its hash registers the query, if it is short
+    enough and valid against ``schema``; a hash-only request is looked up. Raises
+    `PersistedQueryError` on invalid input or an unknown hash.
+    """
+    if not isinstance(persisted, dict) or persisted.get('version') != 1:
+        raise PersistedQueryError(
+            'Unsupported persisted query version', 'PERSISTED_QUERY_NOT_SUPPORTED'
+        )
+    sha = persisted.get('sha256Hash')
+    if not isinstance(sha, str):
+        raise PersistedQueryError('Missing persisted query hash', 'BAD_REQUEST')
+    sha = sha.lower()
+
+    if query is not None:
+        if query_hash(query) != sha:
+            raise PersistedQueryError('Provided sha does not match query', 'BAD_REQUEST')
+        if len(query) <= MAX_QUERY_LENGTH and _is_valid(query, schema):
+            await _store(sha, query)
+        return query
+
+    if (query := await _lookup(sha)) is None:
+        raise PersistedQueryNotFoundError()
+    return query
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """`GraphQLRouter` that resolves persisted query hashes before execution.
+
+    Canonical breadcrumb mutations are answered by the fast path without going
+    through strawberry at all.
+    """
+
+    async def execute_single(
+        self, *, request_adapter, request_data, sub_response, context, **kwargs
+    ):
+        extensions = request_data.extensions or {}
+        if 'persistedQuery' in extensions:
+            persisted = extensions['persistedQuery']
+            sha = persisted.get('sha256Hash') if isinstance(persisted, dict) else None
+            operation = FAST_PATH_OPERATIONS.get(sha.lower() if isinstance(sha, str) else None)
+            if operation and request_data.query in (None, operation[0]):
+                document, fields = operation
+                if request_adapter.method == 'POST':
+                    start = time.perf_counter()
+                    result = await execute_breadcrumb(fields, request_data.variables, context)
+                    if result is not None:
+                        metrics.GRAPHQL_LATENCY.labels('add_breadcrumb').observe(
+                            time.perf_counter() - start
+                        )
+                        return result
+                request_data.query = document
+            else:
+                try:
+                    if request_data.query is not None:
+                        # Registering writes to Redis, so charge it up front, in place
+                        # of the RateLimiter
+                        await check_rate_limit(context['request'])
+                        await check_request_size(context['request'])
+                        context[RATE_LIMIT_CHARGED] = True
+                    request_data.query = await resolve_persisted_query(
+                        request_data.query, persisted, self.schema._schema
+                    )
+                except RateLimitError as e:
+                    sub_response.status_code = e.status_code
+                    return ExecutionResult(data=None, errors=[GraphQLError(e.message)])
+                except PersistedQueryError as e:
+                    sub_response.status_code = e.status_code
+                    return ExecutionResult(data=None, errors=[e.as_graphql_error()])
+        return await super().execute_single(
+            request_adapter=request_adapter,
+            request_data=request_data,
+            sub_response=sub_response,
+            context=context,
+            **kwargs,
+        )
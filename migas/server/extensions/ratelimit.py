@@ -4,10 +4,14 @@ import time
 
 from fastapi import Request
 
+from .. import metrics
 from ..connections import get_redis_connection
 
 logger = logging.getLogger('migas')
 
+# GraphQL context flag of requests already charged before execution
+RATE_LIMIT_CHARGED = 'rate_limit_charged'
+
 
 class RateLimitError(Exception):
     def __init__(self, message: str, status_code: int = 429):
@@ -32,10 +36,23 @@ async def check_request_size(request: Request, max_size: int = None) -> None:
 
     body = await request.body()
     if len(body) > max_size:
+        metrics.RATE_LIMITED.labels('size').inc()
         raise RequestTooLargeError(f'Request body ({len(body)}) exceeds maximum size ({max_size})')
 
 
-async def check_rate_limit(request: Request, window: int = None, max_requests: int = None) -> None:
+def _request_cost(member: str) -> int:
+    # Members are `<timestamp>` (cost 1) or `<timestamp>:<cost>`
+    _, _, cost = str(member).partition(':')
+    return int(cost) if cost else 1
+
+
+async def check_rate_limit(
+    request: Request, window: int = None, max_requests: int = None, cost: int = 1
+) -> None:
+    """Charge ``cost`` against the client's budget of ``max_requests`` per sliding ``window``.
+
+    Plain requests cost 1; GraphQL operations are charged their query cost.
+    """
     if os.getenv('MIGAS_BYPASS_RATE_LIMIT'):
         return
 
@@ -52,17 +69,19 @@ async def check_rate_limit(request: Request, window: int = None, max_requests: i
     host = get_client_ip(request)
     key = f'rate-limit-{host}'
     time_ = time.time()
+    member = time_ if cost == 1 else f'{time_}:{cost}'
 
     async with cache.pipeline(transaction=True) as pipe:
         pipe.zremrangebyscore(key, 0, time_ - window)
         pipe.zrange(key, 0, -1)
-        pipe.zadd(key, {time_: time_})
+        pipe.zadd(key, {member: time_})
         pipe.expire(key, window)
         res = await pipe.execute()
 
-    timestamps = res[1]
-    if len(timestamps) >= max_requests:
+    used = sum(_request_cost(m) for m in res[1])
+    if used + cost > max_requests:
+        metrics.RATE_LIMITED.labels('requests').inc()
         logger.warning(
-            f'Rate limit exceeded for {host}: {len(timestamps)} requests in {window}s window'
+            f'Rate limit exceeded for {host}: {used} used of {max_requests} in {window}s window'
         )
         raise RateLimitExceededError()
@@ -4,6 +4,8 @@ from functools import wraps
 import aiohttp
 
 from .connections import get_redis_connection, get_requests_session, ClientSession
+from .metrics import cache_result
+from .tracing import span
 
 logger = logging.getLogger('migas')
 
@@ -36,12 +38,15 @@ async def fetch_response(
 ):
     request_headers = headers or {}
     request_headers['Content-Type'] = content_type
-    async with session.get(url, params=params) as response:
-        try:
-            res = await response.json(content_type=content_type)
-        except (aiohttp.ContentTypeError, ValueError):
-            res = await response.text()
-        status = response.status
+    with span('fetchers.fetch_response', {'url.full': url}) as sp:
+        async with session.get(url, params=params) as response:
+            try:
+                res = await response.json(content_type=content_type)
+            except (aiohttp.ContentTypeError, ValueError):
+                res = await response.text()
+            status = response.status
+        if sp is not None:
+            sp.set_attribute('http.response.status_code', status)
     return status, res
 
 
@@ -83,10 +88,36 @@ async def fetch_project_info(project: str) -> dict:
         await cache.expire(project, 21600)  # force fetch every 6 hours
 
     bad_versions = await cache.smembers(f'{project}/bad_versions') or set()
+    return _project_info(latest_version, bad_versions, cached=not cache_miss)
 
+
+async def fetch_projects_info(projects: list[str]) -> list[dict]:
+    """Batched ``fetch_project_info``.
+
+    Cached projects are read in a single Redis pipeline; only cache misses fall
+    back to querying GitHub.
+    """
+    cache = await get_redis_connection()
+    async with cache.pipeline(transaction=False) as pipe:
+        for project in projects:
+            pipe.hget(project, 'latest_version')
+            pipe.smembers(f'{project}/bad_versions')
+        res = await pipe.execute()
+
+    infos = []
+    for project, latest_version, bad_versions in zip(projects, res[::2], res[1::2]):
+        if (latest_version or 'unknown') == 'unknown':
+            infos.append(await fetch_project_info(project))
+        else:
+            infos.append(_project_info(latest_version, bad_versions or set(), cached=True))
+    return infos
+
+
+def _project_info(latest_version: str, bad_versions: set, cached: bool) -> dict:
+    cache_result('project_info', cached)
     return {
         'bad_versions': list(bad_versions),
-        'cached': not cache_miss,
+        'cached': cached,
         'success': latest_version not in ('unknown', 'forbidden'),
         'version': latest_version.lstrip('v'),
     }
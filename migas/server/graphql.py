@@ -26,27 +26,61 @@ def _extract_field(variables: dict, field: str, nested_key: str | None = None) -
             return str(nested[field])
 
 
-def _extract_from_ast(document, field: str, nested_key: str | None = None) -> str | None:
-    """Fallback: extract an inline literal argument value from the GraphQL AST.
+def _extract_literals(
+    document, fields: tuple[tuple[str, str | None], ...]
+) -> dict[str, str | None]:
+    """Extract inline literal argument values for several fields in one walk of the AST.
 
-    Used when queries are written with inline values instead of $variables.
+    `fields` holds `(field, nested_key)` pairs; the first match in document order wins.
     """
+    found = dict.fromkeys(field for field, _ in fields)
     if document is None:
-        return None
+        return found
     for defn in document.definitions:
         if not isinstance(defn, OperationDefinitionNode):
             continue
         for selection in defn.selection_set.selections:
-            for arg in selection.arguments:
-                if arg.name.value == field:
-                    if isinstance(arg.value, (StringValueNode, EnumValueNode)):
-                        return arg.value.value
-
-                # Nested object match (e.g. p: {project: "..."} or proc: {status: R})
-                if isinstance(arg.value, ObjectValueNode):
-                    if nested_key and arg.name.value != nested_key:
+            for arg in getattr(selection, 'arguments', None) or ():
+                for field, nested_key in fields:
+                    if found[field] is not None:
                         continue
-                    for obj_field in arg.value.fields:
-                        if obj_field.name.value == field:
-                            if isinstance(obj_field.value, (StringValueNode, EnumValueNode)):
-                                return obj_field.value.value
+                    if arg.name.value == field:
+                        if isinstance(arg.value, (StringValueNode, EnumValueNode)):
+                            found[field] = arg.value.value
+
+                    # Nested object match (e.g. p: {project: "..."} or proc: {status: R})
+                    if isinstance(arg.value, ObjectValueNode):
+                        if nested_key and arg.name.value != nested_key:
+                            continue
+                        for obj_field in arg.value.fields:
+                            if obj_field.name.value == field and isinstance(
+                                obj_field.value, (StringValueNode, EnumValueNode)
+                            ):
+                                found[field] = obj_field.value.value
+                                break
+    return found
+
+
+def _extract_from_ast(document, field: str, nested_key: str | None = None) -> str | None:
+    """Fallback: extract an inline literal argument value from the GraphQL AST.
+
+    Used when queries are written with inline values instead of $variables.
+    """
+    return _extract_literals(document, ((field, nested_key),))[field]
+
+
+def _root_field(document) -> str | None:
+    """Name of the first root field of the first operation in `document`."""
+    if document is None:
+        return None
+    for defn in document.definitions:
+        if isinstance(defn, OperationDefinitionNode) and defn.selection_set:
+            for selection in defn.selection_set.selections:
+                if name := getattr(selection, 'name', None):
+                    return name.value
+
+
+def _operation_label(document) -> str | None:
+    """Name an anonymous operation after its first root field, e.g. `[add_breadcrumb]`."""
+    if field := _root_field(document):
+        return f'[{field}]'
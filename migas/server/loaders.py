@@ -0,0 +1,63 @@
+"""Per-request DataLoaders for GraphQL resolvers.
+
+A single GraphQL document may ask for many projects or time windows; the loaders
+coalesce those resolver calls into one round trip per kind of lookup.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from strawberry.dataloader import DataLoader
+
+from .database import filter_existing_projects, query_usage_by_projects
+from .fetchers import fetch_projects_info
+from .utils import now
+
+# (project, start, end, unique)
+UsageKey = tuple[str, datetime, datetime, bool]
+
+
+async def load_project_exists(projects: list[str]) -> list[bool]:
+    existing = await filter_existing_projects(projects)
+    return [project in existing for project in projects]
+
+
+async def load_usage(keys: list[UsageKey]) -> list[int]:
+    """Count usage for every key, with one grouped query per distinct time window."""
+    windows: dict[tuple[datetime, datetime, bool], list[str]] = {}
+    for project, start, end, unique in keys:
+        windows.setdefault((start, end, unique), []).append(project)
+
+    counts = await asyncio.gather(
+        *(
+            query_usage_by_projects(projects, start, end, unique=unique)
+            for (start, end, unique), projects in windows.items()
+        )
+    )
+    by_window = dict(zip(windows, counts))
+    return [
+        by_window[(start, end, unique)].get(project, 0) for project, start, end, unique in keys
+    ]
+
+
+@dataclass
+class Loaders:
+    project_exists: DataLoader[str, bool] = field(
+        default_factory=lambda: DataLoader(load_fn=load_project_exists)
+    )
+    usage: DataLoader[UsageKey, int] = field(
+        default_factory=lambda: DataLoader(load_fn=load_usage)
+    )
+    project_info: DataLoader[str, dict] = field(
+        default_factory=lambda: DataLoader(load_fn=fetch_projects_info)
+    )
+
+
+async def get_graphql_context() -> dict:
+    """Extra GraphQL context; merged with strawberry's request/response defaults.
+
+    ``now`` is taken once per request, so that resolvers defaulting to it share
+    their loader keys.
+    """
+    return {'loaders': Loaders(), 'now': now()}
@@ -0,0 +1,98 @@
+"""Non-blocking log output.
+
+Records from the ``migas`` loggers are put on a bounded in-memory queue and
+formatted and written by a `QueueListener` thread, so a slow stdout (e.g. a log
+drain) never stalls the event loop. When the queue is full, records are dropped
+and counted rather than blocking.
+"""
+
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_QUEUE_SIZE = 10000
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message',
+    'asctime',
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra=`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'severity': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        entry.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRS)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """`QueueHandler` that never blocks: records are dropped when the queue is full."""
+
+    def __init__(self, queue_: queue.Queue):
+        super().__init__(queue_)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments; formatting (and tracebacks) is left to the listener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+
+        if self.dropped > self._reported:
+            notice = logging.LogRecord(
+                record.name,
+                logging.WARNING,
+                __file__,
+                0,
+                f'Dropped {self.dropped - self._reported} log record(s): log queue is full',
+                None,
+                None,
+            )
+            try:
+                self.queue.put_nowait(notice)
+                self._reported = self.dropped
+            except queue.Full:
+                pass
+
+
+def start_queue_logging(name: str = 'migas', maxsize: int | None = None) -> QueueListener:
+    """Move the handlers of logger ``name`` behind a queue, and start the listener thread.
+
+    Call ``.stop()`` on the returned listener to flush the queue on shutdown.
+    """
+    if maxsize is None:
+        maxsize = int(os.getenv('MIGAS_LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE))
+
+    logger = logging.getLogger(name)
+    handlers = list(logger.handlers)
+    queue_ = queue.Queue(maxsize=maxsize)
+    for handler in handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(DroppingQueueHandler(queue_))
+
+    listener = QueueListener(queue_, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,166 @@
+"""Prometheus metrics.
+
+Enabled with ``MIGAS_METRICS=1`` and the ``metrics`` extra (``prometheus-client``);
+otherwise every metric below is a no-op. With several workers (gunicorn or
+``uvicorn --workers``), point ``PROMETHEUS_MULTIPROC_DIR`` at an empty directory
+so ``/metrics`` aggregates across processes.
+"""
+
+import logging
+import os
+import time
+from contextlib import nullcontext
+
+from .utils import env_to_bool
+
+logger = logging.getLogger('migas')
+
+
+def _metrics_enabled() -> bool:
+    if not env_to_bool('MIGAS_METRICS'):
+        return False
+    try:
+        import prometheus_client  # noqa: F401
+    except ImportError:
+        logger.warning('MIGAS_METRICS is set, but prometheus-client is not installed')
+        return False
+    return True
+
+
+ENABLED = _metrics_enabled()
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+    def time(self):
+        return nullcontext()
+
+
+if ENABLED:
+    from prometheus_client import Counter, Histogram
+
+    REQUEST_LATENCY = Histogram(
+        'migas_request_duration_seconds',
+        'HTTP request latency, by route template',
+        ['method', 'route', 'status'],
+    )
+    GRAPHQL_LATENCY = Histogram(
+        'migas_graphql_operation_duration_seconds',
+        'GraphQL operation latency, by root field',
+        ['operation'],
+    )
+    INGEST_STAGE_LATENCY = Histogram(
+        'migas_ingest_stage_duration_seconds', 'Breadcrumb ingestion stage latency', ['stage']
+    )
+    LOOKUPS = Counter(
+        'migas_lookups_total', 'Project and token lookups, by outcome', ['lookup', 'result']
+    )
+    CACHE_REQUESTS = Counter(
+        'migas_cache_requests_total', 'Redis-backed cache reads, by outcome', ['cache', 'result']
+    )
+    REDIS_LATENCY = Histogram(
+        'migas_redis_command_duration_seconds', 'Redis command latency', ['command']
+    )
+    DB_LATENCY = Histogram(
+        'migas_db_statement_duration_seconds', 'Database statement latency', ['statement']
+    )
+    HISTORICAL_QUERIES = Counter(
+        'migas_usage_historical_queries_total',
+        'Usage histogram database queries, by cache extension direction',
+        ['direction'],
+    )
+    RATE_LIMITED = Counter(
+        'migas_rate_limited_total', 'Requests rejected by the rate limiter', ['reason']
+    )
+else:
+    REQUEST_LATENCY = GRAPHQL_LATENCY = INGEST_STAGE_LATENCY = _NoopMetric()
+    LOOKUPS = CACHE_REQUESTS = REDIS_LATENCY = DB_LATENCY = _NoopMetric()
+    HISTORICAL_QUERIES = RATE_LIMITED = _NoopMetric()
+
+
+def route_label(scope: dict) -> str:
+    """Route template for a handled request; raw paths would make label values unbounded."""
+    if (route := scope.get('route')) is None:
+        return 'unmatched'
+    if getattr(route, 'param_convertors', None):
+        return route.path
+    # Without path parameters the path is the template, including any router prefix
+    return scope['path']
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def instrument_redis(client):
+    """Time every command and pipeline sent through ``client``."""
+    if not ENABLED:
+        return client
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def timed_execute_command(*args, **options):
+        with REDIS_LATENCY.labels(str(args[0]).upper()).time():
+            return await execute_command(*args, **options)
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*a, **kw):
+            with REDIS_LATENCY.labels('PIPELINE').time():
+                return await execute(*a, **kw)
+
+        pipe.execute = timed_execute
+        return pipe
+
+    client.execute_command = timed_execute_command
+    client.pipeline = timed_pipeline
+    return client
+
+
+def instrument_engine(engine):
+    """Time every statement executed by an (async) SQLAlchemy engine."""
+    if not ENABLED:
+        return engine
+    from sqlalchemy import event
+
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('migas_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['migas_query_start'].pop()
+        DB_LATENCY.labels(statement.lstrip().split(None, 1)[0].upper()).observe(elapsed)
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def _discard(context):
+        # after_cursor_execute is skipped for failed statements
+        if context.connection is not None and context.connection.info.get('migas_query_start'):
+            context.connection.info['migas_query_start'].pop()
+
+    return engine
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition payload and content type, aggregated across workers if multiprocess."""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    registry = REGISTRY
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
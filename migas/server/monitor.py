@@ -0,0 +1,147 @@
+"""Event loop health.
+
+Background tasks (e.g. ``ingest_project``) run on the same loop as requests, so
+a backlog or a blocking call delays every request on the worker. This module
+tracks:
+
+- loop lag: how late a periodic ``asyncio.sleep`` wakes up;
+- the number of in-flight tasks per kind (see `track_in_flight`);
+- blocking: a watchdog thread logs the loop thread's stack whenever the loop has
+  not run for ``MIGAS_LOOP_BLOCK_MS``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from functools import wraps
+
+logger = logging.getLogger('migas')
+
+# Seconds between lag samples; 0 disables the monitor
+SAMPLE_INTERVAL = float(os.getenv('MIGAS_LOOP_MONITOR_INTERVAL', '0.5'))
+# Loop stalls reported by the watchdog; 0 disables it
+BLOCK_THRESHOLD_MS = float(os.getenv('MIGAS_LOOP_BLOCK_MS', '250'))
+# Lag statistics (and the periodic log line) cover this many seconds
+WINDOW = 60
+
+IN_FLIGHT: Counter[str] = Counter()
+
+
+def track_in_flight(kind: str):
+    """Count running calls of a coroutine function under ``IN_FLIGHT[kind]``."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            IN_FLIGHT[kind] += 1
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                IN_FLIGHT[kind] -= 1
+
+        return wrapper
+
+    return decorator
+
+
+class LoopMonitor:
+    """Samples the lag of the running loop, and watches it for blocking calls."""
+
+    def __init__(
+        self, interval: float = SAMPLE_INTERVAL, block_threshold_ms: float = BLOCK_THRESHOLD_MS
+    ):
+        self.interval = interval
+        self.block_threshold_ms = block_threshold_ms
+        self.samples: deque[float] = deque(maxlen=max(int(WINDOW / interval), 1))
+        self.blocked = 0
+        self._sampled = 0
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._sampler = asyncio.get_running_loop().create_task(self._sample())
+        if self.block_threshold_ms > 0:
+            self._watchdog = threading.Thread(
+                target=self._watch, name='migas-loop-watchdog', daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sampler
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _sample(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._last_tick = time.monotonic()
+            self.samples.append(max((self._last_tick - start - self.interval) * 1000, 0.0))
+            self._sampled += 1
+            if self._sampled % self.samples.maxlen == 0:
+                stats = self.stats()
+                logger.info(
+                    'Event loop lag: mean %.1f ms, max %.1f ms | in flight: %s',
+                    stats['lag_ms_mean'],
+                    stats['lag_ms_max'],
+                    stats['in_flight'] or 'none',
+                )
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.block_threshold_ms / 2000):
+            tick = self._last_tick
+            stalled_ms = (time.monotonic() - tick - self.interval) * 1000
+            if stalled_ms < self.block_threshold_ms or tick == reported:
+                continue
+            # once per stall: the tick only moves when the loop runs again
+            reported = tick
+            self.blocked += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else ''
+            logger.warning('Event loop blocked for over %.0f ms, at:\n%s', stalled_ms, stack)
+
+    def stats(self) -> dict:
+        samples = list(self.samples)
+        return {
+            'lag_ms': samples[-1] if samples else 0.0,
+            'lag_ms_mean': statistics.fmean(samples) if samples else 0.0,
+            'lag_ms_max': max(samples, default=0.0),
+            'blocked': self.blocked,
+            'in_flight': {kind: n for kind, n in IN_FLIGHT.items() if n},
+        }
+
+
+_monitor: LoopMonitor | None = None
+
+
+def start_loop_monitor() -> LoopMonitor | None:
+    """Start monitoring the running loop; ``await .stop()`` the result on shutdown."""
+    global _monitor
+    if SAMPLE_INTERVAL <= 0:
+        return None
+    _monitor = LoopMonitor()
+    _monitor.start()
+    return _monitor
+
+
+def loop_stats() -> dict:
+    if _monitor is None:
+        return {'in_flight': {kind: n for kind, n in IN_FLIGHT.items() if n}}
+    return _monitor.stats()
@@ -5,33 +5,38 @@ from packaging.version import Version as _Version
 import strawberry
 from graphql import ExecutionResult as GraphQLExecutionResult
 from graphql import GraphQLError
-from strawberry.extensions import SchemaExtension
+from strawberry.extensions import AddValidationRules, ParserCache, SchemaExtension, ValidationCache
 from strawberry.scalars import JSON
 from strawberry.schema.config import StrawberryConfig
 from strawberry.types import Info
 
-from .extensions.ratelimit import RateLimitError, check_rate_limit, check_request_size
+from .extensions.cost import QueryCostRule, operation_cost
+from .extensions.ratelimit import (
+    RATE_LIMIT_CHARGED,
+    RateLimitError,
+    check_rate_limit,
+    check_request_size,
+)
 
 from .database import (
     ingest_project,
     project_exists,
     query_projects,
-    query_usage_by_datetimes,
     add_new_project,
     create_token,
     revoke_token,
 )
+from . import metrics, tracing
 from .extensions import LoggingExtension, RequireRoot
-from .fetchers import fetch_project_info
+from .extensions.metrics import OperationMetrics
+from .monitor import track_in_flight
 from .types import (
     BreadcrumbResult,
     CheckProjectResult,
-    Context,
     ContextInput,
+    CrumbRecord,
     DateTime,
-    Process,
     ProcessInput,
-    Project,
     ProjectInput,
     TokenResult,
     Version,
@@ -40,7 +45,7 @@ from .types import (
     SafeStr,
     SafeStrScalar,
 )
-from .utils import get_client_ip, now
+from .utils import get_client_ip
 
 
 @strawberry.type
@@ -52,9 +57,11 @@ class Query:
         return projs
 
     @strawberry.field
-    async def check_project(self, project: str, project_version: str) -> CheckProjectResult:
+    async def check_project(
+        self, info: Info, project: str, project_version: str
+    ) -> CheckProjectResult:
         """Check version of project for latest version, developer notes, etc."""
-        fetched = await fetch_project_info(project)
+        fetched = await info.context['loaders'].project_info.load(project)
         is_flagged = project_version in fetched['bad_versions']
         return CheckProjectResult(
             success=fetched['success'],
@@ -65,7 +72,12 @@ class Query:
 
     @strawberry.field
     async def get_usage(
-        self, project: str, start: DateTime, end: DateTime | None = None, unique: bool = False
+        self,
+        info: Info,
+        project: str,
+        start: DateTime,
+        end: DateTime | None = None,
+        unique: bool = False,
     ) -> JSON:
         """
         Query project uses.
@@ -74,18 +86,19 @@ class Query:
         - `YYYY-MM-DD`
         - `YYYY-MM-DDTHH:MM:SSZ'
 
-        If `endtime` is not provided, current time is used.
+        If `endtime` is not provided, the time of the request is used.
         If `unique`, only unique users will be included.
         """
 
         if end is None:
-            end = now()
-        exists = await project_exists(project)
+            end = info.context['now']
+        loaders = info.context['loaders']
+        exists = await loaders.project_exists.load(project)
         if not exists:
             count = 0
             message = f'Project "{project}" is not being tracked'
         else:
-            count = await query_usage_by_datetimes(project, start, end, unique=unique)
+            count = await loaders.usage.load((project, start, end, unique))
             message = ''
         return {'hits': count, 'message': message, 'unique': unique, 'success': exists}
 
@@ -107,37 +120,17 @@ class Mutation:
             return BreadcrumbResult(success=False)
 
         # TODO: Check in-memory db rather than database
-        if not await project_exists(project):
+        if not await info.context['loaders'].project_exists.load(project):
             return BreadcrumbResult(success=False, message='Project is not yet registered.')
 
-        context = Context(
-            user_id=ctx.user_id,
-            session_id=ctx.session_id,
-            platform=ctx.platform,
-            container=ctx.container,
-            is_ci=ctx.is_ci,
-        )
-        process = Process(
-            status=proc.status,
-            status_desc=proc.status_desc,
-            error_type=proc.error_type,
-            error_desc=proc.error_desc,
-        )
-
-        project = Project(
-            project=project,
-            project_version=project_version,
-            language=language,
-            language_version=language_version,
-            timestamp=now(),
-            context=context,
-            process=process,
+        crumb = CrumbRecord.from_input(
+            project, project_version, language, language_version, ctx, proc
         )
 
         request = info.context['request']
         ip = get_client_ip(request)
         bg_tasks = info.context['background_tasks']
-        bg_tasks.add_task(ingest_project, project, ip)
+        bg_tasks.add_task(track_in_flight('ingest')(tracing.background(ingest_project)), crumb, ip)
         return BreadcrumbResult(success=True)
 
     @strawberry.field
@@ -147,39 +140,28 @@ class Mutation:
             return {'success': False}
 
         # TODO: Check in-memory db rather than database
-        if not await project_exists(p.project):
+        loaders = info.context['loaders']
+        if not await loaders.project_exists.load(p.project):
             return {'success': False}
 
-        # convert to Project and set defaults
-        project = Project(
-            project=p.project,
-            project_version=p.project_version,
-            language=p.language,
-            language_version=p.language_version,
-            timestamp=now(),
-            context=Context(
-                user_id=p.user_id,
-                session_id=p.session_id,
-                user_type=p.user_type,
-                platform=p.platform,
-                container=p.container,
-                is_ci=p.is_ci,
-            ),
-            process=Process(
-                status=p.status,
-                status_desc=p.status_desc,
-                error_type=p.error_type,
-                error_desc=p.error_desc,
-            ),
+        # ProjectInput carries the context and process fields itself
+        crumb = CrumbRecord.from_input(
+            p.project,
+            p.project_version,
+            p.language,
+            p.language_version,
+            p,
+            p,
+            user_type=p.user_type,
         )
 
-        fetched = await fetch_project_info(p.project)
+        fetched = await loaders.project_info.load(p.project)
 
         request = info.context['request']
         ip = get_client_ip(request)
         # return project info ASAP, assign data ingestion as background tasks
         bg_tasks = info.context['background_tasks']
-        bg_tasks.add_task(ingest_project, project, ip)
+        bg_tasks.add_task(track_in_flight('ingest')(tracing.background(ingest_project)), crumb, ip)
 
         return {
             'bad_versions': fetched['bad_versions'],
@@ -229,6 +211,10 @@ class RateLimiter(SchemaExtension):
     This extension verifies that incoming requests:
     - Have a reasonable sized request body
     - Are not clobbering the GQL endpoint
+
+    Every request is charged once up front, unless it already was (see
+    ``PersistedQueryRouter``); operations whose query cost is higher are charged
+    the remainder once the document has been validated.
     """
 
     def __init__(self, *args, **kwargs):
@@ -244,12 +230,14 @@ class RateLimiter(SchemaExtension):
         """
         Hook into the GraphQL request stack, and validate data at the start.
         """
-        request = self.execution_context.context['request']
-        response = self.execution_context.context['response']
+        context = self.execution_context.context
+        request = context['request']
+        response = context['response']
 
         try:
-            await check_rate_limit(request)
-            await check_request_size(request)
+            if not context.get(RATE_LIMIT_CHARGED):
+                await check_rate_limit(request)
+                await check_request_size(request)
         except RateLimitError as e:
             response.status_code = e.status_code
             self.execution_context.result = GraphQLExecutionResult(
@@ -257,11 +245,33 @@ class RateLimiter(SchemaExtension):
             )
         yield  # any logic after yield for post operation
 
+    async def on_execute(self):
+        ctx = self.execution_context
+        cost = operation_cost(ctx.graphql_document, ctx.operation_name)
+        if cost > 1 and ctx.result is None:
+            try:
+                await check_rate_limit(ctx.context['request'], cost=cost - 1)
+            except RateLimitError as e:
+                ctx.context['response'].status_code = e.status_code
+                ctx.result = GraphQLExecutionResult(data=None, errors=[GraphQLError(e.message)])
+        yield
+
+
+# Clients send a small, fixed set of documents; reuse their parsed & validated forms
+DOCUMENT_CACHE_SIZE = int(os.getenv('MIGAS_DOCUMENT_CACHE_SIZE', '256'))
 
 SCHEMA = strawberry.Schema(
     query=Query,
     mutation=Mutation,
-    extensions=[RateLimiter, LoggingExtension],
+    extensions=[
+        RateLimiter,
+        lambda: AddValidationRules([QueryCostRule]),
+        lambda: ParserCache(maxsize=DOCUMENT_CACHE_SIZE),
+        lambda: ValidationCache(maxsize=DOCUMENT_CACHE_SIZE),
+        LoggingExtension,
+        *([OperationMetrics] if metrics.ENABLED else []),
+        *([tracing.graphql_extension()] if tracing.ENABLED else []),
+    ],
     config=StrawberryConfig(
         auto_camel_case=False,
         scalar_map={
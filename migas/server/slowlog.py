@@ -0,0 +1,143 @@
+"""Slow-query log.
+
+Statements slower than ``MIGAS_SLOW_QUERY_MS`` are logged and aggregated per
+worker, by statement text. Parameter values are never stored, only their types.
+A fraction (``MIGAS_SLOW_QUERY_EXPLAIN_RATE``) of slow ``SELECT`` statements is
+re-run under ``EXPLAIN (ANALYZE, BUFFERS)`` on a separate connection, and the
+plan is kept with string literals removed.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from .utils import now
+
+logger = logging.getLogger('migas')
+
+SLOW_QUERY_MS = float(os.getenv('MIGAS_SLOW_QUERY_MS', '500'))
+EXPLAIN_RATE = float(os.getenv('MIGAS_SLOW_QUERY_EXPLAIN_RATE', '0'))
+# Distinct statements tracked per worker
+MAX_STATEMENTS = 200
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    # types of the parameters of the slowest execution
+    params: list[str] | None = None
+    last_seen: datetime | None = None
+    plan: str | None = None
+
+
+_slow_queries: dict[str, SlowQuery] = {}
+# keep references to running EXPLAIN tasks
+_explains: set[asyncio.Task] = set()
+
+
+def redact_params(parameters) -> list[str]:
+    """Replace parameter values by their type names."""
+    if isinstance(parameters, dict):
+        parameters = parameters.values()
+    elif parameters is None or isinstance(parameters, (str, bytes)):
+        parameters = [parameters] if parameters is not None else []
+    return [type(value).__name__ for value in parameters]
+
+
+def redact_plan(plan: str) -> str:
+    """Remove string literals (e.g. bound values of a custom plan) from an EXPLAIN output."""
+    return _STRING_LITERAL.sub("'?'", plan)
+
+
+def record(statement: str, parameters, elapsed_ms: float) -> SlowQuery | None:
+    """Record a statement, if slow; returns its entry."""
+    if elapsed_ms < SLOW_QUERY_MS:
+        return None
+    statement = ' '.join(statement.split())
+    if (entry := _slow_queries.get(statement)) is None:
+        if len(_slow_queries) >= MAX_STATEMENTS:
+            # forget the statement that has been the least slow
+            del _slow_queries[min(_slow_queries.values(), key=lambda q: q.max_ms).statement]
+        entry = _slow_queries[statement] = SlowQuery(statement)
+    entry.count += 1
+    entry.total_ms += elapsed_ms
+    entry.last_seen = now()
+    if elapsed_ms >= entry.max_ms:
+        entry.max_ms = elapsed_ms
+        entry.params = redact_params(parameters)
+    logger.warning('Slow query (%.0f ms): %s', elapsed_ms, statement[:500])
+    return entry
+
+
+def top_slow_queries(limit: int = 10, order: str = 'max_ms') -> list[SlowQuery]:
+    return sorted(_slow_queries.values(), key=lambda q: getattr(q, order), reverse=True)[:limit]
+
+
+def reset() -> None:
+    _slow_queries.clear()
+
+
+async def _explain(engine, entry: SlowQuery, statement: str, parameters) -> None:
+    try:
+        async with engine.connect() as conn:
+            res = await conn.exec_driver_sql(
+                f'EXPLAIN (ANALYZE, BUFFERS) {statement}',
+                parameters,
+                execution_options={'migas_slowlog': False},
+            )
+            entry.plan = redact_plan('\n'.join(row[0] for row in res))
+            await conn.rollback()
+    except SQLAlchemyError as e:
+        logger.warning('Could not EXPLAIN slow query: %s', e)
+
+
+def instrument_engine(engine):
+    """Time every statement executed by an (async) SQLAlchemy engine, recording slow ones."""
+    if SLOW_QUERY_MS <= 0:
+        return engine
+    from sqlalchemy import event
+
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, 'before_cursor_execute')
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('migas_slowlog_start', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, 'after_cursor_execute')
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['migas_slowlog_start'].pop()) * 1000
+        if not context.execution_options.get('migas_slowlog', True):
+            return
+        entry = record(statement, parameters, elapsed_ms)
+        if (
+            entry is not None
+            and not executemany
+            and statement.lstrip()[:6].upper() == 'SELECT'
+            and random.random() < EXPLAIN_RATE
+        ):
+            # EXPLAIN ANALYZE runs the statement again, so keep it off the request path
+            task = asyncio.get_running_loop().create_task(
+                _explain(engine, entry, statement, parameters)
+            )
+            _explains.add(task)
+            task.add_done_callback(_explains.discard)
+
+    @event.listens_for(sync_engine, 'handle_error')
+    def _discard(context):
+        # after_cursor_execute is skipped for failed statements
+        if context.connection is not None and context.connection.info.get('migas_slowlog_start'):
+            context.connection.info['migas_slowlog_start'].pop()
+
+    return engine
@@ -0,0 +1,114 @@
+"""Static files served in the best content-coding the client accepts.
+
+Text assets are compressed once, on first request, and kept in memory until the
+file changes; ``GZipMiddleware`` leaves responses that already carry a
+``Content-Encoding`` untouched. Each content-coding has its own ``ETag``.
+
+Templates link assets by fingerprinted name (``css/viz.<hash>.css``, see
+`PrecompressedStaticFiles.asset`), which can be cached forever. Other paths must
+be revalidated.
+"""
+
+import hashlib
+import os
+
+import anyio.to_thread
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from . import codec
+
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+FINGERPRINTED = ('.css', '.js')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    def __init__(self, *args, fingerprint: bool = True, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # (path, encoding) -> (mtime, size, compressed)
+        self._compressed: dict[tuple[str, str], tuple[float, int, bytes]] = {}
+        # path -> fingerprinted path, and back; hashed once, when the app is created
+        self._fingerprints: dict[str, str] = {}
+        self._originals: dict[str, str] = {}
+        if fingerprint:
+            self._fingerprint_all()
+
+    def _fingerprint_all(self) -> None:
+        for directory in self.all_directories:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    ext = os.path.splitext(name)[1]
+                    if ext not in FINGERPRINTED:
+                        continue
+                    full_path = os.path.join(root, name)
+                    path = os.path.relpath(full_path, directory).replace(os.sep, '/')
+                    if path in self._fingerprints:
+                        continue
+                    with open(full_path, 'rb') as f:
+                        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+                    hashed = f'{path[: -len(ext)]}.{digest}{ext}'
+                    self._fingerprints[path] = hashed
+                    self._originals[hashed] = path
+
+    def asset(self, path: str) -> str:
+        """The fingerprinted name of ``path``, if it has one."""
+        return self._fingerprints.get(path, path)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        original = self._originals.get(path.replace(os.sep, '/'))
+        response = await self._encoded_response(original or path, scope)
+        if response.status_code in (200, 304):
+            response.headers['cache-control'] = IMMUTABLE if original else 'no-cache'
+        return response
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200):
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        if (encoding := self._encoding(response, scope)) is not None:
+            # a representation of its own, so validated against its own ETag
+            response.headers['etag'] = codec.encoded_etag(response.headers['etag'], encoding)
+            response.headers['vary'] = 'Accept-Encoding'
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _encoding(response: FileResponse, scope: Scope) -> str | None:
+        """The content-coding to send a file response in, if any."""
+        if response.status_code != 200 or not (response.media_type or '').startswith(COMPRESSIBLE):
+            return None
+        encodings = codec.accepted_encodings(Headers(scope=scope).get('Accept-Encoding'))
+        return encodings[0] if encodings else None
+
+    async def _encoded_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if (
+            not isinstance(response, FileResponse)
+            or (encoding := self._encoding(response, scope)) is None
+        ):
+            return response
+
+        stat = response.stat_result or os.stat(response.path)
+        cached = self._compressed.get((response.path, encoding))
+        if cached is None or cached[:2] != (stat.st_mtime, stat.st_size):
+            data = await anyio.to_thread.run_sync(self._compress, response.path, encoding)
+            cached = self._compressed[(response.path, encoding)] = (
+                stat.st_mtime,
+                stat.st_size,
+                data,
+            )
+
+        headers = {k: v for k, v in response.headers.items() if k != 'content-length'}
+        headers['content-encoding'] = encoding
+        if scope['method'] == 'HEAD':
+            headers['content-length'] = str(len(cached[2]))
+            return Response(headers=headers)
+        return Response(cached[2], headers=headers)
+
+    @staticmethod
+    def _compress(path: str, encoding: str) -> bytes:
+        with open(path, 'rb') as f:
+            return codec.compress(f.read(), encoding)
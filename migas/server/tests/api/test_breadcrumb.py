@@ -97,6 +97,39 @@ class TestBreadcrumb:
         assert data['success'] is False
         assert data['message'] == 'Error during ingestion.'
 
+    def test_user_type_is_not_stored(self, client: TestClient, monkeypatch):
+        from migas.server.api import routes
+
+        crumbs = []
+
+        async def capture(crumb, ip=None):
+            crumbs.append(crumb)
+
+        monkeypatch.setattr(routes, 'ingest_project', capture)
+
+        res = client.post(
+            self.url + '?wait=true',
+            json={'project': TEST_PROJECT, 'project_version': '1.0.0', 'ctx': {'user_type': 'ci'}},
+        )
+        assert res.status_code == 200
+        assert crumbs[0].user_type == 'general'
+
+    @pytest.mark.parametrize('wait, in_flight', [(False, 1), (True, 0)])
+    def test_in_flight_ingests(self, client: TestClient, monkeypatch, wait, in_flight):
+        from migas.server import monitor
+        from migas.server.api import routes
+
+        counts = []
+
+        async def capture(crumb, ip=None):
+            counts.append(monitor.IN_FLIGHT['ingest'])
+
+        monkeypatch.setattr(routes, 'ingest_project', capture)
+
+        body = {'project': TEST_PROJECT, 'project_version': '1.0.0'}
+        client.post(self.url, params={'wait': wait}, json=body)
+        assert counts == [in_flight]
+
     def test_invalid_project_format(self, client: TestClient):
         res = client.post(
             self.url,
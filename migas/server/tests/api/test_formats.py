@@ -0,0 +1,60 @@
+"""Content negotiation for /api/usage response formats."""
+
+import pytest
+from fastapi import HTTPException
+
+from migas.server.api import formats
+
+ROWS = [
+    {'date': '2026-04-15', 'version': '1.0.0', 'status': 'C', 'count': 3},
+    {'date': '2026-04-16', 'version': '1.0.1', 'status': 'F', 'count': 1},
+]
+
+
+@pytest.mark.parametrize(
+    'accept,expected',
+    [
+        (None, formats.JSON),
+        ('*/*', formats.JSON),
+        ('text/html,application/xhtml+xml,*/*;q=0.8', formats.JSON),
+        (formats.COLUMNAR, formats.COLUMNAR),
+        (f'application/json;q=0.5, {formats.COLUMNAR}', formats.COLUMNAR),
+        (f'{formats.COLUMNAR};q=0, application/json', formats.JSON),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert formats.negotiate(accept) == expected
+
+
+def test_negotiate_arrow_unavailable(monkeypatch):
+    monkeypatch.setattr(formats, '_arrow_available', lambda: False)
+    with pytest.raises(HTTPException) as exc:
+        formats.negotiate(formats.ARROW)
+    assert exc.value.status_code == 406
+    assert formats.negotiate(f'{formats.ARROW}, application/json;q=0.1') == formats.JSON
+
+
+def test_to_columns():
+    assert formats.to_columns(ROWS) == {
+        'date': ['2026-04-15', '2026-04-16'],
+        'version': ['1.0.0', '1.0.1'],
+        'status': ['C', 'F'],
+        'count': [3, 1],
+    }
+    assert formats.to_columns([]) == {'date': [], 'version': [], 'status': [], 'count': []}
+
+
+def test_to_arrow_roundtrip():
+    pa = pytest.importorskip('pyarrow')
+
+    table = pa.ipc.open_stream(formats.to_arrow(ROWS)).read_all()
+    assert table.num_rows == 2
+    assert table.column('count').to_pylist() == [3, 1]
+    dates = [d.isoformat() for d in table.column('date').to_pylist()]
+    assert dates == ['2026-04-15', '2026-04-16']
+
+
+def test_representation_etag():
+    assert formats.representation_etag('"abc"', formats.JSON) == '"abc"'
+    assert formats.representation_etag('"abc"', formats.COLUMNAR) == '"abc-columnar"'
+    assert formats.representation_etag('"abc"', formats.ARROW) == '"abc-arrow"'
@@ -50,3 +50,95 @@ async def test_usage_api_dev_bypass(client: TestClient, db, monkeypatch):
 
     res = client.get(f'/api/usage/{project}', headers={'Authorization': 'Bearer dev_token'})
     assert res.status_code == 200
+
+
+@pytest.mark.parametrize(
+    'header,expected',
+    [
+        (None, False),
+        ('', False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('"xyz"', False),
+        ('*', True),
+    ],
+)
+def test_etag_matches(header, expected):
+    from migas.server.api.routes import _etag_matches
+
+    assert _etag_matches(header, '"abc"') is expected
+
+
+@pytest.mark.anyio
+async def test_usage_api_conditional_get(client: TestClient, db):
+    project = 'test/api-etag'
+    await db.register(project)
+    auth = await db.token(project)
+
+    res = client.get(f'/api/usage/{project}', headers=auth)
+    assert res.status_code == 200
+    etag = res.headers['etag']
+    assert res.headers['cache-control'] == 'private, no-cache'
+
+    # Served from the response cache
+    res = client.get(f'/api/usage/{project}', headers={**auth, 'If-None-Match': etag})
+    assert res.status_code == 304
+    assert res.headers['etag'] == etag
+    assert not res.content
+
+    res = client.get(f'/api/usage/{project}', headers={**auth, 'If-None-Match': '"stale"'})
+    assert res.status_code == 200
+    assert res.headers['etag'] == etag
+
+
+@pytest.mark.anyio
+async def test_usage_api_etag_per_encoding(client: TestClient, db):
+    project = 'test/api-etag-encoding'
+    await db.register(project)
+    auth = await db.token(project)
+
+    res = client.get(f'/api/usage/{project}', headers={**auth, 'Accept-Encoding': 'gzip'})
+    assert res.headers['content-encoding'] == 'gzip'
+    etag = res.headers['etag']
+    assert etag.endswith('-gzip"')
+
+    res = client.get(
+        f'/api/usage/{project}',
+        headers={**auth, 'Accept-Encoding': 'identity', 'If-None-Match': etag},
+    )
+    assert res.status_code == 200
+    assert 'content-encoding' not in res.headers
+    assert res.headers['etag'] == etag.replace('-gzip', '')
+
+
+@pytest.mark.anyio
+async def test_usage_api_since_is_cacheable(client: TestClient, db):
+    from migas.server.cache import HISTORICAL_MAX_AGE
+
+    project = 'test/api-etag-since'
+    await db.register(project)
+    auth = await db.token(project)
+
+    res = client.get(f'/api/usage/{project}?weeks=4&since=2026-01-01', headers=auth)
+    assert res.status_code == 200
+    assert res.headers['cache-control'] == f'private, max-age={HISTORICAL_MAX_AGE}'
+    assert 'etag' in res.headers
+
+
+@pytest.mark.anyio
+async def test_usage_api_columnar(client: TestClient, db):
+    from migas.server.api.formats import COLUMNAR
+
+    project = 'test/api-columnar'
+    await db.register(project)
+    auth = await db.token(project)
+
+    rows = client.get(f'/api/usage/{project}', headers=auth)
+    res = client.get(f'/api/usage/{project}', headers={**auth, 'Accept': COLUMNAR})
+    assert res.status_code == 200
+    assert res.headers['content-type'] == COLUMNAR
+    assert res.headers['etag'] != rows.headers['etag']
+    columns = res.json()
+    assert set(columns) == {'date', 'version', 'status', 'count'}
+    assert len(columns['date']) == len(rows.json())
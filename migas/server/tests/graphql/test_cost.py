@@ -0,0 +1,61 @@
+"""Static cost and depth analysis of GraphQL documents."""
+
+import pytest
+from graphql import get_introspection_query, parse, validate
+
+from migas.server.extensions.cost import (
+    MAX_QUERY_COST,
+    UNIQUE_USAGE_COST,
+    QueryCostRule,
+    operation_cost,
+)
+from migas.server.schema import SCHEMA
+
+USAGE = 'get_usage(project: "o/r", start: "2025-01-01"{})'
+
+
+@pytest.mark.parametrize(
+    'query,cost',
+    [
+        ('query { get_projects }', 2),
+        (f'query {{ {USAGE.format("")} }}', 5),
+        (f'query {{ {USAGE.format(", unique: false")} }}', 5),
+        (f'query {{ {USAGE.format(", unique: true")} }}', UNIQUE_USAGE_COST),
+        # variables are assumed to request unique users
+        (f'query($u: Boolean!) {{ {USAGE.format(", unique: $u")} }}', UNIQUE_USAGE_COST),
+        ('fragment F on Query { get_projects } query { ...F ... on Query { get_projects } }', 4),
+        ('query { __typename }', 0),
+    ],
+)
+def test_operation_cost(query: str, cost: int) -> None:
+    assert operation_cost(parse(query)) == cost
+
+
+def test_operation_cost_selects_operation() -> None:
+    document = parse('query A { get_projects } query B { a: get_projects b: get_projects }')
+    assert operation_cost(document, 'A') == 2
+    assert operation_cost(document, 'B') == 4
+
+
+def test_query_cost_rule() -> None:
+    fields = ' '.join(
+        f'u{i}: {USAGE.format(", unique: true")}'
+        for i in range(MAX_QUERY_COST // UNIQUE_USAGE_COST + 1)
+    )
+    errors = validate(SCHEMA._schema, parse(f'query {{ {fields} }}'), [QueryCostRule])
+    assert len(errors) == 1
+    assert 'exceeds maximum cost' in errors[0].message
+
+    # introspection is deep by design, and still allowed
+    assert validate(SCHEMA._schema, parse(get_introspection_query()), [QueryCostRule]) == []
+
+
+def test_query_depth_rule() -> None:
+    fragments = 'fragment F on Query { ...G } fragment G on Query { ...F }'
+    nested = '{ a { b { c { d { e } } } } }'
+    errors = validate(
+        SCHEMA._schema,
+        parse(f'query {{ {USAGE.format("")} {nested} ...F }} {fragments}'),
+        [QueryCostRule],
+    )
+    assert any('exceeds maximum depth' in e.message for e in errors)
@@ -0,0 +1,114 @@
+"""Per-request DataLoaders backing the GraphQL resolvers."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from migas.server import loaders
+
+START = datetime(2026, 4, 1, tzinfo=timezone.utc)
+END = datetime(2026, 4, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def anyio_backend():
+    """strawberry's DataLoader is asyncio-only."""
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_project_exists_loader_batches(monkeypatch):
+    lookup = AsyncMock(return_value={'a/b'})
+    monkeypatch.setattr(loaders, 'filter_existing_projects', lookup)
+
+    loader = loaders.Loaders().project_exists
+    results = await asyncio.gather(loader.load('a/b'), loader.load('c/d'), loader.load('a/b'))
+
+    assert results == [True, False, True]
+    lookup.assert_awaited_once_with(['a/b', 'c/d'])
+
+
+@pytest.mark.anyio
+async def test_usage_loader_groups_by_window(monkeypatch):
+    calls = []
+
+    async def fake_query(projects, start, end, unique=False):
+        calls.append((projects, start, end, unique))
+        return {p: 10 if unique else 20 for p in projects if p != 'empty/project'}
+
+    monkeypatch.setattr(loaders, 'query_usage_by_projects', fake_query)
+
+    loader = loaders.Loaders().usage
+    results = await asyncio.gather(
+        loader.load(('a/b', START, END, False)),
+        loader.load(('c/d', START, END, False)),
+        loader.load(('empty/project', START, END, False)),
+        loader.load(('a/b', START, END, True)),
+    )
+
+    assert results == [20, 20, 0, 10]
+    assert sorted(calls, key=lambda c: c[3]) == [
+        (['a/b', 'c/d', 'empty/project'], START, END, False),
+        (['a/b'], START, END, True),
+    ]
+
+
+def test_graphql_get_usage_many_projects(client):
+    """Aliased get_usage fields in one document all resolve."""
+    from ..conftest import TEST_PROJECT
+
+    query = (
+        'query { '
+        f'a: get_usage(project: "{TEST_PROJECT}", start: "2026-01-01") '
+        f'b: get_usage(project: "{TEST_PROJECT}", start: "2026-01-01", unique: true) '
+        'c: get_usage(project: "test/not-tracked", start: "2026-01-01") '
+        '}'
+    )
+    res = client.post('/graphql', json={'query': query})
+    assert res.status_code == 200
+    data = res.json()['data']
+    assert data['a']['success'] is True
+    assert data['b']['unique'] is True
+    assert data['c']['success'] is False
+
+
+def test_graphql_get_usage_aliases_share_end(client, monkeypatch):
+    """Aliased get_usage fields without `end` share one window, hence one query."""
+    from itertools import count
+
+    from migas.server import utils
+
+    from ..conftest import TEST_PROJECT
+
+    # A clock that moves a second on every reading
+    ticks = count()
+
+    class TickingDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return START.astimezone(tz) + timedelta(seconds=next(ticks))
+
+    monkeypatch.setattr(utils, 'datetime', TickingDatetime)
+
+    calls = []
+    original = loaders.query_usage_by_projects
+
+    async def tracking_query(projects, start, end, session=None, unique=False):
+        calls.append((projects, start, end, unique))
+        return await original(projects, start, end, session=session, unique=unique)
+
+    monkeypatch.setattr(loaders, 'query_usage_by_projects', tracking_query)
+
+    query = (
+        'query { '
+        f'a: get_usage(project: "{TEST_PROJECT}", start: "2026-01-01") '
+        f'b: get_usage(project: "{TEST_PROJECT}", start: "2026-01-01") '
+        '}'
+    )
+    res = client.post('/graphql', json={'query': query})
+    assert res.status_code == 200
+    data = res.json()['data']
+    assert data['a'] == data['b']
+    assert len(calls) == 1
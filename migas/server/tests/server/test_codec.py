@@ -0,0 +1,60 @@
+"""JSON codec of cache entries and responses."""
+
+import pytest
+
+from ... import codec
+from ...api.routes import _pack_response, _unpack_response
+
+ROWS = [{'version': '1.0.0', 'date': '2026-01-01', 'status': 'C', 'count': 3, 'note': 'é'}]
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(codec, 'orjson', None)
+    return request.param
+
+
+def test_roundtrip(backend) -> None:
+    encoded = codec.dumps(ROWS)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == codec.loads(encoded.decode()) == ROWS
+
+
+def test_backends_agree(monkeypatch) -> None:
+    """Entries must read the same whichever backend wrote them, e.g. during a deploy."""
+    pytest.importorskip('orjson')
+    fast = codec.dumps(ROWS, sort_keys=True)
+    monkeypatch.setattr(codec, 'orjson', None)
+    assert codec.dumps(ROWS, sort_keys=True) == fast
+
+
+@pytest.mark.parametrize('encoding', codec.ENCODINGS)
+def test_response_entry_roundtrip(encoding) -> None:
+    compressed = codec.compress(codec.dumps(ROWS), encoding)
+    assert compressed == codec.compress(codec.dumps(ROWS), encoding), 'must be deterministic'
+    etag, last_date, stored = _unpack_response(_pack_response('"abc"', '2026-01-02', compressed))
+    assert (etag, last_date) == ('"abc"', '2026-01-02')
+    assert codec.loads(codec.decompress(stored, encoding)) == ROWS
+
+
+@pytest.mark.parametrize(
+    'header,expected',
+    [
+        (None, []),
+        ('identity', []),
+        ('gzip, deflate', ['gzip']),
+        ('gzip;q=0', []),
+        ('*', list(codec.ENCODINGS)),
+        ('GZIP, br;q=0.5', list(codec.ENCODINGS)),
+    ],
+)
+def test_accepted_encodings(header, expected) -> None:
+    assert codec.accepted_encodings(header) == expected
+
+
+def test_encoded_etag() -> None:
+    assert codec.encoded_etag('"abc"', 'gzip') == '"abc-gzip"'
+    assert codec.encoded_etag('"abc-arrow"', 'br') == '"abc-arrow-br"'
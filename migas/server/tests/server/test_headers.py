@@ -1,5 +1,7 @@
 """Top-level HTTP surface: landing page, backend headers."""
 
+import re
+
 from fastapi.testclient import TestClient
 
 
@@ -17,3 +19,12 @@ def test_server_landing(client: TestClient) -> None:
     res = client.get('/')
     assert res.status_code == 200
     assert 'html' in res.headers.get('Content-Type')
+
+
+def test_pages_link_fingerprinted_assets(client: TestClient) -> None:
+    page = client.get('/viz').text
+    assert client.get('/viz').text == page
+    (href,) = re.findall(r'href="[^"]*/static/(css/viz\.[0-9a-f]+\.css)"', page)
+    res = client.get(f'/static/{href}')
+    assert res.status_code == 200
+    assert 'immutable' in res.headers['cache-control']
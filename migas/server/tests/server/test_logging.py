@@ -6,15 +6,37 @@ itself, not GraphQL operations.
 """
 
 import asyncio
+import json
 import logging
 from unittest.mock import MagicMock
 
 from graphql import parse
 
+from ...extensions import logging as logging_ext
 from ...extensions.logging import LoggingExtension
 from ..conftest import TEST_PROJECT, queries
 
 
+def _run_extension(query: str, variables: dict | None = None, errors=None) -> None:
+    mock_ctx = MagicMock()
+    mock_ctx.operation_type = MagicMock()
+    mock_ctx.operation_type.value = 'query'
+    mock_ctx.operation_name = None
+    mock_ctx.query = query
+    mock_ctx.variables = variables
+    mock_ctx.graphql_document = parse(query)
+    mock_ctx.result.errors = errors
+
+    ext = LoggingExtension()
+    ext.execution_context = mock_ctx
+
+    async def run_extension():
+        async for _ in ext.on_operation():
+            pass
+
+    asyncio.run(run_extension())
+
+
 def test_extension_log_format(caplog):
     caplog.set_level(logging.INFO, logger='migas.server')
 
@@ -39,6 +61,105 @@ def test_extension_log_format(caplog):
     assert any(f'project={TEST_PROJECT}' in msg for msg in log_messages)
 
 
+def test_extension_caches_document_summary(monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger='migas.server')
+    monkeypatch.setattr(logging_ext, '_document_summaries', logging_ext.LRUCache(8))
+    walks = MagicMock(wraps=logging_ext._extract_literals)
+    monkeypatch.setattr(logging_ext, '_extract_literals', walks)
+
+    for _ in range(3):
+        _run_extension(queries['add_breadcrumb'])
+    assert walks.call_count == 1
+
+    log_messages = [rec.message for rec in caplog.records if rec.name == 'migas.server']
+    assert len(log_messages) == 3
+    assert all('QUERY [add_breadcrumb]' in msg for msg in log_messages)
+    assert all(f'project={TEST_PROJECT}' in msg and 'status=C' in msg for msg in log_messages)
+
+
+def test_extension_sampling(monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger='migas.server')
+    monkeypatch.setattr(logging_ext, 'LOG_SAMPLE_RATE', 0.0)
+
+    _run_extension(queries['get_usage'])
+    assert not caplog.records
+
+    # failed operations are always logged
+    _run_extension(queries['get_usage'], errors=['boom'])
+    assert len(caplog.records) == 1
+
+
+def test_extension_structured_fields(caplog):
+    caplog.set_level(logging.INFO, logger='migas.server')
+
+    _run_extension(queries['get_usage'], variables={'project_version': '1.0.0'})
+    assert caplog.records[0].graphql == {
+        'type': 'query',
+        'operation': '[get_usage]',
+        'project': TEST_PROJECT,
+        'project_version': '1.0.0',
+        'status': None,
+    }
+
+
+def test_json_formatter():
+    from ...logs import JsonFormatter
+
+    record = logging.LogRecord('migas', logging.INFO, __file__, 1, 'hello %s', ('world',), None)
+    record.graphql = {'project': TEST_PROJECT}
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == 'hello world'
+    assert entry['severity'] == 'INFO'
+    assert entry['logger'] == 'migas'
+    assert entry['graphql'] == {'project': TEST_PROJECT}
+
+
+def test_queue_handler_drops_when_full():
+    import queue
+
+    from ...logs import DroppingQueueHandler
+
+    q = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(q)
+    logger = logging.getLogger('migas.test-queue')
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(4):
+            logger.warning('record %d', i)
+        assert handler.dropped == 2
+        assert [q.get_nowait().msg for _ in range(2)] == ['record 0', 'record 1']
+
+        # the next record that fits is followed by a drop notice
+        logger.warning('record 4')
+        assert q.get_nowait().msg == 'record 4'
+        assert 'Dropped 2 log record(s)' in q.get_nowait().msg
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_start_queue_logging():
+    from ...logs import DroppingQueueHandler, start_queue_logging
+
+    logger = logging.getLogger('migas.test-listener')
+    logger.propagate = False
+    written = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            written.append(self.format(record))
+
+    logger.addHandler(ListHandler())
+    listener = start_queue_logging('migas.test-listener', maxsize=10)
+    try:
+        assert [type(h) for h in logger.handlers] == [DroppingQueueHandler]
+        logger.warning('from the loop')
+    finally:
+        listener.stop()
+        logger.handlers.clear()
+    assert written == ['from the loop']
+
+
 def test_logging_extension(client, caplog):
     caplog.set_level(logging.INFO, logger='migas.server')
 
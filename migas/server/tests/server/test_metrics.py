@@ -0,0 +1,98 @@
+"""Prometheus instrumentation helpers."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from ... import metrics
+
+
+@pytest.mark.parametrize(
+    'scope,expected',
+    [
+        ({'path': '/nowhere'}, 'unmatched'),
+        (
+            {
+                'path': '/api/usage/nipreps/fmriprep',
+                'route': SimpleNamespace(
+                    path='/api/usage/{project:path}', param_convertors={'project': None}
+                ),
+            },
+            '/api/usage/{project:path}',
+        ),
+        # router mounted with a prefix: the route only knows its own (empty) path
+        ({'path': '/graphql', 'route': SimpleNamespace(path='', param_convertors={})}, '/graphql'),
+    ],
+)
+def test_route_label(scope, expected) -> None:
+    assert metrics.route_label(scope) == expected
+
+
+def test_noop_metrics() -> None:
+    noop = metrics._NoopMetric()
+    noop.labels('a', 'b').inc()
+    noop.labels('a').observe(1.0)
+    with noop.labels('a').time():
+        pass
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio.Redis: commands go through `execute_command`."""
+
+    async def execute_command(self, *args, **options):
+        return 'OK'
+
+    async def set(self, key, value):
+        return await self.execute_command('SET', key, value)
+
+    def pipeline(self, transaction=True):
+        pipe = MagicMock()
+
+        async def execute():
+            return ['value']
+
+        pipe.execute = execute
+        return pipe
+
+
+@pytest.mark.anyio
+async def test_instrument_redis(monkeypatch) -> None:
+    latency = MagicMock()
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, 'REDIS_LATENCY', latency)
+
+    client = metrics.instrument_redis(_FakeRedis())
+    assert await client.set('key', 'value') == 'OK'
+    assert await client.pipeline().execute() == ['value']
+
+    assert [c.args for c in latency.labels.call_args_list] == [('SET',), ('PIPELINE',)]
+
+
+def test_instrument_engine(monkeypatch) -> None:
+    from sqlalchemy import create_engine, text
+
+    latency = MagicMock()
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    monkeypatch.setattr(metrics, 'DB_LATENCY', latency)
+
+    engine = create_engine('sqlite://')
+    metrics.instrument_engine(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as conn:
+        conn.execute(text('  select 1'))
+
+    latency.labels.assert_called_once_with('SELECT')
+    latency.labels.return_value.observe.assert_called_once()
+
+
+def test_instrument_engine_failed_statement(monkeypatch) -> None:
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+
+    monkeypatch.setattr(metrics, 'ENABLED', True)
+    engine = create_engine('sqlite://')
+    metrics.instrument_engine(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text('select * from missing'))
+        assert conn.info['migas_query_start'] == []
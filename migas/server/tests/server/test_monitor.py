@@ -0,0 +1,54 @@
+"""Event loop lag, blocking watchdog and in-flight task counts."""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from ... import monitor
+
+
+@pytest.fixture
+def anyio_backend():
+    """The monitor samples the asyncio loop."""
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_track_in_flight() -> None:
+    started, release = asyncio.Event(), asyncio.Event()
+
+    @monitor.track_in_flight('test')
+    async def task():
+        started.set()
+        await release.wait()
+
+    running = asyncio.create_task(task())
+    await started.wait()
+    assert monitor.loop_stats()['in_flight'] == {'test': 1}
+    release.set()
+    await running
+    assert 'test' not in monitor.loop_stats()['in_flight']
+
+
+def _block(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.anyio
+async def test_loop_monitor_reports_blocking(caplog) -> None:
+    mon = monitor.LoopMonitor(interval=0.01, block_threshold_ms=50)
+    with caplog.at_level(logging.WARNING, logger='migas'):
+        mon.start()
+        await asyncio.sleep(0.05)
+        _block(0.3)
+        await asyncio.sleep(0.05)
+        await mon.stop()
+
+    stats = mon.stats()
+    assert mon.blocked == 1
+    assert stats['lag_ms_max'] >= 250
+    assert 'Event loop blocked' in caplog.text
+    # the stack of the blocking call is logged
+    assert 'in _block' in caplog.text
@@ -0,0 +1,80 @@
+"""Slow-query log."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ... import slowlog
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.setattr(slowlog, 'SLOW_QUERY_MS', 100.0)
+    slowlog.reset()
+    yield
+    slowlog.reset()
+
+
+def test_record_threshold_and_aggregation() -> None:
+    assert slowlog.record('SELECT 1', ('secret',), 99) is None
+    slowlog.record('SELECT  *\n  FROM crumbs WHERE project = $1', ('nipreps/fmriprep',), 150)
+    entry = slowlog.record('SELECT * FROM crumbs WHERE project = $1', (None,), 250)
+
+    assert entry.statement == 'SELECT * FROM crumbs WHERE project = $1'
+    assert (entry.count, entry.total_ms, entry.max_ms) == (2, 400, 250)
+    assert entry.params == ['NoneType']
+    assert slowlog.top_slow_queries() == [entry]
+
+
+@pytest.mark.parametrize(
+    'parameters,expected',
+    [(('owner/repo', 3), ['str', 'int']), ({'project': 'owner/repo'}, ['str']), (None, [])],
+)
+def test_redact_params(parameters, expected) -> None:
+    assert slowlog.redact_params(parameters) == expected
+
+
+def test_redact_plan() -> None:
+    plan = (
+        'Index Scan using ix_crumbs_project_session (cost=0.42..8.44)\n'
+        "  Index Cond: ((project)::text = 'o''wner/repo'::text)"
+    )
+    assert slowlog.redact_plan(plan).endswith("Index Cond: ((project)::text = '?'::text)")
+
+
+def test_eviction_keeps_slowest(monkeypatch) -> None:
+    monkeypatch.setattr(slowlog, 'MAX_STATEMENTS', 2)
+    slowlog.record('SELECT 1', (), 300)
+    slowlog.record('SELECT 2', (), 200)
+    slowlog.record('SELECT 3', (), 400)
+
+    assert [q.statement for q in slowlog.top_slow_queries()] == ['SELECT 3', 'SELECT 1']
+    assert [q.statement for q in slowlog.top_slow_queries(order='total_ms', limit=1)] == [
+        'SELECT 3'
+    ]
+
+
+def test_instrument_engine(monkeypatch) -> None:
+    from sqlalchemy import create_engine, text
+
+    monkeypatch.setattr(slowlog, 'SLOW_QUERY_MS', 1e-9)
+    engine = create_engine('sqlite://')
+    slowlog.instrument_engine(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as conn:
+        conn.execute(text('select :value'), {'value': 'secret'})
+
+    (entry,) = slowlog.top_slow_queries()
+    assert entry.statement == 'select ?'
+    assert entry.params == ['str']
+
+
+def test_instrument_engine_failed_statement() -> None:
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+
+    engine = create_engine('sqlite://')
+    slowlog.instrument_engine(SimpleNamespace(sync_engine=engine))
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text('select * from missing'))
+        assert conn.info['migas_slowlog_start'] == []
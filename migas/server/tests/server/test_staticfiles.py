@@ -0,0 +1,88 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ...staticfiles import PrecompressedStaticFiles
+
+SCRIPT = b'console.log("migas");\n' * 100
+
+
+@pytest.fixture
+def static(tmp_path):
+    (tmp_path / 'app.js').write_bytes(SCRIPT)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG' * 100)
+    return PrecompressedStaticFiles(directory=tmp_path)
+
+
+@pytest.fixture
+def client(static):
+    app = FastAPI()
+    app.mount('/static', static, name='static')
+    return TestClient(app)
+
+
+def test_compressed_once(client, static):
+    res = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert res.status_code == 200
+    assert res.headers['content-encoding'] == 'gzip'
+    assert res.headers['vary'] == 'Accept-Encoding'
+    assert res.headers['etag']
+    assert res.content == SCRIPT
+    (cached,) = static._compressed.values()
+    assert gzip.decompress(cached[2]) == SCRIPT
+
+    res = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert res.content == SCRIPT
+    assert len(static._compressed) == 1
+
+
+def test_identity_and_binary(client):
+    res = client.get('/static/app.js', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in res.headers
+    assert res.content == SCRIPT
+
+    res = client.get('/static/logo.png', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in res.headers
+
+
+def test_not_modified(client):
+    etag = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip'}).headers['etag']
+    res = client.get('/static/app.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert res.status_code == 304
+    assert res.headers['etag'] == etag
+    assert res.headers['vary'] == 'Accept-Encoding'
+
+    # each content-coding is validated against its own ETag
+    res = client.get(
+        '/static/app.js', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag}
+    )
+    assert res.status_code == 200
+    assert 'content-encoding' not in res.headers
+    assert res.headers['etag'] != etag
+    identity = res.headers['etag']
+    res = client.get(
+        '/static/app.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': identity}
+    )
+    assert res.status_code == 200
+    assert res.headers['content-encoding'] == 'gzip'
+
+
+def test_fingerprinted(client, static):
+    hashed = static.asset('app.js')
+    assert hashed.startswith('app.') and hashed.endswith('.js') and hashed != 'app.js'
+    assert static.asset('logo.png') == 'logo.png'
+
+    res = client.get(f'/static/{hashed}')
+    assert res.content == SCRIPT
+    assert 'immutable' in res.headers['cache-control']
+    assert client.get('/static/app.js').headers['cache-control'] == 'no-cache'
+    assert client.get('/static/app.00000000.js').status_code == 404
+
+
+def test_fingerprint_disabled(tmp_path):
+    (tmp_path / 'app.js').write_bytes(SCRIPT)
+    assert PrecompressedStaticFiles(directory=tmp_path, fingerprint=False).asset('app.js') == (
+        'app.js'
+    )
@@ -0,0 +1,56 @@
+"""OpenTelemetry tracing helpers."""
+
+import importlib
+
+import pytest
+
+from ... import tracing
+
+
+def test_disabled_is_passthrough() -> None:
+    async def task():
+        pass
+
+    assert not tracing.ENABLED
+    assert tracing.traced(task) is task
+    assert tracing.background(task) is task
+    with tracing.span('noop') as sp:
+        assert sp is None
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    monkeypatch.setenv('MIGAS_TRACING', '1')
+    importlib.reload(tracing)
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, 'tracer', provider.get_tracer('test'))
+    yield exporter
+    monkeypatch.delenv('MIGAS_TRACING')
+    importlib.reload(tracing)
+
+
+@pytest.mark.anyio
+async def test_background_links_to_request(spans) -> None:
+    @tracing.traced
+    async def ingest():
+        pass
+
+    with tracing.tracer.start_as_current_span('request') as request:
+        task = tracing.background(ingest)
+    await task()
+
+    finished = {s.name: s for s in spans.get_finished_spans()}
+    assert set(finished) == {'request', 'background ingest', 'test_tracing.ingest'}
+    bg = finished['background ingest']
+    # a new trace, linked back to the request that enqueued it
+    assert bg.parent is None
+    assert bg.context.trace_id != request.get_span_context().trace_id
+    assert [link.context for link in bg.links] == [request.get_span_context()]
+    assert finished['test_tracing.ingest'].parent.span_id == bg.context.span_id
@@ -1,5 +1,6 @@
 """App-level middleware and extensions."""
 
+import dataclasses
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -54,6 +55,26 @@ async def test_check_rate_limit_rejects_at_configured_cap(
         await ratelimit.check_rate_limit(mock_request(host=FAKE_HOST), max_requests=5)
 
 
+@pytest.mark.anyio
+@pytest.mark.parametrize('cost,should_raise', [(1, False), (2, True)])
+async def test_check_rate_limit_charges_cost(
+    monkeypatch, mock_request, cost, should_raise
+) -> None:
+    from migas.server.extensions import ratelimit
+
+    # 1 plain request and 1 charged 2 already in the window
+    redis = _fake_redis(['1700000000.0', '1700000001.0:2'])
+    monkeypatch.setattr(ratelimit, 'get_redis_connection', AsyncMock(return_value=redis))
+
+    if should_raise:
+        with pytest.raises(ratelimit.RateLimitExceededError):
+            await ratelimit.check_rate_limit(
+                mock_request(host=FAKE_HOST), max_requests=4, cost=cost
+            )
+    else:
+        await ratelimit.check_rate_limit(mock_request(host=FAKE_HOST), max_requests=4, cost=cost)
+
+
 @pytest.mark.anyio
 async def test_check_rate_limit_logs_when_cap_exceeded(monkeypatch, mock_request, caplog) -> None:
     from migas.server.extensions import ratelimit
@@ -68,3 +89,187 @@ async def test_check_rate_limit_logs_when_cap_exceeded(monkeypatch, mock_request
 
     assert any('rate limit' in r.message.lower() for r in caplog.records)
     assert FAKE_HOST in caplog.text
+
+
+def _persisted(query: str) -> dict:
+    from migas.server.extensions.persisted import query_hash
+
+    return {'version': 1, 'sha256Hash': query_hash(query)}
+
+
+@pytest.mark.anyio
+async def test_resolve_persisted_query(monkeypatch) -> None:
+    from migas.server.extensions import persisted
+    from migas.server.schema import SCHEMA
+
+    schema = SCHEMA._schema
+    store = {}
+    redis = MagicMock()
+    redis.get = AsyncMock(side_effect=store.get)
+    redis.set = AsyncMock(side_effect=lambda key, value, ex=None: store.update({key: value}))
+    monkeypatch.setattr(persisted, 'get_redis_connection', AsyncMock(return_value=redis))
+    monkeypatch.setattr(persisted, '_local_queries', persisted.LRUCache(8))
+
+    query = 'query { get_projects }'
+    with pytest.raises(persisted.PersistedQueryNotFoundError):
+        await persisted.resolve_persisted_query(None, _persisted(query), schema)
+
+    # Registering stores under the hash; later hash-only requests resolve
+    assert await persisted.resolve_persisted_query(query, _persisted(query), schema) == query
+    assert await persisted.resolve_persisted_query(None, _persisted(query), schema) == query
+
+    # Falls back to Redis when the process-local copy is gone
+    persisted._local_queries.clear()
+    assert await persisted.resolve_persisted_query(None, _persisted(query), schema) == query
+    assert redis.get.await_count == 2
+
+    with pytest.raises(persisted.PersistedQueryError, match='does not match'):
+        await persisted.resolve_persisted_query('query { other }', _persisted(query), schema)
+    with pytest.raises(persisted.PersistedQueryError, match='version'):
+        await persisted.resolve_persisted_query(None, {'version': 2, 'sha256Hash': 'abc'}, schema)
+
+    # Unparsable, invalid and oversized documents are passed through, not stored
+    padding = ' ' * persisted.MAX_QUERY_LENGTH
+    for rejected in ('query {', 'query { other }', f'query {{ get_projects{padding} }}'):
+        assert (
+            await persisted.resolve_persisted_query(rejected, _persisted(rejected), schema)
+            == rejected
+        )
+        with pytest.raises(persisted.PersistedQueryNotFoundError):
+            await persisted.resolve_persisted_query(None, _persisted(rejected), schema)
+    assert len(store) == 1
+
+
+def test_graphql_persisted_query(client: TestClient) -> None:
+    from ..conftest import queries
+
+    body = {'extensions': {'persistedQuery': _persisted(queries['get_projects'])}}
+    res = client.post('/graphql', json=body)
+    assert res.status_code == 200
+    assert res.json()['errors'][0]['extensions']['code'] == 'PERSISTED_QUERY_NOT_FOUND'
+
+    res = client.post('/graphql', json={'query': queries['get_projects'], **body})
+    assert res.status_code == 200
+    assert 'get_projects' in res.json()['data']
+
+    res = client.post('/graphql', json=body)
+    assert res.status_code == 200
+    assert 'get_projects' in res.json()['data']
+
+
+def test_graphql_persisted_query_charged_once(client: TestClient, monkeypatch) -> None:
+    from migas.server import schema
+    from migas.server.extensions import persisted
+
+    from ..conftest import queries
+
+    charges = []
+
+    async def charge(request, *args, cost=1, **kwargs):
+        charges.append(cost)
+
+    monkeypatch.setattr(schema, 'check_rate_limit', charge)
+    monkeypatch.setattr(persisted, 'check_rate_limit', charge)
+
+    query = queries['get_projects']
+    client.post('/graphql', json={'query': query})
+    plain = sum(charges)
+    charges.clear()
+    body = {'query': query, 'extensions': {'persistedQuery': _persisted(query)}}
+    client.post('/graphql', json=body)
+    assert sum(charges) == plain
+
+
+def test_fast_path_documents_are_valid() -> None:
+    from graphql import parse, validate
+
+    from migas.server.extensions.fastpath import BREADCRUMB_DOCUMENTS
+    from migas.server.schema import SCHEMA
+
+    for document in BREADCRUMB_DOCUMENTS:
+        assert validate(SCHEMA._schema, parse(document)) == []
+
+
+_BREADCRUMB_VARIABLES = {
+    'project': 'o/r',
+    'project_version': '1.0.0',
+    'language': 'python',
+    'language_version': '3.12',
+    'ctx': {'platform': 'linux'},
+    'proc': {'status': 'C'},
+}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    'variables',
+    [
+        None,
+        {'project': 'o/r', 'project_version': '1.0.0'},
+        {
+            'project': 'o/r',
+            'project_version': '1.0.0',
+            'language': 'python',
+            'language_version': '3.12',
+            'ctx': {},
+            'proc': {'status': 'completed'},  # enum alias, left to strawberry
+        },
+        {**_BREADCRUMB_VARIABLES, 'extra': 1},
+        {**_BREADCRUMB_VARIABLES, 'ctx': {'platform': 'linux', 'unknown': 1}},
+        {**_BREADCRUMB_VARIABLES, 'proc': {'status': 'C', 'unknown': 1}},
+        {**_BREADCRUMB_VARIABLES, 'project_version': 'not a version!'},
+    ],
+)
+async def test_fast_path_defers_to_graphql(variables) -> None:
+    from migas.server.extensions.fastpath import execute_breadcrumb
+
+    assert await execute_breadcrumb(('success',), variables, context={}) is None
+
+
+def test_graphql_breadcrumb_fast_path(client: TestClient) -> None:
+    from migas.server.extensions.fastpath import BREADCRUMB_MUTATION
+    from migas.server.extensions.persisted import query_hash
+
+    from ..conftest import TEST_PROJECT
+
+    variables = {
+        'project': TEST_PROJECT,
+        'project_version': '1.0.0',
+        'language': 'python',
+        'language_version': '3.12',
+        'ctx': {'platform': 'linux'},
+        'proc': {'status': 'C'},
+    }
+    extensions = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(BREADCRUMB_MUTATION)}}
+    for project in (TEST_PROJECT, 'not/registered', 'invalid'):
+        variables['project'] = project
+        full = client.post('/graphql', json={'query': BREADCRUMB_MUTATION, 'variables': variables})
+        fast = client.post('/graphql', json={'variables': variables, 'extensions': extensions})
+        assert fast.status_code == full.status_code == 200
+        assert fast.json() == full.json()
+
+
+@pytest.mark.parametrize('version', ['1.0.0', 'v1.0', '24.1.1.dev3+g1a2b3c4', 'not a version!'])
+def test_fast_path_stores_same_crumb(client: TestClient, monkeypatch, version: str) -> None:
+    from migas.server import schema
+    from migas.server.extensions import fastpath
+    from migas.server.extensions.fastpath import BREADCRUMB_MUTATION
+    from migas.server.extensions.persisted import query_hash
+
+    from ..conftest import TEST_PROJECT
+
+    crumbs = []
+
+    async def capture(crumb, ip=None):
+        crumbs.append(crumb)
+
+    monkeypatch.setattr(schema, 'ingest_project', capture)
+    monkeypatch.setattr(fastpath, 'ingest_project', capture)
+
+    variables = {**_BREADCRUMB_VARIABLES, 'project': TEST_PROJECT, 'project_version': version}
+    extensions = {'persistedQuery': {'version': 1, 'sha256Hash': query_hash(BREADCRUMB_MUTATION)}}
+    client.post('/graphql', json={'query': BREADCRUMB_MUTATION, 'variables': variables})
+    client.post('/graphql', json={'variables': variables, 'extensions': extensions})
+
+    full, fast = (dataclasses.replace(crumb, timestamp=None) for crumb in crumbs)
+    assert fast == full
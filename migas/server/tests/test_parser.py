@@ -24,3 +24,11 @@ def test_parser_headers(input, output):
     opts = get_parser().parse_args(input)
 
     assert opts.headers == output
+
+
+def test_warm_cache_parser():
+    from ..cli import get_warm_cache_parser
+    from ..warmup import DEFAULT_WARMUP_WEEKS
+
+    assert get_warm_cache_parser().parse_args([]).weeks == DEFAULT_WARMUP_WEEKS
+    assert get_warm_cache_parser().parse_args(['--weeks', '52']).weeks == 52
@@ -24,3 +24,39 @@ def test_safestr_parse_value_coerces(value, expected):
     """SafeStr accepts non-string GraphQL inputs from older clients (e.g. errno ints)."""
     assert types.SafeStrScalar.parse_value(value) == expected
     assert types.SafeStrScalar.serialize(value) == expected
+
+
+def test_crumb_record_from_inputs():
+    from packaging.version import Version
+
+    ctx = types.ContextInput(
+        user_id='u', user_type=types.User.ci, container=types.Container.docker
+    )
+    proc = types.ProcessInput(status=types.Status.failed, error_type='MemoryError')
+    crumb = types.CrumbRecord.from_input(
+        'nipreps/nipreps', Version('1.0.0'), 'python', '3.12', ctx, proc
+    )
+
+    assert crumb.version == '1.0.0'
+    assert (crumb.user_type, crumb.container, crumb.status) == ('general', 'docker', 'F')
+    assert crumb.error_type == 'MemoryError'
+    assert crumb.timestamp.tzinfo is not None
+    assert not hasattr(crumb, '__dict__')
+
+    crumb = types.CrumbRecord.from_input(
+        'nipreps/nipreps', '1.0.0', 'python', '3.12', ctx, proc, user_type=ctx.user_type
+    )
+    assert crumb.user_type == 'ci'
+
+
+def test_crumb_record_truncates_versions():
+    crumb = types.CrumbRecord.from_input(
+        'nipreps/nipreps',
+        '1.0.0.dev1+g' + 'a' * 40,
+        'python',
+        '3.12',
+        types.ContextInput(),
+        types.ProcessInput(),
+    )
+    assert len(crumb.version) == types.MAX_VERSION_LENGTH
+    assert crumb.language_version == '3.12'
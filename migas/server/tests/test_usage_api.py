@@ -71,6 +71,7 @@ async def test_usage_api_backward_extension_only_queries_gap(client: TestClient,
     assert res1.status_code == 200
 
     # Intercept get_viz_data calls on the second request (weeks=2)
+    from migas.server import usage
     from migas.server.api import routes
 
     calls = []
@@ -81,6 +82,7 @@ async def test_usage_api_backward_extension_only_queries_gap(client: TestClient,
         return await original(project_name, start_ts=start_ts, end_ts=end_ts, session=session)
 
     monkeypatch.setattr(routes, 'get_viz_data', tracking_get_viz_data)
+    monkeypatch.setattr(usage, 'get_viz_data', tracking_get_viz_data)
 
     res2 = client.get(f'/api/usage/{project}?weeks=2', headers=auth)
     assert res2.status_code == 200
@@ -168,6 +170,59 @@ async def test_usage_api_since_returns_only_older_rows(client: TestClient, db):
     assert all(d < since for d in dates), f'delta contained rows >= {since}: {dates}'
 
 
+@pytest.mark.anyio
+async def test_usage_api_after_returns_only_newer_rows(client: TestClient, db):
+    """?after=<date> returns only rows on or after <date>, and the header marks
+    which of them are final."""
+    from datetime import datetime, timedelta, timezone
+
+    from migas.server.tests.conftest import SESSION_1, SESSION_2, USER_A
+
+    project = 'test/api-after-delta'
+    await db.register(project)
+    auth = await db.token(project)
+
+    now = datetime.now(timezone.utc)
+
+    # One crumb the client has persisted (~20 days)
+    await db.crumb(
+        project,
+        status='C',
+        session_id=SESSION_1,
+        user_id=USER_A,
+        timestamp=now - timedelta(days=20),
+    )
+    # One crumb newer than the persisted history (~3 days)
+    await db.crumb(
+        project,
+        status='C',
+        session_id=SESSION_2,
+        user_id=USER_A,
+        timestamp=now - timedelta(days=3),
+        ensure_user=False,
+    )
+
+    res = client.get(f'/api/usage/{project}?weeks=4', headers=auth)
+    last_date = res.headers['X-Usage-Last-Date']
+    assert all(r['date'] < last_date for r in res.json()), 'older rows are final'
+
+    after = (now - timedelta(days=7)).date().isoformat()
+    res = client.get(f'/api/usage/{project}?weeks=4&after={after}', headers=auth)
+    assert res.status_code == 200
+    assert res.headers['X-Usage-Last-Date'] == last_date
+    dates = [r['date'] for r in res.json()]
+    assert dates, 'delta should include the 3-day-old row'
+    assert all(d >= after for d in dates), f'delta contained rows < {after}: {dates}'
+
+    # A client that stored its history weeks ago gets every row since
+    after = (now - timedelta(days=25)).date().isoformat()
+    res = client.get(f'/api/usage/{project}?weeks=1&after={after}', headers=auth)
+    assert res.status_code == 200
+    dates = [r['date'] for r in res.json()]
+    assert (now - timedelta(days=20)).date().isoformat() in dates
+    assert all(d >= after for d in dates), f'delta contained rows < {after}: {dates}'
+
+
 @pytest.mark.anyio
 async def test_usage_api_response_cache(client: TestClient, db, monkeypatch):
     """A repeat request will use the cache instead of calling get_viz_data.
@@ -176,6 +231,7 @@ async def test_usage_api_response_cache(client: TestClient, db, monkeypatch):
     """
     from datetime import datetime, timezone, timedelta
     from migas.server.tests.conftest import USER_A, SESSION_1
+    from migas.server import usage
     from migas.server.api import routes
 
     project = 'test/api-response-cache'
@@ -198,6 +254,7 @@ async def test_usage_api_response_cache(client: TestClient, db, monkeypatch):
         return await original(project_name, start_ts=start_ts, end_ts=end_ts, session=session)
 
     monkeypatch.setattr(routes, 'get_viz_data', tracking_get_viz_data)
+    monkeypatch.setattr(usage, 'get_viz_data', tracking_get_viz_data)
 
     res1 = client.get(f'/api/usage/{project}?weeks=1', headers=auth)
     assert res1.status_code == 200
@@ -223,6 +280,7 @@ async def test_usage_api_cold_cache_no_epoch_scan(client: TestClient, db, monkey
     """On a cold cache, no DB query should scan from epoch — all start_ts must be bounded."""
     from datetime import datetime, timezone, timedelta
     from migas.server.tests.conftest import USER_A, SESSION_1
+    from migas.server import usage
     from migas.server.api import routes
 
     project = 'test/api-cold-cache-bounded'
@@ -245,6 +303,7 @@ async def test_usage_api_cold_cache_no_epoch_scan(client: TestClient, db, monkey
         return await original(project_name, start_ts=start_ts, end_ts=end_ts, session=session)
 
     monkeypatch.setattr(routes, 'get_viz_data', tracking_get_viz_data)
+    monkeypatch.setattr(usage, 'get_viz_data', tracking_get_viz_data)
 
     # Cold cache — no prior request, no Redis seed
     res = client.get(f'/api/usage/{project}?weeks=1', headers=auth)
@@ -256,3 +315,276 @@ async def test_usage_api_cold_cache_no_epoch_scan(client: TestClient, db, monkey
             assert call['start_ts'] > one_week_ago - timedelta(days=2), (
                 f'Cold cache triggered scan from {call["start_ts"]} — should be bounded to ~1 week ago'
             )
+
+
+ROLLUP_ROWS = [
+    {'date': '2026-04-13', 'version': '1.2.3', 'status': 'C', 'count': 1},
+    {'date': '2026-04-15', 'version': '1.2.4', 'status': 'C', 'count': 2},
+    {'date': '2026-04-15', 'version': '1.3.0', 'status': 'F', 'count': 4},
+    {'date': '2026-05-02', 'version': '2.0.0.post1', 'status': 'C', 'count': 8},
+]
+
+
+@pytest.mark.parametrize(
+    'granularity,version_level,expected',
+    [
+        ('day', None, ROLLUP_ROWS),
+        (
+            'week',
+            None,
+            [
+                {'date': '2026-04-13', 'version': '1.2.3', 'status': 'C', 'count': 1},
+                {'date': '2026-04-13', 'version': '1.2.4', 'status': 'C', 'count': 2},
+                {'date': '2026-04-13', 'version': '1.3.0', 'status': 'F', 'count': 4},
+                {'date': '2026-04-27', 'version': '2.0.0.post1', 'status': 'C', 'count': 8},
+            ],
+        ),
+        (
+            'month',
+            'minor',
+            [
+                {'date': '2026-04-01', 'version': '1.2', 'status': 'C', 'count': 3},
+                {'date': '2026-04-01', 'version': '1.3', 'status': 'F', 'count': 4},
+                {'date': '2026-05-01', 'version': '2.0', 'status': 'C', 'count': 8},
+            ],
+        ),
+        (
+            'day',
+            'patch',
+            [
+                {'date': '2026-04-13', 'version': '1.2.3', 'status': 'C', 'count': 1},
+                {'date': '2026-04-15', 'version': '1.2.4', 'status': 'C', 'count': 2},
+                {'date': '2026-04-15', 'version': '1.3.0', 'status': 'F', 'count': 4},
+                {'date': '2026-05-02', 'version': '2.0.0', 'status': 'C', 'count': 8},
+            ],
+        ),
+    ],
+)
+def test_rollup(granularity, version_level, expected):
+    from migas.server.api.models import Granularity, VersionLevel
+    from migas.server.api.routes import _rollup
+
+    level = VersionLevel(version_level) if version_level else None
+    assert _rollup(ROLLUP_ROWS, Granularity(granularity), level) == expected
+
+
+@pytest.mark.parametrize(
+    'version,version_level,expected',
+    [
+        ('1.2rc1', 'minor', '1.2'),
+        ('1.2.0rc1', 'minor', '1.2'),
+        ('1.2', 'patch', '1.2.0'),
+        ('24.0.0.dev0+g1a2b', 'major', '24'),
+        ('v1.3.1', 'minor', '1.3'),
+        ('unknown', 'minor', 'unknown'),
+    ],
+)
+def test_rollup_release(version, version_level, expected):
+    from migas.server.api.models import Granularity, VersionLevel
+    from migas.server.api.routes import _rollup
+
+    rows = [
+        {'date': '2026-04-13', 'version': version, 'status': 'C', 'count': 1},
+        {'date': '2026-04-13', 'version': expected, 'status': 'C', 'count': 2},
+    ]
+    assert _rollup(rows, Granularity.day, VersionLevel(version_level)) == [
+        {'date': '2026-04-13', 'version': expected, 'status': 'C', 'count': 3}
+    ]
+
+
+@pytest.mark.anyio
+async def test_usage_api_granularity(client: TestClient, db):
+    """?granularity= and ?version_level= aggregate rows server-side."""
+    from datetime import datetime, timedelta, timezone
+
+    from migas.server.tests.conftest import SESSION_1, SESSION_2, USER_A
+
+    project = 'test/api-granularity'
+    await db.register(project)
+    auth = await db.token(project)
+
+    now = datetime.now(timezone.utc)
+    for session_id, version in ((SESSION_1, '1.0.0'), (SESSION_2, '1.0.1')):
+        await db.crumb(
+            project,
+            status='C',
+            session_id=session_id,
+            user_id=USER_A,
+            version=version,
+            timestamp=now - timedelta(days=3),
+        )
+
+    res = client.get(
+        f'/api/usage/{project}?weeks=1&granularity=month&version_level=minor', headers=auth
+    )
+    assert res.status_code == 200
+    rows = res.json()
+    assert len(rows) == 1
+    assert rows[0]['version'] == '1.0'
+    assert rows[0]['count'] == 2
+    assert rows[0]['date'].endswith('-01')
+
+    res = client.get(f'/api/usage/{project}?granularity=year', headers=auth)
+    assert res.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_usage_api_batch(client: TestClient, db, master_token):
+    """GET /api/usage?projects= returns rows keyed by project and respects token scope."""
+    from datetime import datetime, timedelta, timezone
+
+    from migas.server.api.routes import MAX_BATCH_PROJECTS
+    from migas.server.tests.conftest import SESSION_1, SESSION_2, USER_A, auth_header
+
+    projects = ['test/api-batch-a', 'test/api-batch-b']
+    now = datetime.now(timezone.utc)
+    for project, session_id in zip(projects, (SESSION_1, SESSION_2)):
+        await db.register(project)
+        await db.crumb(
+            project,
+            status='C',
+            session_id=session_id,
+            user_id=USER_A,
+            timestamp=now - timedelta(days=3),
+        )
+
+    res = client.get(
+        f'/api/usage?projects={",".join(projects)}', headers=auth_header(master_token)
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert list(body) == projects
+    assert all(len(rows) == 1 for rows in body.values())
+
+    # Second call is served from the response cache and must agree
+    again = client.get(
+        f'/api/usage?projects={",".join(projects)}', headers=auth_header(master_token)
+    )
+    assert again.json() == body
+
+    scoped = await db.token(projects[0])
+    res = client.get(f'/api/usage?projects={",".join(projects)}', headers=scoped)
+    assert res.status_code == 403
+
+    res = client.get('/api/usage?projects=test/not-registered', headers=auth_header(master_token))
+    assert res.status_code == 404
+
+    too_many = ','.join(f'test/api-batch-{i}' for i in range(MAX_BATCH_PROJECTS + 1))
+    res = client.get(f'/api/usage?projects={too_many}', headers=auth_header(master_token))
+    assert res.status_code == 400
+
+    # Unauthenticated callers get 401, whatever the projects
+    for query in ('projects=,', f'projects={too_many}', f'projects={projects[0]}'):
+        assert client.get(f'/api/usage?{query}').status_code == 401
+
+
+@pytest.mark.parametrize(
+    'at,expected',
+    [
+        ('2026-04-20T00:00:00+00:00', '2026-04-18T00:00:00+00:00'),
+        ('2026-04-20T13:45:10+00:00', '2026-04-18T00:00:00+00:00'),
+        ('2026-04-20T23:59:59+00:00', '2026-04-18T00:00:00+00:00'),
+    ],
+)
+def test_provisional_boundary_is_day_aligned(at, expected):
+    """The boundary only moves at midnight UTC, so last_date is stable for a day."""
+    from datetime import datetime
+
+    from migas.server.usage import provisional_boundary
+
+    assert provisional_boundary(datetime.fromisoformat(at)).isoformat() == expected
+
+
+@pytest.mark.anyio
+async def test_warm_usage_cache(client: TestClient, db, monkeypatch):
+    """Warm-up fills the historical cache, so a later request needs no DB history query."""
+    import os
+    from datetime import datetime, timedelta, timezone
+
+    import redis.asyncio as aredis
+
+    from migas.server import usage
+    from migas.server.api import routes
+    from migas.server.tests.conftest import SESSION_1, USER_A
+    from migas.server.warmup import warm_usage_cache
+
+    project = 'test/api-warmup'
+    await db.register(project)
+    auth = await db.token(project)
+    await db.crumb(
+        project,
+        status='C',
+        session_id=SESSION_1,
+        user_id=USER_A,
+        timestamp=datetime.now(timezone.utc) - timedelta(days=20),
+    )
+
+    # Fresh connection bound to the test loop (the app's lives on the portal loop)
+    redis = aredis.from_url(os.environ['MIGAS_REDIS_URI'], decode_responses=True)
+    try:
+        assert await warm_usage_cache(weeks=4, redis=redis) >= 1
+    finally:
+        await redis.aclose()
+
+    calls = []
+    original = routes.get_viz_data
+
+    async def tracking_get_viz_data(project_name, start_ts=None, end_ts=None, session=None):
+        calls.append({'start_ts': start_ts, 'end_ts': end_ts})
+        return await original(project_name, start_ts=start_ts, end_ts=end_ts, session=session)
+
+    monkeypatch.setattr(routes, 'get_viz_data', tracking_get_viz_data)
+    monkeypatch.setattr(usage, 'get_viz_data', tracking_get_viz_data)
+
+    res = client.get(f'/api/usage/{project}?weeks=4', headers=auth)
+    assert res.status_code == 200
+    assert any(r['count'] == 1 for r in res.json())
+    # Only the provisional query (open-ended) should run
+    assert [c['end_ts'] for c in calls] == [None]
+
+
+@pytest.mark.anyio
+async def test_warm_usage_cache_skips_failing_project(monkeypatch):
+    """A corrupt cache entry fails its own project only."""
+    from datetime import datetime, timezone
+    from unittest.mock import AsyncMock
+
+    from migas.server import usage, warmup
+    from migas.server.cache import historical_key
+
+    redis = AsyncMock()
+    redis.get.side_effect = lambda key: '{"data": [' if key == historical_key('o/bad') else None
+    boundary = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monkeypatch.setattr(warmup, 'query_projects', AsyncMock(return_value=['o/bad', 'o/good']))
+    monkeypatch.setattr(
+        usage, 'extend_historical', AsyncMock(return_value=([], boundary, boundary, True))
+    )
+    monkeypatch.setattr(usage, 'write_historical', AsyncMock())
+
+    assert await warmup.warm_usage_cache(weeks=4, redis=redis) == 1
+    assert usage.write_historical.call_args.args[1] == historical_key('o/good')
+
+
+@pytest.mark.anyio
+async def test_warm_usage_cache_daily_survives_failure(monkeypatch):
+    """A failed pass releases its lock, and the next pass still runs."""
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock
+
+    from migas.server import warmup
+
+    class Stop(BaseException):
+        pass
+
+    redis = AsyncMock()
+    redis.set.return_value = True
+    monkeypatch.setattr(warmup, 'get_redis_connection', AsyncMock(return_value=redis))
+    monkeypatch.setattr(warmup, 'warm_usage_cache', AsyncMock(side_effect=RuntimeError))
+    sleep = AsyncMock(side_effect=[None, Stop])
+    monkeypatch.setattr(warmup, 'asyncio', SimpleNamespace(sleep=sleep))
+
+    with pytest.raises(Stop):
+        await warmup.warm_usage_cache_daily(weeks=4)
+    assert warmup.warm_usage_cache.await_count == 2
+    lock = redis.set.call_args.args[0]
+    assert redis.delete.call_args.args == (lock,)
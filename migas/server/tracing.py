@@ -0,0 +1,187 @@
+"""OpenTelemetry tracing.
+
+Enabled with ``MIGAS_TRACING=1`` and the ``tracing`` extra; otherwise the helpers
+below return functions unchanged and spans are no-ops. Spans are exported over
+OTLP/HTTP (configured with the standard ``OTEL_EXPORTER_OTLP_*`` variables), or
+appended as JSON lines to ``MIGAS_TRACING_FILE`` if set.
+"""
+
+import inspect
+import logging
+import os
+from contextlib import nullcontext
+from functools import wraps
+
+from fastapi import FastAPI
+
+from .utils import env_to_bool
+
+logger = logging.getLogger('migas')
+
+
+def _tracing_enabled() -> bool:
+    if not env_to_bool('MIGAS_TRACING'):
+        return False
+    try:
+        import opentelemetry.sdk  # noqa: F401
+    except ImportError:
+        logger.warning('MIGAS_TRACING is set, but opentelemetry-sdk is not installed')
+        return False
+    return True
+
+
+ENABLED = _tracing_enabled()
+# Newer FastAPI releases create server spans with the global tracer provider themselves
+FASTAPI_TRACES_REQUESTS = 'telemetry' in inspect.signature(FastAPI).parameters
+
+if ENABLED:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace
+    from opentelemetry.trace import Link, SpanKind
+
+    tracer = trace.get_tracer('migas.server')
+
+
+def setup_tracing():
+    """Install the global tracer provider; call ``.shutdown()`` on the result to flush.
+
+    Called from the application lifespan, so export threads are started after any fork.
+    """
+    if not ENABLED:
+        return None
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    from . import __version__
+
+    resource = Resource.create(
+        {
+            'service.name': os.getenv('OTEL_SERVICE_NAME', 'migas-server'),
+            'service.version': __version__,
+        }
+    )
+    provider = TracerProvider(resource=resource)
+    if path := os.getenv('MIGAS_TRACING_FILE'):
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        exporter = ConsoleSpanExporter(
+            out=open(path, 'a'),  # noqa: SIM115 - flushed after every batch, open for the process
+            formatter=lambda span: span.to_json(indent=None) + os.linesep,
+        )
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        exporter = OTLPSpanExporter()
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def graphql_extension():
+    """Strawberry extension with spans for parsing, validation and each resolver."""
+    from strawberry.extensions.tracing import OpenTelemetryExtension
+
+    return OpenTelemetryExtension
+
+
+def span(name: str, attributes: dict | None = None):
+    """Context manager for a child span of the current one."""
+    if not ENABLED:
+        return nullcontext()
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def traced(func):
+    """Run a coroutine function inside a span named after it."""
+    if not ENABLED:
+        return func
+    name = f'{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}'
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with tracer.start_as_current_span(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def background(func):
+    """Wrap a background task so its span is linked to the request that enqueued it.
+
+    Background tasks run after the response is sent, when the request span has
+    ended, so the task starts a new trace with a link back rather than a parent.
+    """
+    if not ENABLED:
+        return func
+    parent = trace.get_current_span().get_span_context()
+    links = [Link(parent)] if parent.is_valid else []
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with tracer.start_as_current_span(
+            f'background {func.__name__}',
+            context=otel_context.Context(),
+            kind=SpanKind.CONSUMER,
+            links=links,
+        ):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def request_span(method: str, headers):
+    """Server span for an HTTP request, continuing any incoming ``traceparent``.
+
+    The route is only known once the request is routed; see `name_request_span`.
+    """
+    from opentelemetry.propagate import extract
+
+    return tracer.start_as_current_span(
+        method,
+        context=extract(headers),
+        kind=SpanKind.SERVER,
+        attributes={'http.request.method': method},
+    )
+
+
+def name_request_span(span, method: str, route: str, status: int) -> None:
+    span.update_name(f'{method} {route}')
+    span.set_attribute('http.route', route)
+    span.set_attribute('http.response.status_code', status)
+
+
+def instrument_redis(client):
+    """Trace every command and pipeline sent through ``client``."""
+    if not ENABLED:
+        return client
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def traced_execute_command(*args, **options):
+        command = str(args[0]).upper()
+        with tracer.start_as_current_span(
+            f'redis {command}',
+            kind=SpanKind.CLIENT,
+            attributes={'db.system': 'redis', 'db.operation.name': command},
+        ):
+            return await execute_command(*args, **options)
+
+    def traced_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def traced_execute(*a, **kw):
+            with tracer.start_as_current_span(
+                'redis PIPELINE',
+                kind=SpanKind.CLIENT,
+                attributes={'db.system': 'redis', 'db.operation.name': 'PIPELINE'},
+            ):
+                return await execute(*a, **kw)
+
+        pipe.execute = traced_execute
+        return pipe
+
+    client.execute_command = traced_execute_command
+    client.pipeline = traced_pipeline
+    return client
@@ -1,16 +1,22 @@
 """Custom types"""
 
+import logging
 import typing
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 
 # from strawberry.scalars import Base64, JSON
 import strawberry
 from packaging.version import Version as _Version
-from packaging.version import _BaseVersion
 from packaging.version import parse as parse_version
 
-from .utils import dt_to_str, str_to_dt
+from .utils import dt_to_str, now, str_to_dt
+
+logger = logging.getLogger('migas')
+
+# Longer versions are truncated on ingestion
+MAX_VERSION_LENGTH = 24
 
 # Strawberry has a Date object, but migas's time format
 # slightly differs from datetime.datetime.isoformat()
@@ -81,35 +87,72 @@ class Status(Enum):
 #     typing.List[Argument]
 
 
-@strawberry.type
-class Process:
-    status: Status = Status.running
-    status_desc: str | None = None
-    error_type: str | None = None
-    error_desc: str | None = None
-    # args: Arguments = "{}"
-
-
-@strawberry.type
-class Context:
-    user_id: str | None = None
-    session_id: str | None = None
-    user_type: User = User.general
-    platform: str = 'unknown'
-    container: Container = Container.unknown
-    is_ci: bool = False
+@dataclass(frozen=True, slots=True)
+class CrumbRecord:
+    """A breadcrumb as stored: its ``crumbs`` row, and its user's ``users`` row.
 
+    Built once per request from the validated input (see `from_input`), so that
+    ingestion only reads plain attributes.
+    """
 
-@strawberry.type
-class Project:
     project: str
-    project_version: Version
+    version: str
     language: str
-    language_version: Version
-    timestamp: DateTime
-    # optional
-    context: Context
-    process: Process
+    language_version: str
+    timestamp: datetime
+    session_id: str | None
+    user_id: str | None
+    user_type: str
+    platform: str
+    container: str
+    is_ci: bool
+    status: str
+    status_desc: str | None
+    error_type: str | None
+    error_desc: str | None
+
+    @classmethod
+    def from_input(
+        cls,
+        project: str,
+        project_version,
+        language: str,
+        language_version,
+        ctx,
+        proc,
+        user_type: User = User.general,
+    ) -> 'CrumbRecord':
+        """Build from a project, its versions, and context and process inputs.
+
+        ``ctx`` and ``proc`` may be any object with the attributes of `ContextInput`
+        and `ProcessInput` (e.g. the REST payloads, or a flat `ProjectInput`).
+        ``ctx.user_type`` is ignored: only ``add_project`` stores the one sent, as
+        ``user_type``.
+        """
+        return cls(
+            project=project,
+            version=_truncate_version(project, str(project_version)),
+            language=language,
+            language_version=_truncate_version(project, str(language_version)),
+            timestamp=now(),
+            session_id=ctx.session_id,
+            user_id=ctx.user_id,
+            user_type=user_type.value,
+            platform=ctx.platform,
+            container=ctx.container.value,
+            is_ci=ctx.is_ci,
+            status=proc.status.value,
+            status_desc=proc.status_desc,
+            error_type=proc.error_type,
+            error_desc=proc.error_desc,
+        )
+
+
+def _truncate_version(project: str, version: str) -> str:
+    if len(version) > MAX_VERSION_LENGTH:
+        logger.warning(f'Shortening {project} version: {version}')
+        return version[:MAX_VERSION_LENGTH]
+    return version
 
 
 @strawberry.input
@@ -201,18 +244,3 @@ class CheckProjectResult:
     latest: str
     flagged: bool
     message: str = ''
-
-
-async def serialize(data: dict) -> dict:
-    """Serialize data into database-friendly types"""
-    for k, v in data.items():
-        # TODO: Is this possible with PEP636?
-        # I gave up trying it
-        if isinstance(v, _BaseVersion):
-            data[k] = str(v)
-        elif isinstance(v, Enum):
-            data[k] = v.value
-        # datetime ok?
-        elif isinstance(v, (Context, Process)):
-            data[k] = await serialize(v.__dict__)
-    return data
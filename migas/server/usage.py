@@ -0,0 +1,120 @@
+"""Per-project historical usage cache, shared by ``/api/usage`` and the warm-up job.
+
+Each project's day-level usage rows up to the provisional boundary are cached in
+Redis under ``historical_key``, along with the range they cover. Requests extend
+that range backward as far as they look, and forward once a day.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from . import codec, metrics, tracing
+from .database import MAX_SESSION_HOURS, get_viz_data
+
+logger = logging.getLogger('migas')
+
+
+def _utc(dt: datetime) -> datetime:
+    """Coerce a naive datetime to UTC (guards against legacy cache values)."""
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+def parse_historical(
+    raw: str | bytes | None,
+) -> tuple[list[dict], datetime | None, datetime | None]:
+    """Deserialize a cached usage histogram.
+
+    Returns ``(data, oldest_date, last_date)``.  Handles legacy entries
+    that lack an ``oldest_date`` field.
+    """
+    if not raw:
+        return [], None, None
+
+    entry = codec.loads(raw)
+    data: list[dict] = entry['data']
+    last_date = _utc(datetime.fromisoformat(entry['last_date']))
+
+    if 'oldest_date' in entry:
+        oldest_date = _utc(datetime.fromisoformat(entry['oldest_date']))
+    elif data:
+        # Legacy cache migration: derive from earliest row
+        oldest_date = _utc(datetime.fromisoformat(min(r['date'] for r in data)))
+    else:
+        oldest_date = None
+
+    return data, oldest_date, last_date
+
+
+async def write_historical(
+    redis, cache_key: str, data: list[dict], oldest_date: datetime, last_date: datetime
+) -> None:
+    """Serialize a usage histogram into Redis."""
+    await redis.set(
+        cache_key,
+        codec.dumps(
+            {
+                'oldest_date': oldest_date.isoformat(),
+                'last_date': last_date.isoformat(),
+                'data': data,
+            }
+        ),
+    )
+
+
+def provisional_boundary(at: datetime) -> datetime:
+    """End of the cacheable history: UTC midnight at or before ``at - MAX_SESSION_HOURS``.
+
+    Aligning to midnight keeps the boundary fixed for a whole day, so the
+    historical cache needs a single forward delta per day (see ``warmup.py``).
+    """
+    cutoff = at - timedelta(hours=MAX_SESSION_HOURS)
+    return cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+async def extend_historical(
+    project: str,
+    data: list[dict],
+    oldest_date: datetime | None,
+    last_date: datetime | None,
+    requested_start: datetime,
+    boundary: datetime,
+) -> tuple[list[dict], datetime, datetime, bool]:
+    """Fill cache gaps via backward extension and forward delta up to ``boundary``.
+
+    Returns ``(data, oldest_date, last_date, dirty)``.
+    """
+    dirty = False
+
+    # Backward extension — query only the uncached gap
+    if oldest_date is None or oldest_date > requested_start:
+        gap_end = oldest_date if oldest_date is not None else boundary
+        logger.debug(
+            'Backward extension for %s: querying %s → %s',
+            project,
+            requested_start.date(),
+            gap_end.date(),
+        )
+        metrics.HISTORICAL_QUERIES.labels('backward').inc()
+        with tracing.span('usage.backward_extension'):
+            backward = await get_viz_data(project, start_ts=requested_start, end_ts=gap_end)
+        if backward:
+            data = backward + data
+        oldest_date = requested_start
+        # Advance last_date past the backward range so the forward-delta
+        # step does not re-query data we just fetched.
+        last_date = max(last_date, gap_end) if last_date is not None else gap_end
+        dirty = True
+
+    # Forward delta — fill from last cached date to provisional boundary
+    if last_date < boundary:
+        metrics.HISTORICAL_QUERIES.labels('forward').inc()
+        with tracing.span('usage.forward_delta'):
+            delta = await get_viz_data(
+                project, start_ts=last_date + timedelta(milliseconds=1), end_ts=boundary
+            )
+        if delta:
+            data.extend(delta)
+        last_date = boundary
+        dirty = True
+
+    return data, oldest_date, last_date, dirty
@@ -1,6 +1,7 @@
 """Utility functions"""
 
 import os
+from collections import OrderedDict
 from datetime import date, datetime, time, timezone
 
 from fastapi import Request
@@ -37,3 +38,23 @@ def now() -> str | datetime:
 def env_to_bool(key: str | None) -> bool:
     val = os.getenv(key)
     return bool(val and val.lower() in ('t', 'true', '1', 'yes', 'on', 'y'))
+
+
+class LRUCache(OrderedDict):
+    """Bounded mapping that evicts its least recently used entry."""
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
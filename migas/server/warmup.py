@@ -0,0 +1,80 @@
+"""Pre-fill the ``/api/usage`` historical caches.
+
+Run after a deploy or Redis flush, so the first dashboard viewer of a project does
+not pay for the backward extension, and shortly after midnight UTC, so each day's
+forward delta is absorbed here rather than on a user request.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from . import usage
+from .cache import historical_key, warmup_key
+from .connections import get_redis_connection
+from .database import query_projects
+from .utils import now
+
+logger = logging.getLogger('migas')
+
+DEFAULT_WARMUP_WEEKS = 26
+# Grace period after midnight UTC before the daily run
+WARMUP_DELAY = timedelta(minutes=5)
+
+
+async def warm_usage_cache(weeks: int = DEFAULT_WARMUP_WEEKS, redis=None) -> int:
+    """Extend every project's historical cache back ``weeks`` and up to the provisional boundary.
+
+    Returns the number of projects whose cache entry was rewritten.
+    """
+    if redis is None:
+        redis = await get_redis_connection()
+
+    start_time = now()
+    requested_start = start_time - timedelta(weeks=weeks)
+    boundary = usage.provisional_boundary(start_time)
+
+    warmed = 0
+    for project in await query_projects():
+        cache_key = historical_key(project)
+        try:
+            data, oldest_date, last_date = usage.parse_historical(await redis.get(cache_key))
+            data, oldest_date, last_date, dirty = await usage.extend_historical(
+                project, data, oldest_date, last_date, requested_start, boundary
+            )
+            if dirty:
+                await usage.write_historical(redis, cache_key, data, oldest_date, last_date)
+                warmed += 1
+        except Exception:
+            # e.g. a corrupt cache entry; the other projects are still warmed
+            logger.exception(f'Cache warm-up failed for {project}')
+
+    logger.info(f'Warmed usage cache for {warmed} project(s) ({weeks} weeks)')
+    return warmed
+
+
+async def warm_usage_cache_daily(weeks: int = DEFAULT_WARMUP_WEEKS) -> None:
+    """Warm the caches on startup, then again shortly after every midnight UTC.
+
+    A Redis lock keyed by the provisional boundary lets only one worker run each
+    pass, so this task can be started in every gunicorn worker. A failed pass
+    releases the lock, and the task carries on with the next one.
+    """
+    while True:
+        current = now()
+        lock = warmup_key(usage.provisional_boundary(current).date())
+        locked = False
+        try:
+            redis = await get_redis_connection()
+            if locked := await redis.set(lock, current.isoformat(), nx=True, ex=86400):
+                await warm_usage_cache(weeks, redis=redis)
+        except Exception:
+            logger.exception('Scheduled cache warm-up failed')
+            if locked:
+                try:
+                    await redis.delete(lock)
+                except Exception:
+                    logger.exception('Could not release the cache warm-up lock')
+
+        midnight = (current + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        await asyncio.sleep((midnight + WARMUP_DELAY - now()).total_seconds())
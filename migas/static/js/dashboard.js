@@ -23,6 +23,14 @@ const INTERVAL_CONFIG = {
 	month: { windowSize: 3, shortLabel: "3m" },
 };
 
+/** Usage chart points; longer series are downsampled by the worker (LTTB). */
+const MAX_CHART_POINTS = 500;
+
+/** Row height (px) of the virtualized version list; matches dashboard.css. */
+const VERSION_ROW_HEIGHT = 28;
+/** Rows rendered above and below the visible part of the version list. */
+const VERSION_LIST_OVERSCAN = 5;
+
 /** Shared ApexCharts options applied to every chart instance. */
 const CHART_THEME = {
 	theme: { mode: "dark" },
@@ -46,9 +54,10 @@ function requireAuth() {
 	return { token, projects: projectsStr.split(",") };
 }
 
-function _logout(e) {
+async function _logout(e) {
 	if (e) e.preventDefault();
 	localStorage.clear();
+	await clearStoredUsage();
 	window.location.href = "/viz";
 }
 
@@ -56,10 +65,10 @@ function _logout(e) {
 
 const { token, projects } = requireAuth();
 
-const dataCache = {}; // { project: { dateGroup: data[] } }
+const dataCache = {}; // { project: { day: data[], lastDate } }
 let currentProject = null; // tracks active project to detect changes
 let usageChart, statusChart, versionChart;
-let currentRawData = []; // set by renderCharts(); used by zoom/version hooks
+let currentView = null; // last worker summary; used by the y-axis lock
 let selectedVersion = null;
 let yAxisLocked = false; // whether y-axis scaling is locked
 let lockedYAxisMax = null; // the locked y-axis max value
@@ -84,19 +93,8 @@ projects.forEach((p) => {
 
 document.querySelectorAll('input[name="interval"]').forEach((el) => {
 	el.addEventListener("change", () => {
-		const project = projectSelect.value;
-		const allDayRows = dataCache[project]?.day || [];
-		if (!allDayRows.length) return;
-		const active = el.value;
-		const reshaped =
-			active === "day"
-				? allDayRows
-				: active === "week"
-					? reshapeToWeek(allDayRows)
-					: reshapeToMonth(allDayRows);
-		updateVersionToggles(reshaped);
-		updateMetrics(reshaped, currentXMin, currentXMax);
-		renderCharts(reshaped, currentXMin, currentXMax);
+		if (!dataCache[projectSelect.value]?.day.length) return;
+		renderCharts(currentXMin, currentXMax);
 	});
 });
 
@@ -114,60 +112,164 @@ document.querySelectorAll('input[name="timerange"]').forEach((el) => {
 	});
 });
 
+document.addEventListener("click", (e) => {
+	// Close the "More…" version list when clicking elsewhere
+	document.querySelectorAll(".version-list:not(.hidden)").forEach((list) => {
+		if (!list.parentNode.contains(e.target)) list.classList.add("hidden");
+	});
+});
+
 // ── Data fetching ──────────────────────────────────────────────────────────
 
-async function fetchUsageData(project, weeks = 1, since = null) {
-	const qs = since ? `?weeks=${weeks}&since=${since}` : `?weeks=${weeks}`;
+/** Columnar payloads skip repeating every key per row (parallel arrays). */
+const COLUMNAR_JSON = "application/vnd.migas.columnar+json";
+
+/**
+ * Returns `{ rows, lastDate }`; rows dated before `lastDate` are final.
+ * `since` limits rows to those older than it, `after` to those on or after it.
+ */
+async function fetchUsageData(project, weeks = 1, { since, after } = {}) {
+	let qs = `?weeks=${weeks}`;
+	if (since) qs += `&since=${since}`;
+	if (after) qs += `&after=${after}`;
 	const res = await fetch(`/api/usage/${project}${qs}`, {
 		headers: {
 			Authorization: `Bearer ${token}`,
+			Accept: COLUMNAR_JSON,
 		},
 	});
 	if (!res.ok) {
 		const error = await res.json();
 		throw new Error(error.detail || "Failed to fetch usage data");
 	}
-	return await res.json();
+	const { date, version, status, count } = await res.json();
+	const rows = date.map((d, i) => ({
+		date: d,
+		version: version[i],
+		status: status[i],
+		count: count[i],
+	}));
+	return { rows, lastDate: res.headers.get("X-Usage-Last-Date") };
 }
 
-// ── Reshaping ──────────────────────────────────────────────────────────────
+// ── Persistence ────────────────────────────────────────────────────────────
 
-function getMonday(d) {
-	// Use UTC throughout: the server returns UTC-anchored YYYY-MM-DD strings,
-	// and mixing local-tz methods with toISOString() produces off-by-one errors
-	// around DST transitions (specifically orphans the Monday after DST ends
-	// into its own 1-day week bucket).
-	const dt = new Date(d);
-	const day = dt.getUTCDay();
-	const diff = dt.getUTCDate() - day + (day === 0 ? -6 : 1);
-	dt.setUTCDate(diff);
-	return dt.toISOString().split("T")[0];
+/**
+ * Final day rows are kept in IndexedDB per project, with the server's last
+ * date and the weeks they cover, so a reload only fetches rows from that date
+ * on. Every operation is a no-op if IndexedDB is unavailable.
+ */
+const USAGE_DB = "migas";
+const USAGE_STORE = "usage";
+let usageDb = null;
+
+function _openUsageDb() {
+	usageDb ??= new Promise((resolve, reject) => {
+		const req = indexedDB.open(USAGE_DB, 1);
+		req.onupgradeneeded = () =>
+			req.result.createObjectStore(USAGE_STORE, { keyPath: "project" });
+		req.onsuccess = () => resolve(req.result);
+		req.onerror = () => reject(req.error);
+	});
+	return usageDb;
 }
 
-function reshapeToWeek(rows) {
-	const weeks = {};
-	rows.forEach((r) => {
-		const monday = getMonday(r.date);
-		const key = `${monday}|${r.version}|${r.status}`;
-		weeks[key] = (weeks[key] || 0) + r.count;
-	});
-	return Object.entries(weeks).map(([key, count]) => {
-		const [date, version, status] = key.split("|");
-		return { date, version, status, count: Number(count) };
+async function _usageDbRequest(mode, makeRequest) {
+	const db = await _openUsageDb();
+	return new Promise((resolve, reject) => {
+		const tx = db.transaction(USAGE_STORE, mode);
+		const req = makeRequest(tx.objectStore(USAGE_STORE));
+		tx.oncomplete = () => resolve(req.result);
+		tx.onerror = tx.onabort = () => reject(tx.error);
 	});
 }
 
-function reshapeToMonth(rows) {
-	const months = {};
-	rows.forEach((r) => {
-		const month = `${r.date.substring(0, 7)}-01`;
-		const key = `${month}|${r.version}|${r.status}`;
-		months[key] = (months[key] || 0) + r.count;
-	});
-	return Object.entries(months).map(([key, count]) => {
-		const [date, version, status] = key.split("|");
-		return { date, version, status, count: Number(count) };
+async function loadStoredUsage(project) {
+	try {
+		return await _usageDbRequest("readonly", (store) => store.get(project));
+	} catch (err) {
+		console.warn("Failed to read stored usage data:", err);
+		return undefined;
+	}
+}
+
+async function storeUsage(project) {
+	const { day, lastDate } = dataCache[project] || {};
+	if (!lastDate) return;
+	const entry = {
+		project,
+		lastDate,
+		weeks: loadedWeeks,
+		rows: day.filter((r) => r.date < lastDate),
+	};
+	try {
+		await _usageDbRequest("readwrite", (store) => store.put(entry));
+	} catch (err) {
+		console.warn("Failed to store usage data:", err);
+	}
+}
+
+async function clearStoredUsage() {
+	try {
+		await _usageDbRequest("readwrite", (store) => store.clear());
+	} catch (err) {
+		console.warn("Failed to clear stored usage data:", err);
+	}
+}
+
+// ── Aggregation worker ─────────────────────────────────────────────────────
+
+/**
+ * Rows are reshaped and aggregated in usage-worker.js, so large projects do
+ * not block the page. The worker holds the active project's day rows, and
+ * answers view requests with everything the charts and metrics need.
+ */
+const usageWorker = new Worker(document.currentScript.dataset.worker);
+const pendingViews = new Map(); // request id -> resolve
+let latestView = 0; // id of the most recent view request
+let workerRows = null; // day rows last sent to the worker
+
+usageWorker.onmessage = ({ data }) => {
+	const resolve = pendingViews.get(data.id);
+	pendingViews.delete(data.id);
+	resolve?.(data);
+};
+usageWorker.onerror = (err) => {
+	console.error("Usage worker failed:", err.message);
+};
+
+function currentInterval() {
+	return (
+		document.querySelector('input[name="interval"]:checked')?.value || "day"
+	);
+}
+
+/**
+ * Summarize `dayRows` for the current interval and version filter within
+ * [xMin, xMax] (see summarize() in usage-worker.js). Resolves to null when a
+ * newer request has been made meanwhile, e.g. while scrolling the chart.
+ */
+async function requestView(dayRows, xMin = null, xMax = null) {
+	if (dayRows !== workerRows) {
+		usageWorker.postMessage({ type: "load", rows: dayRows });
+		workerRows = dayRows;
+	}
+	const id = ++latestView;
+	const interval = currentInterval();
+	const view = await new Promise((resolve) => {
+		pendingViews.set(id, resolve);
+		usageWorker.postMessage({
+			type: "view",
+			id,
+			interval,
+			version: selectedVersion,
+			xMin,
+			xMax,
+			windowSize: INTERVAL_CONFIG[interval].windowSize,
+			maxPoints: MAX_CHART_POINTS,
+		});
 	});
+	return id === latestView ? view : null;
 }
 
 // ── Cache and rendering ────────────────────────────────────────────────────
@@ -186,9 +288,24 @@ async function loadProjectData(project) {
 	loadedWeeks = 0;
 
 	try {
-		const dayRows = await fetchUsageData(project, selectedWeeks);
-		_reshapeAndStore(project, dayRows);
-		loadedWeeks = selectedWeeks;
+		const stored = await loadStoredUsage(project);
+		if (stored) {
+			// Stored rows are final; fetch the days finalized since, and the
+			// provisional window
+			const { rows, lastDate } = await fetchUsageData(project, stored.weeks, {
+				after: stored.lastDate,
+			});
+			_storeRows(project, [...stored.rows, ...rows], lastDate);
+			loadedWeeks = stored.weeks;
+			if (selectedWeeks > loadedWeeks) {
+				await _widenWindow(project, selectedWeeks);
+			}
+		} else {
+			const { rows, lastDate } = await fetchUsageData(project, selectedWeeks);
+			_storeRows(project, rows, lastDate);
+			loadedWeeks = selectedWeeks;
+		}
+		storeUsage(project);
 
 		INTERVAL_KEYS.forEach((g) => {
 			setIntervalButtonLoaded(g);
@@ -205,11 +322,11 @@ async function loadProjectData(project) {
 	}
 }
 
-function _reshapeAndStore(project, dayRows) {
+function _storeRows(project, dayRows, lastDate) {
+	// week and month views are reshaped by the worker, on first use
 	dataCache[project] = {
 		day: dayRows,
-		week: reshapeToWeek(dayRows),
-		month: reshapeToMonth(dayRows),
+		lastDate: lastDate ?? dataCache[project]?.lastDate,
 	};
 }
 
@@ -219,19 +336,22 @@ function _reshapeAndStore(project, dayRows) {
 async function _widenWindow(project, weeks) {
 	const existing = dataCache[project]?.day || [];
 	if (existing.length === 0) {
-		const dayRows = await fetchUsageData(project, weeks);
-		_reshapeAndStore(project, dayRows);
+		const { rows, lastDate } = await fetchUsageData(project, weeks);
+		_storeRows(project, rows, lastDate);
 	} else {
 		const oldest = existing.reduce(
 			(min, r) => (r.date < min ? r.date : min),
 			existing[0].date,
 		);
-		const delta = await fetchUsageData(project, weeks, oldest);
+		const { rows: delta } = await fetchUsageData(project, weeks, {
+			since: oldest,
+		});
 		if (delta.length) {
-			_reshapeAndStore(project, [...delta, ...existing]);
+			_storeRows(project, [...delta, ...existing]);
 		}
 	}
 	loadedWeeks = weeks;
+	storeUsage(project);
 }
 
 async function setTimeRange(weeks) {
@@ -295,13 +415,15 @@ function _applySelectedWeeks(project) {
 	// viewport empty when a project has no recent activity; using an
 	// unclamped `latestMs - weeks*7` can precede the server's returned
 	// range (which starts at `today - weeks*7`), leaving a left-side gap.
-	let earliestMs = Infinity;
-	let latestMs = 0;
-	for (const r of allDayRows) {
-		const t = new Date(`${r.date}T00:00:00Z`).getTime();
-		if (t < earliestMs) earliestMs = t;
-		if (t > latestMs) latestMs = t;
+	// ISO dates compare chronologically as strings
+	let earliest = allDayRows[0].date;
+	let latest = earliest;
+	for (const { date } of allDayRows) {
+		if (date < earliest) earliest = date;
+		if (date > latest) latest = date;
 	}
+	const earliestMs = Date.parse(`${earliest}T00:00:00Z`);
+	const latestMs = Date.parse(`${latest}T00:00:00Z`);
 
 	if (selectedStartDate) {
 		currentXMin = selectedStartDate.getTime();
@@ -314,18 +436,7 @@ function _applySelectedWeeks(project) {
 		currentXMax = latestMs || null;
 	}
 
-	const active =
-		document.querySelector('input[name="interval"]:checked')?.value || "day";
-	const reshaped =
-		active === "day"
-			? allDayRows
-			: active === "week"
-				? reshapeToWeek(allDayRows)
-				: reshapeToMonth(allDayRows);
-
-	updateVersionToggles(reshaped);
-	updateMetrics(reshaped, currentXMin, currentXMax);
-	renderCharts(reshaped, currentXMin, currentXMax);
+	renderCharts(currentXMin, currentXMax);
 }
 
 function setIntervalButtonsLoading(loading) {
@@ -355,42 +466,14 @@ function setIntervalButtonError(dateGroup) {
 	if (label) label.classList.add("load-error");
 }
 
-// ── Date-range helper ──────────────────────────────────────────────────────
-
-/** Returns only the rows that fall within [minDate, maxDate] (epoch ms). Either bound may be null (open). */
-function filterByDateRange(rows, minDate, maxDate) {
-	if (minDate == null && maxDate == null) return rows;
-	return rows.filter((r) => {
-		const t = new Date(r.date).getTime();
-		return (
-			(minDate == null || t >= minDate) && (maxDate == null || t <= maxDate)
-		);
-	});
-}
-
 // ── Metrics banner ─────────────────────────────────────────────────────────
 
-function updateMetrics(data, minDate = null, maxDate = null) {
-	const filtered = filterByDateRange(
-		selectedVersion ? data.filter((r) => r.version === selectedVersion) : data,
-		minDate,
-		maxDate,
-	);
-
-	const _total = filtered.reduce((sum, r) => sum + r.count, 0);
-	const _successful = filtered
-		.filter((r) => r.status === "C")
-		.reduce((sum, r) => sum + r.count, 0);
-	const versions = new Set(filtered.map((r) => r.version)).size;
-
+function updateMetrics(view, minDate = null, maxDate = null) {
 	// Metrics updates
-	document.getElementById("active-versions").innerText = versions;
+	document.getElementById("active-versions").innerText = view.versionCount;
 
-	if (filtered.length > 0) {
-		const latest = [...filtered].sort(
-			(a, b) => new Date(b.date) - new Date(a.date),
-		)[0].date;
-		document.getElementById("last-update").innerText = latest;
+	if (view.latestDate) {
+		document.getElementById("last-update").innerText = view.latestDate;
 	}
 
 	// Range indicator + reset button
@@ -412,26 +495,10 @@ function updateMetrics(data, minDate = null, maxDate = null) {
 
 // ── Version filter UI ──────────────────────────────────────────────────────
 
-function sortVersions(a, b, desc = false) {
-	const pa = a.split(".").map(Number);
-	const pb = b.split(".").map(Number);
-	for (let i = 0; i < Math.max(pa.length, pb.length); i++) {
-		const diff = (pa[i] || 0) - (pb[i] || 0);
-		if (diff !== 0) return desc ? -diff : diff;
-	}
-	return 0;
-}
-
-function updateVersionToggles(data) {
-	const allVersions = [...new Set(data.map((r) => r.version))].sort((a, b) =>
-		sortVersions(a, b, true),
-	);
+function updateVersionToggles(allVersions) {
 	const mainVersions = allVersions.slice(0, 5);
 	const moreVersions = allVersions.slice(5);
 
-	const isDropdownSelected =
-		selectedVersion && moreVersions.includes(selectedVersion);
-
 	const container = document.getElementById("version-toggle-group");
 	container.replaceChildren();
 
@@ -469,109 +536,140 @@ function updateVersionToggles(data) {
 	}
 
 	if (moreVersions.length > 0) {
-		const select = document.createElement("select");
-		select.className = "version-select";
-		select.id = "more-versions-select";
-		select.addEventListener("change", () => setVersionFilter(select.value));
-
-		const placeholder = document.createElement("option");
-		placeholder.value = "";
-		placeholder.disabled = true;
-		placeholder.selected = !isDropdownSelected;
-		placeholder.textContent = "More…";
-		select.append(placeholder);
-
-		for (const v of moreVersions) {
-			const opt = document.createElement("option");
-			opt.value = v;
-			opt.textContent = v;
-			opt.selected = selectedVersion === v;
-			select.append(opt);
+		container.append(_moreVersionsMenu(moreVersions));
+	}
+}
+
+/**
+ * "More…" button opening a filterable list of the remaining versions. Only
+ * the rows scrolled into view are in the DOM, however many versions there are.
+ */
+function _moreVersionsMenu(versions) {
+	const menu = document.createElement("div");
+	menu.className = "version-more";
+
+	const button = document.createElement("button");
+	button.type = "button";
+	button.className = "version-select";
+	button.id = "more-versions-select";
+	button.textContent = versions.includes(selectedVersion)
+		? selectedVersion
+		: `More… (${versions.length})`;
+
+	const list = document.createElement("div");
+	list.className = "version-list hidden";
+	const search = document.createElement("input");
+	search.type = "search";
+	search.className = "version-list-search";
+	search.placeholder = "Filter versions";
+	const viewport = document.createElement("div");
+	viewport.className = "version-list-viewport";
+	list.append(search, viewport);
+	menu.append(button, list);
+
+	const renderItem = (v) => {
+		const item = document.createElement("div");
+		item.className = "version-list-item";
+		item.classList.toggle("selected", v === selectedVersion);
+		item.textContent = v;
+		item.addEventListener("click", () => setVersionFilter(v));
+		return item;
+	};
+	let redraw = virtualList(viewport, versions, renderItem);
+
+	search.addEventListener("input", () => {
+		const query = search.value.trim();
+		redraw = virtualList(
+			viewport,
+			query ? versions.filter((v) => v.includes(query)) : versions,
+			renderItem,
+		);
+	});
+	button.addEventListener("click", () => {
+		list.classList.toggle("hidden");
+		if (!list.classList.contains("hidden")) {
+			redraw(); // sized now that it is visible
+			search.focus();
 		}
+	});
+	return menu;
+}
 
-		container.append(select);
-	}
+/**
+ * Render the `items` of a fixed-height scrolling `viewport` that are in view
+ * (plus some overscan), re-rendering on scroll. Returns the redraw function.
+ */
+function virtualList(viewport, items, renderItem) {
+	const spacer = document.createElement("div");
+	spacer.className = "version-list-spacer";
+	spacer.style.height = `${items.length * VERSION_ROW_HEIGHT}px`;
+	viewport.replaceChildren(spacer);
+	viewport.scrollTop = 0;
+
+	let frame = null;
+	const draw = () => {
+		frame = null;
+		const top = Math.floor(viewport.scrollTop / VERSION_ROW_HEIGHT);
+		const shown = Math.ceil(viewport.clientHeight / VERSION_ROW_HEIGHT) + 1;
+		const first = Math.max(0, top - VERSION_LIST_OVERSCAN);
+		const last = Math.min(items.length, top + shown + VERSION_LIST_OVERSCAN);
+		const rows = [];
+		for (let i = first; i < last; i++) {
+			const row = renderItem(items[i]);
+			row.style.top = `${i * VERSION_ROW_HEIGHT}px`;
+			rows.push(row);
+		}
+		spacer.replaceChildren(...rows);
+	};
+	viewport.onscroll = () => {
+		frame ??= requestAnimationFrame(draw);
+	};
+	draw();
+	return draw;
 }
 
 function setVersionFilter(version) {
-	if (version === "") return; // "More…" placeholder selected
-	selectedVersion = version === "all" || version === null ? null : version;
-
-	renderCharts(currentRawData, currentXMin, currentXMax);
-	updateMetrics(currentRawData, currentXMin, currentXMax);
+	selectedVersion = version;
 
-	// Sync radio state
-	const radio = document.querySelector(
-		`input[name="v-filter"][value="${selectedVersion ?? "all"}"]`,
-	);
-	if (radio) {
-		radio.checked = true;
-		const select = document.getElementById("more-versions-select");
-		if (select) select.selectedIndex = 0; // clear the "More…" dropdown
-	} else {
-		// Version came from "More…" dropdown — uncheck all radios
-		document.querySelectorAll('input[name="v-filter"]').forEach((r) => {
-			r.checked = false;
-		});
-	}
+	// Re-renders the version toggles too, syncing the checked radio
+	renderCharts(currentXMin, currentXMax);
 }
 
 // ── Chart rendering ────────────────────────────────────────────────────────
 
-/** Max stacked value across dates visible within [xMin, xMax]. */
-function _visibleMax(filteredData, xMin, xMax) {
-	const allDates = [...new Set(currentRawData.map((r) => r.date))];
-	const visible =
-		xMin != null || xMax != null
-			? allDates.filter((d) => {
-					const t = new Date(`${d}T00:00:00Z`).getTime();
-					return (xMin == null || t >= xMin) && (xMax == null || t <= xMax);
-				})
-			: allDates;
-	const sums = visible.map((date) =>
-		STATUSES.reduce(
-			(sum, { code }) =>
-				sum +
-				filteredData
-					.filter((r) => r.date === date && r.status === code)
-					.reduce((s, r) => s + r.count, 0),
-			0,
-		),
-	);
-	return Math.max(...sums, 1);
-}
-
 /**
  * When the usage chart is zoomed/scrolled, keep the two smaller charts and
  * the metrics banner in sync with the visible date window.
  */
-function onZoomChange(filteredData, { xaxis }) {
+async function onZoomChange({ xaxis }) {
 	currentXMin = xaxis.min;
 	currentXMax = xaxis.max;
+	const view = await requestView(
+		dataCache[projectSelect.value]?.day || [],
+		xaxis.min,
+		xaxis.max,
+	);
+	if (!view) return; // superseded by a later zoom/scroll
+	currentView = view;
 	if (!yAxisLocked) {
-		const newMax = _visibleMax(filteredData, xaxis.min, xaxis.max);
-		usageChart?.updateOptions({ yaxis: { max: newMax } }, false, false);
+		usageChart?.updateOptions(
+			{ yaxis: { max: view.visibleMax } },
+			false,
+			false,
+		);
 	}
-	updateMetrics(filteredData, xaxis.min, xaxis.max);
-	renderStatusChart(filteredData, xaxis.min, xaxis.max);
-	renderVersionChart(currentRawData, xaxis.min, xaxis.max);
+	updateMetrics(view, xaxis.min, xaxis.max);
+	renderStatusChart(view);
+	renderVersionChart(view);
 }
 
-function renderUsageChart(filteredData, xMin = null, xMax = null) {
-	const dates = [...new Set(currentRawData.map((r) => r.date))].sort(
-		(a, b) => new Date(a) - new Date(b),
-	);
-	const series = STATUSES.map(({ code, label }) => ({
+function renderUsageChart(view, xMin = null, xMax = null) {
+	const series = STATUSES.map(({ label }, i) => ({
 		name: label,
-		data: dates.map((date) => {
-			const rows = filteredData.filter(
-				(r) => r.date === date && r.status === code,
-			);
-			return rows.reduce((sum, r) => sum + r.count, 0);
-		}),
+		data: view.series[i],
 	}));
 
-	const currentMax = _visibleMax(filteredData, xMin, xMax);
+	const currentMax = view.visibleMax;
 
 	// Capture viewport max when lock is first activated
 	if (yAxisLocked && !lockedYAxisMax) {
@@ -587,8 +685,8 @@ function renderUsageChart(filteredData, xMin = null, xMax = null) {
 			height: 350,
 			animations: { enabled: true, easing: "easeinout", speed: 800 },
 			events: {
-				zoomed: (_ctx, args) => onZoomChange(filteredData, args),
-				scrolled: (_ctx, args) => onZoomChange(filteredData, args),
+				zoomed: (_ctx, args) => onZoomChange(args),
+				scrolled: (_ctx, args) => onZoomChange(args),
 			},
 		},
 		colors: STATUSES.map((s) => s.color),
@@ -601,7 +699,7 @@ function renderUsageChart(filteredData, xMin = null, xMax = null) {
 		},
 		xaxis: {
 			type: "datetime",
-			categories: dates,
+			categories: view.dates,
 			...(xMin != null && { min: xMin }),
 			...(xMax != null && { max: xMax }),
 		},
@@ -614,12 +712,8 @@ function renderUsageChart(filteredData, xMin = null, xMax = null) {
 	usageChart.render();
 }
 
-function renderStatusChart(filteredData, minDate = null, maxDate = null) {
-	const data = filterByDateRange(filteredData, minDate, maxDate);
-
-	const totals = STATUSES.map(({ code }) =>
-		data.filter((r) => r.status === code).reduce((sum, r) => sum + r.count, 0),
-	);
+function renderStatusChart(view) {
+	const totals = view.statusTotals;
 
 	const options = {
 		...CHART_THEME,
@@ -650,45 +744,16 @@ function renderStatusChart(filteredData, minDate = null, maxDate = null) {
 	statusChart.render();
 }
 
-function renderVersionChart(data, minDate = null, maxDate = null) {
-	const windowed = filterByDateRange(data, minDate, maxDate);
-
-	// Aggregate total runs per version, sorted descending by count
-	const versionCounts = windowed.reduce((acc, r) => {
-		acc[r.version] = (acc[r.version] || 0) + r.count;
-		return acc;
-	}, {});
-
-	const sortedVersions = Object.entries(versionCounts)
-		.sort((a, b) => b[1] - a[1])
-		.slice(0, 5)
-		.map(([v]) => v);
-
-	const sortedTotals = sortedVersions.map((v) => versionCounts[v]);
-
-	// Growth comparison: most-recent windowSize periods vs the prior window
-	const interval = document.querySelector(
-		'input[name="interval"]:checked',
-	).value;
-	const { windowSize, shortLabel } = INTERVAL_CONFIG[interval];
-
-	const sortedDates = [...new Set(windowed.map((r) => r.date))].sort(
-		(a, b) => new Date(b) - new Date(a),
+function renderVersionChart(view) {
+	// Top 5 versions within the window, with their growth (see summarize())
+	const sortedVersions = view.topVersions.map(({ version }) => version);
+	const sortedTotals = view.topVersions.map(({ total }) => total);
+	const growthByVersion = Object.fromEntries(
+		view.topVersions
+			.filter(({ growth }) => growth != null)
+			.map(({ version, growth }) => [version, growth]),
 	);
-	const periodADates = sortedDates.slice(1, windowSize + 1);
-	const periodBDates = sortedDates.slice(windowSize + 1, windowSize * 2 + 1);
-
-	const growthByVersion = {};
-	if (periodADates.length > 0 && periodBDates.length > 0) {
-		sortedVersions.forEach((v) => {
-			const sum = (dates) =>
-				windowed
-					.filter((r) => r.version === v && dates.includes(r.date))
-					.reduce((s, r) => s + r.count, 0);
-			const [a, b] = [sum(periodADates), sum(periodBDates)];
-			if (b > 0) growthByVersion[v] = Math.round(((a - b) / b) * 100);
-		});
-	}
+	const { shortLabel } = INTERVAL_CONFIG[currentInterval()];
 
 	const categoriesWithGrowth = sortedVersions.map((v) => {
 		const g = growthByVersion[v];
@@ -749,15 +814,20 @@ function renderVersionChart(data, minDate = null, maxDate = null) {
 
 // ── Orchestration ──────────────────────────────────────────────────────────
 
-function renderCharts(rawData, xMin = null, xMax = null) {
-	currentRawData = rawData;
-	const filteredData = selectedVersion
-		? rawData.filter((r) => r.version === selectedVersion)
-		: rawData;
-
-	renderUsageChart(filteredData, xMin, xMax);
-	renderStatusChart(filteredData, xMin, xMax);
-	renderVersionChart(selectedVersion ? filteredData : rawData, xMin, xMax);
+async function renderCharts(xMin = null, xMax = null) {
+	const view = await requestView(
+		dataCache[projectSelect.value]?.day || [],
+		xMin,
+		xMax,
+	);
+	if (!view) return; // superseded by a later render
+	currentView = view;
+
+	updateVersionToggles(view.versions);
+	updateMetrics(view, xMin, xMax);
+	renderUsageChart(view, xMin, xMax);
+	renderStatusChart(view);
+	renderVersionChart(view);
 }
 
 function _resetZoom() {
@@ -769,22 +839,11 @@ function _toggleLockYAxis() {
 	const checkbox = document.getElementById("lock-yaxis-checkbox");
 	yAxisLocked = checkbox.checked;
 
-	if (yAxisLocked) {
-		// Lock is being activated; capture visible max
-		const filteredData = selectedVersion
-			? currentRawData.filter((r) => r.version === selectedVersion)
-			: currentRawData;
-		lockedYAxisMax = _visibleMax(filteredData, currentXMin, currentXMax);
-	} else {
-		// Lock is being deactivated
-		lockedYAxisMax = null;
-	}
+	// Lock captures the visible max; unlocking releases it
+	lockedYAxisMax = yAxisLocked ? currentView?.visibleMax : null;
 
 	// Re-render chart with new y-axis setting
-	const filteredData = selectedVersion
-		? currentRawData.filter((r) => r.version === selectedVersion)
-		: currentRawData;
-	renderUsageChart(filteredData, currentXMin, currentXMax);
+	if (currentView) renderUsageChart(currentView, currentXMin, currentXMax);
 }
 
 async function updateDashboard() {
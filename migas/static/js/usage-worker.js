@@ -0,0 +1,225 @@
+// Aggregates dashboard usage rows off the main thread (see dashboard.js).
+//
+// Messages in:
+//   { type: "load", rows }   day rows of the active project
+//   { type: "view", id, interval, version, xMin, xMax, windowSize, maxPoints }
+// Messages out:
+//   { id, ...summarize(view) }
+
+// Same order as STATUSES in dashboard.js
+const STATUS_CODES = ["C", "F", "S", "R"];
+const STATUS_INDEX = Object.fromEntries(
+	STATUS_CODES.map((code, i) => [code, i]),
+);
+
+let dayRows = [];
+let indexed = {}; // { interval: index() }, built on first use
+
+self.onmessage = ({ data }) => {
+	if (data.type === "load") {
+		dayRows = data.rows;
+		indexed = {};
+	} else if (data.type === "view") {
+		self.postMessage({ id: data.id, ...summarize(data) });
+	}
+};
+
+// ── Reshaping ──────────────────────────────────────────────────────────────
+
+function getMonday(d) {
+	// Use UTC throughout: the server returns UTC-anchored YYYY-MM-DD strings,
+	// and mixing local-tz methods with toISOString() produces off-by-one errors
+	// around DST transitions (specifically orphans the Monday after DST ends
+	// into its own 1-day week bucket).
+	const dt = new Date(d);
+	const day = dt.getUTCDay();
+	const diff = dt.getUTCDate() - day + (day === 0 ? -6 : 1);
+	dt.setUTCDate(diff);
+	return dt.toISOString().split("T")[0];
+}
+
+function reshape(rows, bucket) {
+	const buckets = {};
+	rows.forEach((r) => {
+		const key = `${bucket(r.date)}|${r.version}|${r.status}`;
+		buckets[key] = (buckets[key] || 0) + r.count;
+	});
+	return Object.entries(buckets).map(([key, count]) => {
+		const [date, version, status] = key.split("|");
+		return { date, version, status, count: Number(count) };
+	});
+}
+
+const BUCKETS = {
+	day: null,
+	week: getMonday,
+	month: (date) => `${date.substring(0, 7)}-01`,
+};
+
+function sortVersions(a, b, desc = false) {
+	const pa = a.split(".").map(Number);
+	const pb = b.split(".").map(Number);
+	for (let i = 0; i < Math.max(pa.length, pb.length); i++) {
+		const diff = (pa[i] || 0) - (pb[i] || 0);
+		if (diff !== 0) return desc ? -diff : diff;
+	}
+	return 0;
+}
+
+/** Group rows by date, so each view is a single pass over them. */
+function index(rows) {
+	const byDate = new Map();
+	const versions = new Set();
+	for (const r of rows) {
+		let group = byDate.get(r.date);
+		if (!group) byDate.set(r.date, (group = []));
+		group.push(r);
+		versions.add(r.version);
+	}
+	// ISO dates sort chronologically as strings
+	const dates = [...byDate.keys()].sort();
+	return {
+		dates,
+		times: dates.map((d) => Date.parse(`${d}T00:00:00Z`)),
+		groups: dates.map((d) => byDate.get(d)),
+		versions: [...versions].sort((a, b) => sortVersions(a, b, true)),
+	};
+}
+
+function getIndex(interval) {
+	if (!indexed[interval]) {
+		const bucket = BUCKETS[interval];
+		indexed[interval] = index(bucket ? reshape(dayRows, bucket) : dayRows);
+	}
+	return indexed[interval];
+}
+
+// ── Downsampling ───────────────────────────────────────────────────────────
+
+/**
+ * Largest-Triangle-Three-Buckets: indices of at most `threshold` points of
+ * (xs, ys) that keep the visual shape of the series, peaks included.
+ */
+function lttb(xs, ys, threshold) {
+	const n = xs.length;
+	if (threshold >= n || threshold < 3) return xs.map((_, i) => i);
+
+	const picked = [0];
+	const every = (n - 2) / (threshold - 2);
+	let a = 0;
+	for (let i = 0; i < threshold - 2; i++) {
+		// Average of the next bucket
+		const nextStart = Math.floor((i + 1) * every) + 1;
+		const nextEnd = Math.min(Math.floor((i + 2) * every) + 1, n);
+		let avgX = 0;
+		let avgY = 0;
+		for (let j = nextStart; j < nextEnd; j++) {
+			avgX += xs[j];
+			avgY += ys[j];
+		}
+		avgX /= nextEnd - nextStart;
+		avgY /= nextEnd - nextStart;
+
+		// Point of this bucket forming the largest triangle with the last pick
+		const start = Math.floor(i * every) + 1;
+		const end = Math.floor((i + 1) * every) + 1;
+		let maxArea = -1;
+		let next = start;
+		for (let j = start; j < end; j++) {
+			const area = Math.abs(
+				(xs[a] - avgX) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avgY - ys[a]),
+			);
+			if (area > maxArea) {
+				maxArea = area;
+				next = j;
+			}
+		}
+		picked.push(next);
+		a = next;
+	}
+	picked.push(n - 1);
+	return picked;
+}
+
+// ── Views ──────────────────────────────────────────────────────────────────
+
+/**
+ * Everything the dashboard renders for one interval, version filter and
+ * [xMin, xMax] window (epoch ms, either may be null):
+ *   - dates, series: stacked usage per status over all dates, downsampled
+ *     to `maxPoints` (by the total, so all series keep the same dates)
+ *   - visibleMax: highest stacked total within the window
+ *   - statusTotals, topVersions, versionCount, latestDate: within the window
+ *   - versions: every version, newest first
+ */
+function summarize({ interval, version, xMin, xMax, windowSize, maxPoints }) {
+	const { dates, times, groups, versions } = getIndex(interval);
+	const perStatus = STATUS_CODES.map(() => new Array(dates.length).fill(0));
+	const totals = new Array(dates.length).fill(0);
+	const statusTotals = STATUS_CODES.map(() => 0);
+	const versionTotals = new Map();
+	const windowDates = []; // indices of dates in the window with rows
+	let visibleMax = 1;
+
+	for (let i = 0; i < dates.length; i++) {
+		const visible =
+			(xMin == null || times[i] >= xMin) && (xMax == null || times[i] <= xMax);
+		let hasRows = false;
+		for (const r of groups[i]) {
+			if (version && r.version !== version) continue;
+			hasRows = true;
+			const s = STATUS_INDEX[r.status];
+			if (s !== undefined) {
+				perStatus[s][i] += r.count;
+				totals[i] += r.count;
+			}
+			if (!visible) continue;
+			if (s !== undefined) statusTotals[s] += r.count;
+			versionTotals.set(
+				r.version,
+				(versionTotals.get(r.version) || 0) + r.count,
+			);
+		}
+		if (visible) {
+			visibleMax = Math.max(visibleMax, totals[i]);
+			if (hasRows) windowDates.push(i);
+		}
+	}
+
+	// Growth comparison: most-recent windowSize periods vs the prior window,
+	// skipping the latest (possibly partial) period
+	const recent = windowDates.reverse();
+	const periodA = recent.slice(1, windowSize + 1);
+	const periodB = recent.slice(windowSize + 1, windowSize * 2 + 1);
+	const sumVersion = (v, period) =>
+		period.reduce(
+			(sum, i) =>
+				sum +
+				groups[i].reduce((s, r) => (r.version === v ? s + r.count : s), 0),
+			0,
+		);
+
+	const topVersions = [...versionTotals]
+		.sort((a, b) => b[1] - a[1])
+		.slice(0, 5)
+		.map(([v, total]) => {
+			let growth = null;
+			if (periodA.length > 0 && periodB.length > 0) {
+				const [a, b] = [sumVersion(v, periodA), sumVersion(v, periodB)];
+				if (b > 0) growth = Math.round(((a - b) / b) * 100);
+			}
+			return { version: v, total, growth };
+		});
+
+	const picked = lttb(times, totals, maxPoints);
+	return {
+		dates: picked.map((i) => dates[i]),
+		series: perStatus.map((counts) => picked.map((i) => counts[i])),
+		visibleMax,
+		statusTotals,
+		topVersions,
+		versionCount: versionTotals.size,
+		latestDate: recent.length ? dates[recent[0]] : null,
+		versions,
+	};
+}